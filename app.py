@@ -7,12 +7,16 @@ from werkzeug.exceptions import HTTPException
 from config import DEBUG
 from routes.api import api_bp
 from routes.main import main_bp
+from services import health, library_sync, refresh
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp)
+    refresh.start_deferred_runner()
+    library_sync.start()
+    health.start()
 
     @app.errorhandler(Exception)
     def api_json_errors(e):
@@ -38,11 +42,13 @@ if __name__ == "__main__":
     else:
         import os
         import sys
+        here = os.path.dirname(os.path.abspath(__file__))
+        os.chdir(here)
         os.execv(
             sys.executable,
             [
                 sys.executable, "-m", "gunicorn",
-                "-w", "4", "-b", "0.0.0.0:5000",
+                "-c", os.path.join(here, "gunicorn.conf.py"),
                 "wsgi:application",
             ],
         )
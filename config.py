@@ -10,12 +10,54 @@ def _bool_env(name: str, default: bool = False) -> bool:
     return os.getenv(name, str(default)).lower() in ("true", "1", "yes")
 
 
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
 DEBUG = _bool_env("DEBUG", False)
 STAT = _bool_env("STAT", True)
 
 VERSION = "1.6.0"
 GITHUB_REPO = "https://github.com/cbodden/Magic-Erasarr"
 
+# Post-removal refresh jobs (services/refresh.py): seconds between Plex scan-state polls, seconds
+# to wait for a scan to show up before assuming it already finished, and the longest scan wait
+REFRESH_POLL_INTERVAL = _int_env("REFRESH_POLL_INTERVAL", 2)
+REFRESH_SCAN_START_GRACE = _int_env("REFRESH_SCAN_START_GRACE", 10)
+REFRESH_SCAN_TIMEOUT = _int_env("REFRESH_SCAN_TIMEOUT", 1800)
+# Refresh requests within REFRESH_DEBOUNCE seconds of each other share one job (window
+# extended per request, at most REFRESH_DEBOUNCE_MAX seconds after the first)
+REFRESH_DEBOUNCE = _int_env("REFRESH_DEBOUNCE", 5)
+REFRESH_DEBOUNCE_MAX = _int_env("REFRESH_DEBOUNCE_MAX", 30)
+# "immediate": refresh Tautulli media info right after the Plex scan. "deferred": run the full
+# Tautulli refresh in TAUTULLI_REFRESH_WINDOW (local time, "HH:MM-HH:MM"; empty = as soon as
+# the background runner gets to it). "off": never; removed rows stay hidden by tombstones.
+TAUTULLI_REFRESH_MODE = (os.getenv("TAUTULLI_REFRESH_MODE", "") or "immediate").lower()
+TAUTULLI_REFRESH_WINDOW = os.getenv("TAUTULLI_REFRESH_WINDOW", "03:00-05:00").strip()
+# Seconds a removed item's tombstone hides it at most (it is dropped earlier once Tautulli
+# no longer returns the item)
+TOMBSTONE_TTL = _int_env("TOMBSTONE_TTL", 7 * 24 * 3600)
+
+# /api/status: seconds between background health probes (0 = check on every call) and the
+# timeout of each service check
+STATUS_PROBE_INTERVAL = _int_env("STATUS_PROBE_INTERVAL", 60)
+STATUS_PROBE_TIMEOUT = _int_env("STATUS_PROBE_TIMEOUT", 10)
+
+# gunicorn (gunicorn.conf.py): "gthread" serves GUNICORN_THREADS requests per worker;
+# "gevent" (optional dependency) serves up to GUNICORN_WORKER_CONNECTIONS per worker; "sync" is one.
+GUNICORN_BIND = os.getenv("GUNICORN_BIND", "") or "0.0.0.0:5000"
+GUNICORN_WORKERS = _int_env("GUNICORN_WORKERS", 4)
+GUNICORN_WORKER_CLASS = os.getenv("GUNICORN_WORKER_CLASS", "") or "gthread"
+GUNICORN_THREADS = _int_env("GUNICORN_THREADS", 8)
+GUNICORN_WORKER_CONNECTIONS = _int_env("GUNICORN_WORKER_CONNECTIONS", 1000)
+GUNICORN_TIMEOUT = _int_env("GUNICORN_TIMEOUT", 120)
+
+# Local state (caches, job status) shared by all gunicorn workers
+DATA_DIR = os.getenv("DATA_DIR", "") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
 
 def _build_arr_instances(prefix: str, count: int = 2) -> list[dict]:
     """Read numbered *arr instance configs from env vars.
@@ -46,3 +88,54 @@ OVERSEERR_API_KEY = os.getenv("OVERSEERR_API_KEY", "")
 RADARR_INSTANCES = _build_arr_instances("RADARR")
 SONARR_INSTANCES = _build_arr_instances("SONARR")
 LIDARR_INSTANCES = _build_arr_instances("LIDARR")
+
+# Keep-alive connection pools (one pooled session per service, see services/client.py).
+# HTTP_POOL_MAXSIZE is connections kept open per host; size it to the busiest thread pool.
+HTTP_POOL_CONNECTIONS = _int_env("HTTP_POOL_CONNECTIONS", 4)
+HTTP_POOL_MAXSIZE = _int_env("HTTP_POOL_MAXSIZE", 16)
+
+# /api/library/combined fetches all libraries of a type at once: at most this many in parallel,
+# and libraries that have not answered after LIBRARY_FETCH_TIMEOUT seconds are reported as errors.
+LIBRARY_FETCH_WORKERS = _int_env("LIBRARY_FETCH_WORKERS", 6)
+LIBRARY_FETCH_TIMEOUT = _int_env("LIBRARY_FETCH_TIMEOUT", 10)
+
+# Snapshot cache of each library's media list (services/library_cache.py); TTL 0 disables it.
+# LIBRARY_CACHE_MAX_ROWS bounds the rows kept in memory per worker.
+LIBRARY_CACHE_TTL = _int_env("LIBRARY_CACHE_TTL", 300)
+LIBRARY_CACHE_MAX_ROWS = _int_env("LIBRARY_CACHE_MAX_ROWS", 200000)
+LIBRARY_CACHE_PAGE_SIZE = _int_env("LIBRARY_CACHE_PAGE_SIZE", 5000)
+
+# /api/* responses of at least this many bytes are gzip (or brotli) compressed; 0 disables it
+API_COMPRESS_MIN_SIZE = _int_env("API_COMPRESS_MIN_SIZE", 1024)
+
+# Rows pulled per library per step when merging the combined view page by page
+LIBRARY_MERGE_CHUNK = _int_env("LIBRARY_MERGE_CHUNK", 100)
+
+# Local mirror of all libraries (services/library_sync.py): seconds between full syncs of each
+# section; 0 disables it and the combined view reads from Tautulli / the snapshot cache
+LIBRARY_SYNC_INTERVAL = _int_env("LIBRARY_SYNC_INTERVAL", 0)
+
+# /api/remove/batch: items removed in parallel, and the cap on concurrent calls per upstream service
+REMOVE_BATCH_WORKERS = _int_env("REMOVE_BATCH_WORKERS", 8)
+REMOVE_SERVICE_CONCURRENCY = _int_env("REMOVE_SERVICE_CONCURRENCY", 4)
+# Seconds each item's Seerr / *arr instance steps (run concurrently) may wait for a service slot;
+# steps that already started are waited for
+REMOVE_STEP_TIMEOUT = _int_env("REMOVE_STEP_TIMEOUT", 60)
+
+# Seconds an *arr instance's downloaded catalog is reused for ID/title lookups (services/catalog.py)
+ARR_CATALOG_TTL = _int_env("ARR_CATALOG_TTL", 900)
+
+# /api/overseerr-info: shared lookup threads, seconds before unfinished lookups are returned as
+# "pending", and seconds a finished lookup is reused
+RESOLVER_WORKERS = _int_env("RESOLVER_WORKERS", 8)
+RESOLVER_TIMEOUT = _int_env("RESOLVER_TIMEOUT", 8)
+RESOLVER_RESULT_TTL = _int_env("RESOLVER_RESULT_TTL", 120)
+
+# Seerr request index (services/request_index.py): seconds between incremental refreshes
+# (0 disables the index) and seconds between full rescans, which also drop deleted requests
+OVERSEERR_INDEX_REFRESH = _int_env("OVERSEERR_INDEX_REFRESH", 60)
+OVERSEERR_INDEX_FULL_REFRESH = _int_env("OVERSEERR_INDEX_FULL_REFRESH", 3600)
+OVERSEERR_INDEX_PAGE_SIZE = _int_env("OVERSEERR_INDEX_PAGE_SIZE", 100)
+
+# Seconds a rating_key -> external ID mapping is reused from the on-disk cache (0 disables it)
+ID_CACHE_TTL = _int_env("ID_CACHE_TTL", 30 * 24 * 3600)
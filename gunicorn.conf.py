@@ -0,0 +1,23 @@
+"""gunicorn settings (used by the Docker image and `python app.py`).
+
+Every worker serves GUNICORN_THREADS requests at once with the default gthread class, so a
+few slow Tautulli or *arr calls no longer tie up the whole server. With
+GUNICORN_WORKER_CLASS=gevent (requires `pip install gevent`) each worker runs requests and
+the app's background threads as greenlets and can keep hundreds of upstream calls in
+flight; GUNICORN_WORKER_CONNECTIONS caps concurrent requests per worker.
+"""
+from config import (
+    GUNICORN_BIND,
+    GUNICORN_THREADS,
+    GUNICORN_TIMEOUT,
+    GUNICORN_WORKER_CLASS,
+    GUNICORN_WORKER_CONNECTIONS,
+    GUNICORN_WORKERS,
+)
+
+bind = GUNICORN_BIND
+workers = GUNICORN_WORKERS
+worker_class = GUNICORN_WORKER_CLASS
+threads = GUNICORN_THREADS
+worker_connections = GUNICORN_WORKER_CONNECTIONS
+timeout = GUNICORN_TIMEOUT
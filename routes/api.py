@@ -1,24 +1,48 @@
 """API routes."""
+import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from config import (
     DEBUG,
+    LIBRARY_FETCH_TIMEOUT,
+    LIBRARY_FETCH_WORKERS,
+    LIBRARY_MERGE_CHUNK,
     LIDARR_INSTANCES,
     OVERSEERR_API_KEY,
-    OVERSEERR_URL,
     PLEX_TOKEN,
     PLEX_URL,
     RADARR_INSTANCES,
+    REMOVE_BATCH_WORKERS,
+    RESOLVER_TIMEOUT,
     SONARR_INSTANCES,
     STAT,
 )
-from services import lidarr, overseerr, plex as plex_svc, radarr, sonarr, tautulli
+from services import (
+    health,
+    id_cache,
+    library_cache,
+    library_sync,
+    refresh,
+    removal,
+    resolver,
+    tautulli,
+)
+from services.client import pool_stats
+from utils.columns import CombinedColumns
+from utils.fanout import fan_out
+from utils.http import compress, conditional
 from utils.ids import extract_ids
+from utils.media import normalize, resolve_file_size
+from utils.merge import CursorCache, MergeCursor, MergeSource, sort_key_for
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
+api_bp.after_request(compress)
+
+# Combined-view merge cursors (used when the library snapshot cache is disabled)
+_merge_cursors = CursorCache()
+
 
 @api_bp.route("/debug")
 def api_debug():
@@ -129,118 +153,31 @@ def api_debug_library(section_id):
         return jsonify({"error": str(e)}), 500
 
 
+@api_bp.route("/debug/http-pools")
+def api_debug_http_pools():
+    """Return keep-alive connection reuse counters per service. Only when DEBUG=true in env."""
+    if not DEBUG:
+        return jsonify({"error": "Debug routes are disabled"}), 404
+    return jsonify(pool_stats())
+
+
 @api_bp.route("/status")
 def api_status():
     """Connectivity check for all configured services. Only when STAT=true in env.
 
-    Returns a dict keyed by service name.  Each value is either an object
-    {"status": "ok", "version": "..."} or a string "error: ...".
+    Returns a dict keyed by service name. Each value is {"status": "ok", "version", "name", ...}
+    or {"status": "error", "error", ...}, plus "latency_ms", "checked_at" and "last_success"
+    (see services.health). The result of the last background probe is returned without
+    waiting; ?fresh=1 checks all services now.
     """
     if not STAT:
         return jsonify({"error": "Status endpoint is disabled"}), 404
-    result = {}
-
-    try:
-        info = tautulli.tautulli_get("get_tautulli_info")
-        version = info.get("tautulli_version", "")
-        name = (
-            info.get("tautulli_product")
-            or info.get("product")
-            or info.get("app_name")
-            or "Tautulli"
-        )
-        result["tautulli"] = {"status": "ok", "version": version, "name": name}
-    except Exception as e:
-        result["tautulli"] = f"error: {e}"
-
-    try:
-        if not OVERSEERR_API_KEY:
-            raise ValueError("API key not set")
-        r = requests.get(
-            f"{OVERSEERR_URL}/api/v1/status",
-            headers=overseerr.overseerr_headers(),
-            timeout=10,
-        )
-        r.raise_for_status()
-        data = r.json()
-        version = data.get("version", "")
-        name = (
-            data.get("applicationTitle")
-            or data.get("title")
-            or data.get("name")
-            or "Seerr"
-        )
-        result["overseerr"] = {"status": "ok", "version": version, "name": name}
-    except Exception as e:
-        result["overseerr"] = f"error: {e}"
-
-    for i, inst in enumerate(RADARR_INSTANCES):
-        key = f"radarr_{i + 1}"
-        try:
-            r = requests.get(
-                f"{inst['url']}/api/v3/system/status",
-                params={"apikey": inst["api_key"]},
-                timeout=10,
-            )
-            r.raise_for_status()
-            data = r.json()
-            version = data.get("version", "")
-            name = (
-                data.get("instanceName")
-                or data.get("appName")
-                or data.get("name")
-                or inst["name"]
-            )
-            result[key] = {"status": "ok", "version": version, "name": name}
-        except Exception as e:
-            result[key] = f"error: {e}"
-
-    for i, inst in enumerate(SONARR_INSTANCES):
-        key = f"sonarr_{i + 1}"
-        try:
-            r = requests.get(
-                f"{inst['url']}/api/v3/system/status",
-                params={"apikey": inst["api_key"]},
-                timeout=10,
-            )
-            r.raise_for_status()
-            data = r.json()
-            version = data.get("version", "")
-            name = (
-                data.get("instanceName")
-                or data.get("appName")
-                or data.get("name")
-                or inst["name"]
-            )
-            result[key] = {"status": "ok", "version": version, "name": name}
-        except Exception as e:
-            result[key] = f"error: {e}"
-
-    for i, inst in enumerate(LIDARR_INSTANCES):
-        key = f"lidarr_{i + 1}"
-        try:
-            r = requests.get(
-                f"{inst['url']}/api/v1/system/status",
-                params={"apikey": inst["api_key"]},
-                timeout=10,
-            )
-            r.raise_for_status()
-            data = r.json()
-            version = data.get("version", "")
-            name = (
-                data.get("instanceName")
-                or data.get("appName")
-                or data.get("name")
-                or inst["name"]
-            )
-            result[key] = {"status": "ok", "version": version, "name": name}
-        except Exception as e:
-            result[key] = f"error: {e}"
-
-    return jsonify(result)
+    fresh = request.args.get("fresh", "").lower() in ("1", "true", "yes")
+    return jsonify(health.status(fresh=fresh))
 
 
 @api_bp.route("/instances")
+@conditional
 def api_instances():
     """Return the configured instance names so the frontend can render chips."""
     return jsonify({
@@ -260,6 +197,7 @@ def api_instances():
 
 
 @api_bp.route("/libraries")
+@conditional
 def api_libraries():
     """Return all Tautulli libraries (for combined view we only need types)."""
     try:
@@ -269,10 +207,55 @@ def api_libraries():
         return jsonify({"error": str(e)}), 500
 
 
+def _cursor_rows(cursor: MergeCursor, cursor_key, count: int, chunk_size: int):
+    """Yield up to count merged rows (all if count < 0) a chunk at a time, then keep the cursor
+    for the next page unless a library failed (retry it from scratch then)."""
+    remaining = count
+    while remaining != 0:
+        rows = cursor.take(chunk_size if remaining < 0 else min(remaining, chunk_size))
+        if not rows:
+            break
+        for row in rows:
+            # Merged by Tautulli's raw file_size; shows get their total size only once emitted
+            row["file_size"] = resolve_file_size(row)
+            yield row
+        if remaining > 0:
+            remaining -= len(rows)
+    if not cursor.errors():
+        _merge_cursors.checkin(cursor_key, cursor)
+
+
+def _ndjson_rows(meta: dict, rows, library_errors):
+    """Stream meta, then each row, then a done line as newline-delimited JSON.
+
+    library_errors() is called after the last row, so libraries that failed while rows were
+    being merged are reported too.
+    """
+
+    def _generate():
+        yield json.dumps({"meta": meta}) + "\n"
+        count = 0
+        try:
+            for row in rows:
+                yield json.dumps(row) + "\n"
+                count += 1
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+            return
+        yield json.dumps({"done": True, "count": count, "library_errors": library_errors()}) + "\n"
+
+    return Response(stream_with_context(_generate()), mimetype="application/x-ndjson")
+
+
 @api_bp.route("/library/combined")
+@conditional
 def api_library_combined():
     """Return media from all libraries of one type (movie/show/artist), merged and sorted.
     Each item includes library_name (Tautulli section_name) and section_id for remove flow.
+
+    length=-1 returns every row from start on. With format=ndjson the response is streamed
+    as newline-delimited JSON: a {"meta": {...}} line (totals, libraries, library_errors),
+    one line per row as it is merged, then {"done": true, "count": n, "library_errors": [...]}.
     """
     section_type = (request.args.get("type") or "movie").lower()
     if section_type not in ("movie", "show", "artist"):
@@ -290,112 +273,179 @@ def api_library_combined():
         order_dir = "asc"
     # Optional: force show the "calculating file sizes" banner for testing (e.g. ?show_calculating_alert=1)
     force_calculating_alert = request.args.get("show_calculating_alert", "").strip() in ("1", "true", "yes")
+    streaming = request.args.get("format", "").strip().lower() == "ndjson"
     try:
-        libs = tautulli.get_tautulli_libraries()
-        if not isinstance(libs, list):
-            libs = []
-        # Only libraries of this type
-        libs_of_type = [l for l in libs if (l.get("section_type") or "").lower() == section_type]
+        # Tautulli's libraries of this type (cached while the library sync is enabled)
+        libs_of_type = library_sync.libraries(section_type)
         if not libs_of_type:
-            return jsonify({
-                "data": [],
+            empty = {
                 "recordsFiltered": 0,
                 "recordsTotal": 0,
                 "section_type": section_type,
                 "tautulli_calculating_file_sizes": force_calculating_alert,
-            })
-
-        fetch_per_lib = max(length + start, 50)
-        all_items = []
-        tautulli_calculating_file_sizes = False
-        for lib in libs_of_type:
-            sid = lib.get("section_id")
-            sname = (lib.get("section_name") or "").strip() or "—"
-            try:
-                resp = tautulli.get_library_media_response(
-                    sid,
-                    length=fetch_per_lib,
-                    start=0,
-                    search=search,
-                    order_column=order_column,
-                    order_dir=order_dir,
-                    section_type=section_type,
-                )
-                if tautulli.response_indicates_calculating_file_sizes(resp):
-                    tautulli_calculating_file_sizes = True
-                if resp.get("result") != "success":
-                    continue
-                inner = resp.get("data")
-                if isinstance(inner, dict):
-                    items = inner.get("data") if isinstance(inner.get("data"), list) else []
-                elif isinstance(inner, list):
-                    items = inner
-                else:
-                    items = []
-                for item in items:
-                    if isinstance(item, dict):
-                        item = dict(item)
-                        item["library_name"] = sname
-                        item["section_id"] = str(sid)
-                        all_items.append(item)
-            except (requests.RequestException, ValueError, Exception) as e:
-                err_str = str(e).lower()
-                if "calculating" in err_str and ("file size" in err_str or "file sizes" in err_str or "filesize" in err_str):
-                    tautulli_calculating_file_sizes = True
-                continue
+            }
+            if streaming:
+                return _ndjson_rows(empty, iter(()), lambda: [])
+            return jsonify({"data": [], **empty})
 
+        # Only merge the libraries that pass the library filter
         if library_name_filter:
             want = library_name_filter.strip().lower()
-            all_items = [i for i in all_items if (i.get("library_name") or "").strip().lower() == want]
-
-        # Sort merged list (Tautulli may return timestamps/counts as strings)
-        def sort_key(i):
-            val = i.get(order_column)
-            if order_column == "library_name":
-                return (1, (str(val) or "").strip().lower())
-            if val is None or val == "":
-                return (0, 0) if order_column in ("last_played", "added_at", "play_count", "file_size") else (1, "")
-            if order_column in ("last_played", "added_at", "play_count", "file_size"):
-                try:
-                    n = int(val) if not isinstance(val, (int, float)) else val
-                    return (0, n)
-                except (TypeError, ValueError):
-                    return (1, str(val))
-            return (1, (str(val) or "").lower())
-
+            wanted = [l for l in libs_of_type if ((l.get("section_name") or "").strip() or "—").lower() == want]
+        else:
+            wanted = libs_of_type
         reverse = order_dir == "desc"
-        all_items.sort(key=sort_key, reverse=reverse)
-        total = len(all_items)
-        page_items = all_items[start : start + length]
-
-        # File size normalization for shows
-        if section_type == "show":
-            for item in page_items:
-                if isinstance(item, dict):
-                    fs, tfs = item.get("file_size"), item.get("total_file_size")
-                    if (fs is None or fs == 0 or fs == "") and tfs is not None:
-                        item["file_size"] = tfs
-                    if (item.get("file_size") or 0) == 0:
-                        for key in ("total_file_size", "size", "total_size"):
-                            v = item.get(key)
-                            if v is not None and v != "":
-                                try:
-                                    n = int(v) if isinstance(v, str) else v
-                                    if n > 0:
-                                        item["file_size"] = n
-                                        break
-                                except (TypeError, ValueError):
-                                    pass
+        chunk_size = max(length, LIBRARY_MERGE_CHUNK)
+        # (section_id, library_name, error) of libraries left out of the page
+        failed = []
+        tautulli_calculating_file_sizes = False
+        # Merge cursor of the no-cache path (its sources report their own errors)
+        cursor = None
+
+        def _annotate(rows, sname, sid):
+            # Tautulli sorted these by the raw file_size: keep it for the merge (see _cursor_rows)
+            return [
+                normalize(dict(i, library_name=sname, section_id=str(sid)), size_fallback=False)
+                for i in rows if isinstance(i, dict)
+            ]
+
+        if library_sync.covers(l.get("section_id") for l in wanted):
+            # Every library is mirrored locally: one SQLite query, no Tautulli calls. Until then
+            # (first sync pending, failed or calculating) the snapshot/live path below is used
+            page_items, total = library_sync.stream(
+                [l.get("section_id") for l in wanted],
+                search=search,
+                order_column=order_column,
+                order_dir=order_dir,
+                start=start,
+                length=length,
+            )
+        else:
+            snapshots_ready = False
+            # Tautulli sorts shows by their raw file_size, which is empty for most shows (their size
+            # is a fallback column): read those sections whole and sort them locally instead
+            whole_sections = section_type == "show" and order_column == "file_size"
+            if library_cache.enabled():
+                # Libraries without a fresh snapshot are fetched in the background; until all are
+                # ready, pages come live from Tautulli instead of waiting for whole sections
+                cold = [l for l in wanted if not library_cache.ready(l.get("section_id"))]
+                for lib in cold:
+                    library_cache.fill(lib.get("section_id"), section_type)
+                snapshots_ready = not cold
+            if snapshots_ready or whole_sections:
+                # Sort and page the snapshots as columns; dicts only for the returned page
+                def _columns(lib):
+                    return library_cache.get_section_columns(
+                        lib.get("section_id"), search=search, section_type=section_type
+                    )
 
+                # Fetch every library of this type at once; slow libraries are reported, not waited on
+                fetched = fan_out(wanted, _columns, max_workers=LIBRARY_FETCH_WORKERS, timeout=LIBRARY_FETCH_TIMEOUT)
+                parts = []
+                for res in fetched:
+                    lib = res["item"]
+                    sid = str(lib.get("section_id"))
+                    sname = (lib.get("section_name") or "").strip() or "—"
+                    if res["error"] is not None:
+                        failed.append((sid, sname, res["error"]))
+                        continue
+                    columns, calculating = res["result"]
+                    if calculating:
+                        tautulli_calculating_file_sizes = True
+                    parts.append((columns, sname, sid))
+                combined = CombinedColumns(parts)
+                order = combined.order(order_column, reverse)
+                page_items = combined.iter_page(order, start, length)
+                total = len(order)
+            else:
+                # No snapshot (yet): pull pre-sorted pages from Tautulli a chunk at a time and keep the
+                # cursor, so the next page continues where this one stopped
+                tautulli_column = "sort_title" if order_column == "library_name" else order_column
+                cursor_key = (
+                    section_type, search, order_column, order_dir,
+                    tuple((str(l.get("section_id")), library_cache.generation(l.get("section_id"))) for l in wanted),
+                )
+                cursor = _merge_cursors.checkout(cursor_key, start)
+                if cursor is None:
+                    sources = []
+                    for lib in wanted:
+                        sid = lib.get("section_id")
+                        sname = (lib.get("section_name") or "").strip() or "—"
+                        hidden = library_cache.tombstones(sid)
+                        source = MergeSource(
+                            sname, None, chunk_size, source_id=str(sid),
+                            exclude=(lambda row, hidden=hidden: str(row.get("rating_key")) in hidden) if hidden else None,
+                        )
+
+                        def _fetch(offset, count, sid=sid, sname=sname, source=source):
+                            rows, total, calculating = tautulli.get_library_media_page(
+                                sid,
+                                start=offset,
+                                length=count,
+                                search=search,
+                                order_column=tautulli_column,
+                                order_dir=order_dir,
+                                section_type=section_type,
+                                timeout=LIBRARY_FETCH_TIMEOUT,
+                            )
+                            if calculating:
+                                source.flags.add("calculating")
+                            return _annotate(rows, sname, sid), total
+
+                        source.fetch = _fetch
+                        sources.append(source)
+                    # First chunk of every library at once; slow libraries are reported, not waited on
+                    primed = fan_out(
+                        sources,
+                        lambda src: src.fetch(0, src.chunk_size),
+                        max_workers=LIBRARY_FETCH_WORKERS,
+                        timeout=LIBRARY_FETCH_TIMEOUT,
+                    )
+                    for res in primed:
+                        if res["error"] is not None:
+                            res["item"].fail(res["error"])
+                        else:
+                            res["item"].accept(*res["result"])
+                    cursor = MergeCursor(sources, sort_key_for(order_column), reverse)
+                cursor.skip(start - cursor.emitted)
+                page_items = _cursor_rows(cursor, cursor_key, length, chunk_size)
+                total = cursor.total()
+
+        def _library_errors():
+            """library_errors entries for the libraries left out so far, and the calculating flag."""
+            calculating = tautulli_calculating_file_sizes or force_calculating_alert
+            left_out = list(failed)
+            if cursor is not None:
+                for source in cursor.sources:
+                    if "calculating" in source.flags:
+                        calculating = True
+                    if source.error:
+                        left_out.append((source.source_id, source.name, source.error))
+            errors = []
+            for sid, sname, error in left_out:
+                err_str = error.lower()
+                if "calculating" in err_str and ("file size" in err_str or "file sizes" in err_str or "filesize" in err_str):
+                    calculating = True
+                errors.append({"section_id": sid, "library_name": sname, "error": error})
+            return errors, calculating
+
+        if not streaming:
+            page_items = list(page_items)
+            if cursor is not None:
+                # Rows hidden by tombstones are only counted once they have been read
+                total = cursor.total()
+        library_errors, calculating = _library_errors()
         out = {
-            "data": page_items,
             "recordsFiltered": total,
             "recordsTotal": total,
             "section_type": section_type,
             "libraries": [l.get("section_name") or "" for l in libs_of_type],
-            "tautulli_calculating_file_sizes": tautulli_calculating_file_sizes or force_calculating_alert,
+            "library_errors": library_errors,
+            "tautulli_calculating_file_sizes": calculating,
         }
-        return jsonify(out)
+        if streaming:
+            return _ndjson_rows(out, page_items, lambda: _library_errors()[0])
+        return jsonify({"data": page_items, **out})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -407,10 +457,12 @@ def api_overseerr_info():
     Expects JSON:
     {
         "rating_keys": ["123", "456", ...],
-        "media_type": "movie" | "show"
+        "media_type": "movie" | "show",
+        "guids": {"123": "com.plexapp.agents.themoviedb://...", ...}   (optional — from library rows)
     }
 
-    Returns a dict keyed by rating_key with requestor info.
+    Returns a dict keyed by rating_key with requestor info. Lookups not finished within
+    RESOLVER_TIMEOUT seconds come back with "pending": true; ask again for those keys.
     """
     try:
         body = request.get_json(force=True, silent=True) or {}
@@ -418,52 +470,18 @@ def api_overseerr_info():
         return jsonify({"error": "Invalid JSON body"}), 400
     rating_keys = body.get("rating_keys", [])
     media_type = body.get("media_type", "movie")
+    guids = body.get("guids") if isinstance(body.get("guids"), dict) else {}
 
     if not OVERSEERR_API_KEY:
         return jsonify({})
 
-    def _lookup(rk):
-        result = {"rating_key": rk, "requested_by": None}
-        try:
-            meta = tautulli.get_metadata(rk)
-            ids = extract_ids(meta)
-            tmdb_id = ids.get("tmdb")
-            if not tmdb_id:
-                return result
-
-            media = overseerr.overseerr_find_media(tmdb_id, media_type)
-            if not media:
-                return result
-
-            media_info = media.get("mediaInfo")
-            if not media_info:
-                return result
-
-            reqs = media_info.get("requests") or []
-            requestors = []
-            for req in reqs:
-                user = req.get("requestedBy") or {}
-                name = (
-                    user.get("displayName")
-                    or user.get("plexUsername")
-                    or user.get("email")
-                    or None
-                )
-                if name and name not in requestors:
-                    requestors.append(name)
-            if requestors:
-                result["requested_by"] = ", ".join(requestors)
-        except Exception:
-            pass
-        return result
-
     try:
-        info = {}
-        with ThreadPoolExecutor(max_workers=8) as pool:
-            futures = {pool.submit(_lookup, rk): rk for rk in rating_keys}
-            for fut in as_completed(futures):
-                res = fut.result()
-                info[res["rating_key"]] = res
+        info = resolver.resolve_requestors(
+            rating_keys,
+            media_type,
+            guids={str(k): v for k, v in guids.items() if isinstance(v, str)},
+            timeout=RESOLVER_TIMEOUT,
+        )
         return jsonify(info)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -476,16 +494,9 @@ def api_item_ids():
     if not rating_key:
         return jsonify({"error": "rating_key required"}), 400
     try:
-        meta = tautulli.get_metadata(rating_key)
-        if isinstance(meta, list) and meta:
-            meta = meta[0]
-        if isinstance(meta, dict) and "metadata" in meta and isinstance(meta["metadata"], dict):
-            meta = meta["metadata"]
-        if not isinstance(meta, dict):
-            meta = {}
-        ids = extract_ids(meta)
+        ids = id_cache.lookup(rating_key)
         return jsonify({
-            "guid": meta.get("guid") or meta.get("grandparent_guid"),
+            "guid": ids["guid"],
             "tmdb_id": ids["tmdb"],
             "tvdb_id": ids["tvdb"],
             "imdb_id": ids["imdb"],
@@ -497,35 +508,35 @@ def api_item_ids():
 
 @api_bp.route("/refresh-plex", methods=["POST"])
 def api_refresh_plex():
-    """Batch refresh Plex libraries for given section_ids (called after all removals complete).
+    """Refresh Plex libraries for given section_ids through the refresh scheduler.
+
+    Kept for older clients: it starts (or joins) the same job as POST /api/refresh, so
+    the debounce window and the one-scan-per-section rule apply here too.
 
     Expects JSON:
     {
         "section_ids": ["1", "2", ...]  or [{"section_id": "1", "section_type": "movie"}, ...]
     }
+
+    Returns 202 with the job (poll GET /api/refresh/<id>), plus the queued section ids in
+    "refreshed" and an empty "errors" list as before.
     """
     if not PLEX_URL or not PLEX_TOKEN:
         return jsonify({"error": "Plex not configured"}), 400
     body = request.get_json(force=True, silent=True) or {}
-    section_ids = body.get("section_ids", [])
-    if not section_ids:
-        return jsonify({"refreshed": []})
-    refreshed = []
-    errors = []
-    for item in section_ids:
+    sections = []
+    for item in body.get("section_ids") or []:
         # Handle both string (legacy) and dict formats
         if isinstance(item, dict):
-            sid = str(item.get("section_id", ""))
+            sid, section_type = str(item.get("section_id") or ""), item.get("section_type")
         else:
-            sid = str(item)
-        if not sid:
-            continue
-        try:
-            plex_svc.plex_refresh_library(sid)
-            refreshed.append(sid)
-        except Exception as e:
-            errors.append({"section_id": sid, "error": str(e)})
-    return jsonify({"refreshed": refreshed, "errors": errors})
+            sid, section_type = str(item), None
+        if sid:
+            sections.append({"section_id": sid, "section_type": section_type})
+    if not sections:
+        return jsonify({"refreshed": []})
+    job = refresh.start(sections)
+    return jsonify({**job, "refreshed": [s["section_id"] for s in sections], "errors": []}), 202
 
 
 @api_bp.route("/refresh-tautulli", methods=["POST"])
@@ -550,6 +561,7 @@ def api_refresh_tautulli():
             continue
         try:
             if tautulli.refresh_tautulli_media_info(str(sid), section_type):
+                library_cache.invalidate(sid)
                 refreshed.append(sid)
             else:
                 errors.append({"section_id": sid, "error": "Refresh failed"})
@@ -558,6 +570,39 @@ def api_refresh_tautulli():
     return jsonify({"refreshed": refreshed, "errors": errors})
 
 
+@api_bp.route("/refresh", methods=["POST"])
+def api_refresh_start():
+    """Start a Plex scan + Tautulli refresh job for sections changed by removals.
+
+    Expects JSON:
+    {
+        "sections": [{"section_id": "1", "section_type": "movie"}, ...]
+    }
+
+    Returns 202 with the job ({"id", "state", ...}); poll GET /api/refresh/<id> until
+    "state" is "done" or "failed". Tautulli is refreshed as soon as Plex has finished
+    scanning. Requests arriving within the debounce window (e.g. from another user) get
+    the same job back (see services.refresh).
+    """
+    body = request.get_json(force=True, silent=True) or {}
+    sections = []
+    for section in body.get("sections") or []:
+        if isinstance(section, dict) and section.get("section_id"):
+            sections.append({"section_id": str(section["section_id"]), "section_type": section.get("section_type")})
+    if not sections:
+        return jsonify({"error": "No sections given"}), 400
+    return jsonify(refresh.start(sections)), 202
+
+
+@api_bp.route("/refresh/<job_id>")
+def api_refresh_status(job_id):
+    """Return the state of a refresh job started with POST /api/refresh."""
+    job = refresh.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown refresh job"}), 404
+    return jsonify(job)
+
+
 @api_bp.route("/remove", methods=["POST"])
 def api_remove():
     """
@@ -577,178 +622,55 @@ def api_remove():
     }
     """
     body = request.get_json(force=True)
-    rating_key = body.get("rating_key")
-    section_id = body.get("section_id")
-    media_type = body.get("media_type", "movie")
-    guid = body.get("guid")
-    title = body.get("title")
-    year = body.get("year")
-    tmdb_id = body.get("tmdb_id")
-    tvdb_id = body.get("tvdb_id")
-    imdb_id = body.get("imdb_id")
-    mbid = body.get("mbid")
-
-    # Resolve IDs from guid first (from library item); then from Tautulli get_metadata
-    if guid:
-        ids_from_guid = extract_ids({"guid": guid})
-        tmdb_id = tmdb_id or ids_from_guid["tmdb"]
-        tvdb_id = tvdb_id or ids_from_guid["tvdb"]
-        imdb_id = imdb_id or ids_from_guid["imdb"]
-        mbid = mbid or ids_from_guid["mbid"]
-
-    results = {"overseerr": None, "tautulli": None}
-
     try:
-        if rating_key:
-            needs_resolve = (
-                (not tmdb_id and not imdb_id)
-                or (media_type == "show" and not tvdb_id)
-                or (media_type == "artist" and not mbid)
-            )
-            if needs_resolve:
-                meta_raw = tautulli.get_metadata(rating_key)
-                # Pass raw response so deep scan finds guids anywhere in the structure
-                ids = extract_ids(meta_raw)
-                tmdb_id = tmdb_id or ids["tmdb"]
-                tvdb_id = tvdb_id or ids["tvdb"]
-                imdb_id = imdb_id or ids["imdb"]
-                mbid = mbid or ids["mbid"]
-
-                # Fallback: find item in library media by rating_key and use its guid
-                if (not tmdb_id and not imdb_id and media_type == "movie") or (
-                    media_type == "show" and not tvdb_id
-                ):
-                    try:
-                        if section_id:
-                            lib_data = tautulli.get_library_media(
-                                section_id,
-                                length=500,
-                                start=0,
-                                section_type=media_type,
-                            )
-                            items = lib_data.get("data") if isinstance(lib_data.get("data"), list) else []
-                            for item in items:
-                                if isinstance(item, dict) and str(item.get("rating_key")) == str(rating_key):
-                                    ids2 = extract_ids(item)
-                                    tmdb_id = tmdb_id or ids2["tmdb"]
-                                    tvdb_id = tvdb_id or ids2["tvdb"]
-                                    imdb_id = imdb_id or ids2["imdb"]
-                                    mbid = mbid or ids2["mbid"]
-                                    break
-                    except Exception:
-                        pass
-
-        has_ids = tmdb_id or tvdb_id or imdb_id or mbid
-
-        if not has_ids:
-            results["overseerr"] = "skipped (no IDs resolved)"
-        elif media_type == "artist":
-            results["overseerr"] = "skipped (music)"
-        else:
-            try:
-                if tmdb_id:
-                    media = overseerr.overseerr_find_media(tmdb_id, media_type)
-                    if media and media.get("mediaInfo"):
-                        media_id = media["mediaInfo"]["id"]
-                        overseerr.overseerr_delete_media(media_id)
-                        results["overseerr"] = "removed"
-                    else:
-                        results["overseerr"] = "not_found"
-                else:
-                    results["overseerr"] = "skipped (no TMDB id)"
-            except Exception as e:
-                results["overseerr"] = f"error: {e}"
-
-        if not has_ids:
-            skip_msg = "skipped (no IDs resolved)"
-            results["arr"] = skip_msg
-            if media_type == "movie":
-                # Fallback: find movie in Radarr by title (+ year) and delete
-                if title and str(title).strip():
-                    for i, inst in enumerate(RADARR_INSTANCES):
-                        key = f"radarr_{i + 1}"
-                        try:
-                            movie = radarr.radarr_find_movie_by_title(inst, title, year)
-                            if movie:
-                                radarr.radarr_delete_movie(inst, movie["id"], delete_files=True)
-                                results[key] = "removed"
-                            else:
-                                results[key] = "not_found"
-                        except Exception as e:
-                            results[key] = f"error: {e}"
-                else:
-                    for i in range(len(RADARR_INSTANCES)):
-                        results[f"radarr_{i + 1}"] = skip_msg
-            elif media_type == "show":
-                for i in range(len(SONARR_INSTANCES)):
-                    results[f"sonarr_{i + 1}"] = skip_msg
-            elif media_type == "artist":
-                for i in range(len(LIDARR_INSTANCES)):
-                    results[f"lidarr_{i + 1}"] = skip_msg
-        elif media_type == "movie":
-            for i, inst in enumerate(RADARR_INSTANCES):
-                key = f"radarr_{i + 1}"
-                try:
-                    movie = radarr.radarr_find_movie(
-                        inst, tmdb_id=tmdb_id, imdb_id=imdb_id
-                    )
-                    if movie:
-                        radarr.radarr_delete_movie(inst, movie["id"], delete_files=True)
-                        results[key] = "removed"
-                    else:
-                        results[key] = "not_found"
-                except Exception as e:
-                    results[key] = f"error: {e}"
-        elif media_type == "artist":
-            for i, inst in enumerate(LIDARR_INSTANCES):
-                key = f"lidarr_{i + 1}"
-                try:
-                    if mbid:
-                        artist = lidarr.lidarr_find_artist(inst, mbid)
-                        if artist:
-                            lidarr.lidarr_delete_artist(
-                                inst, artist["id"], delete_files=True
-                            )
-                            results[key] = "removed"
-                        else:
-                            results[key] = "not_found"
-                    else:
-                        results[key] = "skipped (no MusicBrainz id)"
-                except Exception as e:
-                    results[key] = f"error: {e}"
-        else:
-            for i, inst in enumerate(SONARR_INSTANCES):
-                key = f"sonarr_{i + 1}"
-                try:
-                    series = None
-                    if tvdb_id:
-                        series = sonarr.sonarr_find_series(inst, tvdb_id)
-                    if not series and tmdb_id:
-                        series = sonarr.sonarr_find_series_by_tmdb(inst, tmdb_id)
-                    if series:
-                        sonarr.sonarr_delete_series(
-                            inst, series["id"], delete_files=True
-                        )
-                        results[key] = "removed"
-                    else:
-                        results[key] = "not_found"
-                except Exception as e:
-                    results[key] = f"error: {e}"
+        results = removal.remove_item(body)
+        return jsonify(results)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Plex refresh handled by batch endpoint after all items are processed
-        arr_succeeded = any(
-            v == "removed"
-            for k, v in results.items()
-            if k.startswith("radarr_") or k.startswith("sonarr_") or k.startswith("lidarr_")
-        )
-        if arr_succeeded and section_id:
-            results["_section_id_for_refresh"] = section_id
-        results["plex"] = "pending" if arr_succeeded and section_id else "skipped"
 
-        # Tautulli removal disabled — items will disappear after Plex scans and Tautulli refreshes media info
-        results["tautulli"] = "skipped"
+@api_bp.route("/remove/batch", methods=["POST"])
+def api_remove_batch():
+    """Remove many items at once and stream per-item results as NDJSON.
 
-        return jsonify(results)
+    Expects JSON:
+    {
+        "items": [{<same keys as /api/remove>}, ...]
+    }
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    Items run concurrently (REMOVE_BATCH_WORKERS), with at most REMOVE_SERVICE_CONCURRENCY
+    calls in flight per upstream service. Each line of the response is one finished item:
+    {"index": 0, "rating_key": "...", "result": {...}} or {"index": 0, "rating_key": "...", "error": "..."},
+    in completion order, followed by a final
+    {"done": true, "sections": [{"section_id": "1", "section_type": "movie"}, ...]}
+    listing the sections that need a Plex/Tautulli refresh.
+    """
+    body = request.get_json(force=True, silent=True) or {}
+    items = body.get("items")
+    if not isinstance(items, list):
+        return jsonify({"error": "items must be a list"}), 400
+    items = [i for i in items if isinstance(i, dict)]
+
+    def _generate():
+        sections = {}
+        with ThreadPoolExecutor(max_workers=max(1, REMOVE_BATCH_WORKERS)) as pool:
+            futures = {pool.submit(removal.remove_item, item): idx for idx, item in enumerate(items)}
+            for fut in as_completed(futures):
+                idx = futures[fut]
+                item = items[idx]
+                line = {"index": idx, "rating_key": item.get("rating_key")}
+                try:
+                    result = fut.result()
+                    line["result"] = result
+                    sid = result.get("_section_id_for_refresh")
+                    if sid:
+                        sections[str(sid)] = item.get("media_type", "movie")
+                except Exception as e:
+                    line["error"] = str(e)
+                yield json.dumps(line) + "\n"
+        yield json.dumps({
+            "done": True,
+            "sections": [{"section_id": sid, "section_type": st} for sid, st in sections.items()],
+        }) + "\n"
+
+    return Response(stream_with_context(_generate()), mimetype="application/x-ndjson")
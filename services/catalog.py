@@ -0,0 +1,153 @@
+"""In-memory catalog index per *arr instance.
+
+Looking an item up by IMDB id, title, TMDB id (Sonarr) or MusicBrainz id means scanning
+the whole /movie, /series or /artist list. Instead each instance's catalog is downloaded
+once, kept for ARR_CATALOG_TTL seconds, and indexed by the keys the find functions need,
+so a bulk removal does one catalog download per instance rather than one per item.
+Deleted records are dropped from the index right away (discard). A lookup that misses
+(find) reloads the catalog once, so items added since the download are still found.
+"""
+import threading
+import time
+
+from config import ARR_CATALOG_TTL
+from utils.singleflight import SingleFlight
+
+# Only these fields are kept per record; the find functions and callers need nothing else
+KEEP_FIELDS = (
+    "id", "title", "originalTitle", "year", "tmdbId", "imdbId", "tvdbId",
+    "foreignArtistId", "artistName",
+)
+# A lookup that misses an index older than this many seconds reloads it once
+RELOAD_AFTER_MISS = 10
+
+
+class CatalogIndex:
+    """Records of one instance plus dict indexes built from key functions.
+
+    keys maps an index name to fn(record) -> key (or None to leave the record out).
+    lookup() returns matching records in catalog order.
+    """
+
+    def __init__(self, records: list[dict], keys: dict):
+        self.loaded_at = time.monotonic()
+        self.records = records
+        self._keys = keys
+        self._indexes = {name: {} for name in keys}
+        for rec in records:
+            for name, fn in keys.items():
+                key = fn(rec)
+                if key is not None and key != "":
+                    self._indexes[name].setdefault(key, []).append(rec)
+
+    def age(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    def lookup(self, name: str, key) -> list[dict]:
+        return self._indexes[name].get(key, [])
+
+    def first(self, name: str, key) -> dict | None:
+        hits = self._indexes[name].get(key)
+        return hits[0] if hits else None
+
+    def items(self, name: str):
+        """Iterate (key, records) of one index, e.g. to scan normalized titles without re-normalizing."""
+        return list(self._indexes[name].items())
+
+    def discard(self, record_id) -> None:
+        """Drop a deleted record from the records list and every index."""
+        rid = str(record_id)
+        gone = [r for r in self.records if str(r.get("id")) == rid]
+        if not gone:
+            return
+        self.records = [r for r in self.records if str(r.get("id")) != rid]
+        for rec in gone:
+            for name, fn in self._keys.items():
+                key = fn(rec)
+                bucket = self._indexes[name].get(key)
+                if not bucket:
+                    continue
+                remaining = [r for r in bucket if r is not rec]
+                if remaining:
+                    self._indexes[name][key] = remaining
+                else:
+                    del self._indexes[name][key]
+
+
+_lock = threading.Lock()
+# Catalog downloads in progress, by (service, url)
+_loads = SingleFlight()
+_indexes: dict[tuple[str, str], CatalogIndex] = {}
+
+
+def slim(record: dict) -> dict:
+    """Keep only the fields in KEEP_FIELDS."""
+    return {k: record[k] for k in KEEP_FIELDS if k in record}
+
+
+def loaded(service: str, instance: dict) -> CatalogIndex | None:
+    """The instance's index if it is loaded and not expired; never downloads anything."""
+    index = _indexes.get((service, instance["url"]))
+    if index is not None and index.age() < ARR_CATALOG_TTL:
+        return index
+    return None
+
+
+def get_index(service: str, instance: dict, loader, keys: dict, max_age: float | None = None) -> CatalogIndex:
+    """Return the instance's catalog index, loading it with loader(instance) when missing or
+    older than max_age seconds (default ARR_CATALOG_TTL).
+
+    loader may return an iterator; each record is cut down to KEEP_FIELDS as it arrives, so
+    a streamed catalog is never held in full.
+
+    Concurrent callers for the same instance share a single download and its index.
+    """
+    if max_age is None:
+        max_age = ARR_CATALOG_TTL
+    cache_key = (service, instance["url"])
+    index = _indexes.get(cache_key)
+    if index is not None and index.age() < max_age:
+        return index
+
+    def _load():
+        # A download that finished just before this call started already counts
+        index = _indexes.get(cache_key)
+        if index is not None and index.age() < max_age:
+            return index
+        records = [slim(r) for r in loader(instance) if isinstance(r, dict)]
+        index = _indexes[cache_key] = CatalogIndex(records, keys)
+        return index
+
+    return _loads.do(cache_key, _load)
+
+
+def find(service: str, instance: dict, loader, keys: dict, match):
+    """match(index) on the instance's catalog index (None when nothing matches).
+
+    On a miss an index older than RELOAD_AFTER_MISS seconds is reloaded once and matched
+    again, since the record may have been added after the download.
+    """
+    index = get_index(service, instance, loader, keys)
+    found = match(index)
+    if found is None and index.age() >= RELOAD_AFTER_MISS:
+        found = match(get_index(service, instance, loader, keys, max_age=RELOAD_AFTER_MISS))
+    return found
+
+
+def discard(service: str, instance: dict, record_id) -> None:
+    """Remove a deleted record from the cached index (if the instance is loaded)."""
+    index = _indexes.get((service, instance["url"]))
+    if index is not None:
+        with _lock:
+            index.discard(record_id)
+
+
+def invalidate(service: str | None = None, instance: dict | None = None) -> None:
+    """Forget cached catalogs (all, one service, or one instance) so the next lookup reloads."""
+    with _lock:
+        for key in list(_indexes):
+            if service is not None and key[0] != service:
+                continue
+            if instance is not None and key[1] != instance["url"]:
+                continue
+            del _indexes[key]
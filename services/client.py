@@ -0,0 +1,79 @@
+"""Shared HTTP sessions for the service clients.
+
+Each upstream service (tautulli, overseerr, plex, radarr, sonarr, lidarr) gets one
+requests.Session with a keep-alive connection pool, so repeated calls to the same
+host reuse TCP/TLS connections instead of opening a new one per request.
+Sessions are created lazily and shared by every thread in the worker process.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE
+
+_sessions: dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def get_session(service: str) -> requests.Session:
+    """Return the pooled session for a service name (created on first use).
+
+    pool_maxsize is the number of keep-alive connections kept per host; it should be
+    at least the number of threads that call the same host at once (e.g. the
+    ThreadPoolExecutor in /api/overseerr-info) so no connection is discarded.
+    """
+    session = _sessions.get(service)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(service)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[service] = session
+    return session
+
+
+def pool_stats() -> dict:
+    """Return connection reuse counters per service and host.
+
+    For each pool: "connections" is how many TCP connections were opened, "requests"
+    how many HTTP requests were sent; "reused" is the difference, i.e. requests that
+    went over an already-open keep-alive connection.
+    """
+    out = {}
+    with _lock:
+        sessions = dict(_sessions)
+    for service, session in sessions.items():
+        hosts = {}
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                made = pool.num_connections
+                sent = pool.num_requests
+                hosts[host] = {
+                    "connections": made,
+                    "requests": sent,
+                    "reused": max(sent - made, 0),
+                }
+        out[service] = {
+            "connections": sum(h["connections"] for h in hosts.values()),
+            "requests": sum(h["requests"] for h in hosts.values()),
+            "reused": sum(h["reused"] for h in hosts.values()),
+            "hosts": hosts,
+        }
+    return out
@@ -0,0 +1,172 @@
+"""Service health checks for /api/status, probed in the background.
+
+All services (Tautulli, Seerr, every Radarr/Sonarr/Lidarr instance) are checked at the
+same time, so one dead instance costs STATUS_PROBE_TIMEOUT seconds once instead of adding
+10 s per service to every page load. A daemon thread per worker re-checks them every
+STATUS_PROBE_INTERVAL seconds, starting with the app; /api/status returns the last result
+without waiting, with each service's latency and the time of its last successful check.
+Until the first check of a worker has finished, every service is reported as "checking".
+"""
+import os
+import threading
+import time
+
+from config import (
+    LIDARR_INSTANCES,
+    OVERSEERR_API_KEY,
+    OVERSEERR_URL,
+    RADARR_INSTANCES,
+    SONARR_INSTANCES,
+    STAT,
+    STATUS_PROBE_INTERVAL,
+    STATUS_PROBE_TIMEOUT,
+)
+from services import overseerr, tautulli
+from services.client import get_session
+from utils.fanout import fan_out
+
+_lock = threading.Lock()
+# service key -> status entry of the last check
+_state: dict[str, dict] = {}
+_checked_at = 0.0
+_thread_pid = None
+
+
+def _check_tautulli() -> tuple[str, str]:
+    info = tautulli.tautulli_get("get_tautulli_info", timeout=STATUS_PROBE_TIMEOUT)
+    name = (
+        info.get("tautulli_product")
+        or info.get("product")
+        or info.get("app_name")
+        or "Tautulli"
+    )
+    return info.get("tautulli_version", ""), name
+
+
+def _check_overseerr() -> tuple[str, str]:
+    if not OVERSEERR_API_KEY:
+        raise ValueError("API key not set")
+    r = get_session("overseerr").get(
+        f"{OVERSEERR_URL}/api/v1/status",
+        headers=overseerr.overseerr_headers(),
+        timeout=STATUS_PROBE_TIMEOUT,
+    )
+    r.raise_for_status()
+    data = r.json()
+    name = (
+        data.get("applicationTitle")
+        or data.get("title")
+        or data.get("name")
+        or "Seerr"
+    )
+    return data.get("version", ""), name
+
+
+def _arr_check(service: str, inst: dict, api_version: str):
+    def check() -> tuple[str, str]:
+        r = get_session(service).get(
+            f"{inst['url']}/api/{api_version}/system/status",
+            params={"apikey": inst["api_key"]},
+            timeout=STATUS_PROBE_TIMEOUT,
+        )
+        r.raise_for_status()
+        data = r.json()
+        name = (
+            data.get("instanceName")
+            or data.get("appName")
+            or data.get("name")
+            or inst["name"]
+        )
+        return data.get("version", ""), name
+
+    return check
+
+
+def _checks() -> list[tuple[str, object]]:
+    """(service key, check function) for every configured service; checks return (version, name)."""
+    checks = [("tautulli", _check_tautulli), ("overseerr", _check_overseerr)]
+    for service, instances, api_version in (
+        ("radarr", RADARR_INSTANCES, "v3"),
+        ("sonarr", SONARR_INSTANCES, "v3"),
+        ("lidarr", LIDARR_INSTANCES, "v1"),
+    ):
+        for i, inst in enumerate(instances):
+            checks.append((f"{service}_{i + 1}", _arr_check(service, inst, api_version)))
+    return checks
+
+
+def _timed(check):
+    started = time.monotonic()
+    try:
+        return check(), None, time.monotonic() - started
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__, time.monotonic() - started
+
+
+def check_all() -> dict:
+    """Check every service concurrently now, store the result, and return it.
+
+    Each value is {"status": "ok", "version", "name", "latency_ms", "checked_at",
+    "last_success"} or {"status": "error", "error", "latency_ms", "checked_at",
+    "last_success"}; times are Unix timestamps and last_success is None if the service
+    has not answered since the worker started.
+    """
+    global _checked_at
+    checks = _checks()
+    outcomes = fan_out(checks, lambda c: _timed(c[1]), max_workers=len(checks), timeout=STATUS_PROBE_TIMEOUT + 2)
+    now = time.time()
+    state = {}
+    for outcome in outcomes:
+        key = outcome["item"][0]
+        value, error, elapsed = outcome["result"] or (None, outcome["error"], STATUS_PROBE_TIMEOUT)
+        previous = _state.get(key) or {}
+        if error is None:
+            version, name = value
+            state[key] = {"status": "ok", "version": version, "name": name, "last_success": now}
+        else:
+            state[key] = {"status": "error", "error": error, "last_success": previous.get("last_success")}
+        state[key]["latency_ms"] = round(elapsed * 1000)
+        state[key]["checked_at"] = now
+    with _lock:
+        _state.clear()
+        _state.update(state)
+        _checked_at = time.monotonic()
+    return dict(state)
+
+
+def _run() -> None:
+    while True:
+        try:
+            check_all()
+        except Exception:
+            pass
+        time.sleep(STATUS_PROBE_INTERVAL)
+
+
+def start() -> None:
+    """Start this worker's probe thread (no-op when STAT is off or STATUS_PROBE_INTERVAL is 0)."""
+    global _thread_pid
+    if not STAT or STATUS_PROBE_INTERVAL <= 0 or _thread_pid == os.getpid():
+        return
+    with _lock:
+        if _thread_pid == os.getpid():
+            return
+        _thread_pid = os.getpid()
+    threading.Thread(target=_run, name="status-probe", daemon=True).start()
+
+
+def status(fresh: bool = False) -> dict:
+    """Return the last probe result, checking now if asked, probing is off, or it is stale.
+
+    Before the first probe has finished, every service is {"status": "checking"}.
+    """
+    start()
+    if fresh or STATUS_PROBE_INTERVAL <= 0:
+        return check_all()
+    max_age = 2 * STATUS_PROBE_INTERVAL + STATUS_PROBE_TIMEOUT
+    with _lock:
+        if not _state:
+            return {key: {"status": "checking"} for key, _ in _checks()}
+        if time.monotonic() - _checked_at < max_age:
+            return dict(_state)
+    return check_all()
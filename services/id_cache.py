@@ -0,0 +1,87 @@
+"""Persistent rating_key -> external ID cache (SQLite under DATA_DIR).
+
+extract_ids(get_metadata(rating_key)) hardly ever changes for a given item, so the result
+is stored per rating_key together with the item's guid as a fingerprint. The store
+survives restarts and is shared by every gunicorn worker. An entry is reused until it is
+ID_CACHE_TTL seconds old, or until a caller that knows the item's current guid (e.g.
+from the library row) sees a different one — then the item was re-matched in Plex and
+the IDs are looked up again.
+"""
+import time
+
+from config import ID_CACHE_TTL
+from services import tautulli
+from services.store import connect
+from utils.ids import extract_ids
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ids (
+    rating_key TEXT PRIMARY KEY,
+    guid TEXT,
+    tmdb TEXT,
+    tvdb TEXT,
+    imdb TEXT,
+    mbid TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+_ID_KEYS = ("tmdb", "tvdb", "imdb", "mbid")
+
+
+def _db():
+    return connect("id_cache", _SCHEMA)
+
+
+def _metadata_guid(meta) -> str | None:
+    """Top-level guid of a get_metadata response (dict, list, or {"metadata": {...}})."""
+    if isinstance(meta, list) and meta:
+        meta = meta[0]
+    if isinstance(meta, dict) and isinstance(meta.get("metadata"), dict):
+        meta = meta["metadata"]
+    if not isinstance(meta, dict):
+        return None
+    return meta.get("guid") or meta.get("grandparent_guid") or None
+
+
+def cached(rating_key, guid: str | None = None) -> dict | None:
+    """Return the stored {"guid", "tmdb", "tvdb", "imdb", "mbid"} for a rating_key, or None.
+
+    None when there is no entry, it is older than ID_CACHE_TTL, or guid is given and differs
+    from the stored fingerprint.
+    """
+    if ID_CACHE_TTL <= 0:
+        return None
+    row = _db().execute(
+        "SELECT guid, tmdb, tvdb, imdb, mbid, updated_at FROM ids WHERE rating_key = ?",
+        (str(rating_key),),
+    ).fetchone()
+    if row is None or time.time() - row[5] > ID_CACHE_TTL:
+        return None
+    if guid and row[0] and guid != row[0]:
+        return None
+    return {"guid": row[0], "tmdb": row[1], "tvdb": row[2], "imdb": row[3], "mbid": row[4]}
+
+
+def store(rating_key, guid: str | None, ids: dict) -> None:
+    """Save extracted IDs for a rating_key (entries without any ID are not stored)."""
+    if ID_CACHE_TTL <= 0 or not any(ids.get(k) for k in _ID_KEYS):
+        return
+    _db().execute(
+        "INSERT OR REPLACE INTO ids (rating_key, guid, tmdb, tvdb, imdb, mbid, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (str(rating_key), guid, *(ids.get(k) for k in _ID_KEYS), time.time()),
+    )
+
+
+def lookup(rating_key, guid: str | None = None) -> dict:
+    """Return {"guid", "tmdb", "tvdb", "imdb", "mbid"} for a rating_key, from cache or Tautulli."""
+    hit = cached(rating_key, guid)
+    if hit is not None:
+        return hit
+    meta = tautulli.get_metadata(rating_key)
+    # Pass raw response so deep scan finds guids anywhere in the structure
+    ids = extract_ids(meta)
+    meta_guid = _metadata_guid(meta)
+    store(rating_key, meta_guid, ids)
+    return {"guid": meta_guid, **{k: ids.get(k) for k in _ID_KEYS}}
@@ -0,0 +1,331 @@
+"""Snapshot cache of Tautulli library media lists.
+
+/api/library/combined sorts, searches and pages locally, so it only needs the full media
+list of each section once per LIBRARY_CACHE_TTL. Searches are answered from an inverted
+index over the snapshot's titles (services/search_index.py) instead of asking Tautulli
+per keystroke. Snapshots are keyed by section and kept at two levels:
+
+- in this worker's memory (LRU, bounded by LIBRARY_CACHE_MAX_ROWS rows in total);
+- in the shared SQLite store, so other gunicorn workers reuse a snapshot instead of
+  fetching the section from Tautulli again.
+
+invalidate(section_id) bumps a per-section generation in SQLite; every worker compares it
+before using a snapshot, so removals and refreshes are visible everywhere immediately.
+
+drop_rows(section_id, rating_keys) is what a removal calls instead: the rows are cut out
+of the stored snapshots (other workers reload the trimmed copy from SQLite instead of
+Tautulli) and tombstoned. Tautulli keeps returning removed items until Plex has rescanned
+and Tautulli has refreshed, so tombstoned keys are filtered out of every later fetch. A
+tombstone is deleted as soon as a full fetch of its section no longer contains the key,
+or after TOMBSTONE_TTL seconds.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config import LIBRARY_CACHE_MAX_ROWS, LIBRARY_CACHE_PAGE_SIZE, LIBRARY_CACHE_TTL, TOMBSTONE_TTL
+from services import search_index, tautulli
+from services.store import connect
+from utils.columns import Columns
+from utils.media import normalize
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    section_id TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+-- Earlier versions kept one snapshot per (section_id, search) here
+DROP TABLE IF EXISTS snapshots;
+CREATE TABLE IF NOT EXISTS section_snapshots (
+    section_id TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    rows TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tombstones (
+    section_id TEXT NOT NULL,
+    rating_key TEXT NOT NULL,
+    removed_at REAL NOT NULL,
+    PRIMARY KEY (section_id, rating_key)
+);
+"""
+
+_lock = threading.Lock()
+# section_id -> {"generation", "fetched_at", "rows", "index", "columns"}
+_entries: OrderedDict[str, dict] = OrderedDict()
+_row_count = 0
+# Seconds before a background fill that produced no snapshot is tried again
+_FILL_RETRY = 60
+# Sections being fetched by fill(), and when a fill last came back without a snapshot
+_filling: set[str] = set()
+_fill_failed_at: dict[str, float] = {}
+
+
+def enabled() -> bool:
+    return LIBRARY_CACHE_TTL > 0
+
+
+def _db():
+    return connect("library_cache", _SCHEMA)
+
+
+def generation(section_id) -> int:
+    """Current invalidation counter of a section (changes whenever invalidate() is called)."""
+    row = _db().execute(
+        "SELECT generation FROM generations WHERE section_id = ?", (str(section_id),)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def _remember(key: str, entry: dict) -> None:
+    """Store an entry in the in-process LRU and evict the oldest until under the row bound."""
+    global _row_count
+    with _lock:
+        old = _entries.pop(key, None)
+        if old is not None:
+            _row_count -= len(old["rows"])
+        _entries[key] = entry
+        _row_count += len(entry["rows"])
+        while _row_count > LIBRARY_CACHE_MAX_ROWS and len(_entries) > 1:
+            _, evicted = _entries.popitem(last=False)
+            _row_count -= len(evicted["rows"])
+
+
+def tombstones(section_id) -> set[str]:
+    """Rating keys removed from a section that Tautulli may still return (see drop_rows)."""
+    rows = _db().execute(
+        "SELECT rating_key FROM tombstones WHERE section_id = ? AND removed_at > ?",
+        (str(section_id), time.time() - TOMBSTONE_TTL),
+    ).fetchall()
+    return {r[0] for r in rows}
+
+
+def _expire_tombstones(section_id: str, hidden: set[str], returned: set[str]) -> None:
+    """Delete tombstones of keys a full fetch no longer returned, and expired ones."""
+    gone = hidden - returned
+    db = _db()
+    if gone:
+        db.executemany(
+            "DELETE FROM tombstones WHERE section_id = ? AND rating_key = ?",
+            [(section_id, k) for k in gone],
+        )
+    db.execute("DELETE FROM tombstones WHERE removed_at <= ?", (time.time() - TOMBSTONE_TTL,))
+
+
+def _without(rows: list, keys: set[str]) -> list:
+    if not keys:
+        return rows
+    return [r for r in rows if str(r.get("rating_key")) not in keys]
+
+
+def fetch_section(section_id: str, section_type: str | None) -> tuple[list, bool]:
+    """Page through a whole section from Tautulli. Returns (rows, calculating_file_sizes).
+
+    Rows are normalized (utils.media.normalize) as they arrive.
+    """
+    rows = []
+    calculating = False
+    hidden = tombstones(section_id)
+    returned = set()
+    start = 0
+    while True:
+        page, total, page_calculating = tautulli.get_library_media_page(
+            section_id,
+            start=start,
+            length=LIBRARY_CACHE_PAGE_SIZE,
+            order_column="sort_title",
+            order_dir="asc",
+            section_type=section_type,
+        )
+        calculating = calculating or page_calculating
+        start += len(page)
+        if hidden:
+            returned.update(str(r.get("rating_key")) for r in page)
+        # Copies: the page may be shared with concurrent callers (services/tautulli single-flight)
+        rows.extend(normalize(dict(r)) for r in _without(page, hidden) if isinstance(r, dict))
+        if len(page) < LIBRARY_CACHE_PAGE_SIZE or (total is not None and start >= total):
+            # Only a fetch of the whole section shows that Tautulli dropped an item; a page
+            # cut short by "calculating file sizes" (or without a total) proves nothing
+            complete = not calculating and total is not None and start >= total
+            if hidden and complete:
+                _expire_tombstones(section_id, hidden, returned)
+            return rows, calculating
+
+
+def _matching(entry: dict, search: str) -> set:
+    """Rating keys of the entry's rows matching search (the title index is built on first use)."""
+    index = entry.get("index")
+    if index is None:
+        index = entry["index"] = search_index.build(entry["rows"])
+    return index.search(search)
+
+
+def _cached(sid: str) -> dict | None:
+    """A section's fresh snapshot from this worker's memory or the shared store; never fetches."""
+    now = time.time()
+    current = generation(sid)
+
+    with _lock:
+        entry = _entries.get(sid)
+        if entry is not None:
+            _entries.move_to_end(sid)
+    if entry is not None and entry["generation"] == current and now - entry["fetched_at"] < LIBRARY_CACHE_TTL:
+        return entry
+
+    row = _db().execute(
+        "SELECT generation, fetched_at, rows FROM section_snapshots WHERE section_id = ?", (sid,)
+    ).fetchone()
+    if row is not None and row[0] == current and now - row[1] < LIBRARY_CACHE_TTL:
+        entry = {"generation": row[0], "fetched_at": row[1], "rows": json.loads(row[2])}
+        _remember(sid, entry)
+        return entry
+    return None
+
+
+def _snapshot(sid: str, section_type: str | None) -> tuple[dict, bool]:
+    """Return (entry, calculating_file_sizes) of a section's full snapshot, fetching it when stale."""
+    entry = _cached(sid)
+    if entry is not None:
+        return entry, False
+
+    now = time.time()
+    current = generation(sid)
+    rows, calculating = fetch_section(sid, section_type)
+    entry = {"generation": current, "fetched_at": now, "rows": rows}
+    # Do not cache while Tautulli is still calculating file sizes; the data is incomplete
+    if not calculating and enabled():
+        _remember(sid, entry)
+        db = _db()
+        db.execute(
+            "INSERT OR REPLACE INTO section_snapshots (section_id, generation, fetched_at, rows) VALUES (?, ?, ?, ?)",
+            (sid, current, now, json.dumps(rows, separators=(",", ":"))),
+        )
+        db.execute("DELETE FROM section_snapshots WHERE fetched_at < ?", (now - LIBRARY_CACHE_TTL,))
+    return entry, calculating
+
+
+def ready(section_id) -> bool:
+    """True if a fresh snapshot of the section exists (using it needs no Tautulli call)."""
+    return _cached(str(section_id)) is not None
+
+
+def fill(section_id, section_type: str | None = None) -> None:
+    """Fetch a section's snapshot in a background thread (at most one per section per worker).
+
+    A fill that yields no snapshot (Tautulli failing or calculating file sizes) is not
+    retried for _FILL_RETRY seconds, unless the section is invalidated.
+    """
+    sid = str(section_id)
+    with _lock:
+        if sid in _filling or time.time() - _fill_failed_at.get(sid, 0) < _FILL_RETRY:
+            return
+        _filling.add(sid)
+
+    def _run():
+        stored = False
+        try:
+            stored = not _snapshot(sid, section_type)[1]
+        except Exception:
+            pass  # the live path reports the error; retried after _FILL_RETRY
+        finally:
+            with _lock:
+                _filling.discard(sid)
+                if stored:
+                    _fill_failed_at.pop(sid, None)
+                else:
+                    _fill_failed_at[sid] = time.time()
+
+    threading.Thread(target=_run, name=f"library-fill-{sid}", daemon=True).start()
+
+
+def get_section_columns(
+    section_id,
+    search: str | None = None,
+    section_type: str | None = None,
+) -> tuple[Columns, bool]:
+    """Return (Columns, calculating_file_sizes) for a section's snapshot, fetched when stale.
+
+    With the cache disabled every call reads the whole section from Tautulli.
+
+    search filters the snapshot with prefix and one-typo matching on titles. Sort columns
+    and orders are cached with the snapshot; rows are shared, treat them as read-only.
+    """
+    entry, calculating = _snapshot(str(section_id), section_type)
+    if search:
+        keys = _matching(entry, search)
+        return Columns([r for r in entry["rows"] if str(r.get("rating_key")) in keys]), calculating
+    columns = entry.get("columns")
+    if columns is None:
+        columns = entry["columns"] = Columns(entry["rows"])
+    return columns, calculating
+
+
+def invalidate(section_id) -> None:
+    """Drop a section's snapshot in all workers (after removals or refreshes)."""
+    global _row_count
+    sid = str(section_id)
+    db = _db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute(
+            "INSERT INTO generations (section_id, generation) VALUES (?, 1) "
+            "ON CONFLICT(section_id) DO UPDATE SET generation = generation + 1",
+            (sid,),
+        )
+        db.execute("DELETE FROM section_snapshots WHERE section_id = ?", (sid,))
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    with _lock:
+        _fill_failed_at.pop(sid, None)
+        entry = _entries.pop(sid, None)
+        if entry is not None:
+            _row_count -= len(entry["rows"])
+
+
+def drop_rows(section_id, rating_keys) -> None:
+    """Hide removed items of a section from every worker, now and in later Tautulli fetches."""
+    global _row_count
+    sid = str(section_id)
+    keys = {str(k) for k in rating_keys if k is not None}
+    if not keys:
+        return
+    now = time.time()
+    db = _db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.executemany(
+            "INSERT OR REPLACE INTO tombstones (section_id, rating_key, removed_at) VALUES (?, ?, ?)",
+            [(sid, k, now) for k in keys],
+        )
+        db.execute(
+            "INSERT INTO generations (section_id, generation) VALUES (?, 1) "
+            "ON CONFLICT(section_id) DO UPDATE SET generation = generation + 1",
+            (sid,),
+        )
+        current = db.execute("SELECT generation FROM generations WHERE section_id = ?", (sid,)).fetchone()[0]
+        row = db.execute("SELECT rows FROM section_snapshots WHERE section_id = ?", (sid,)).fetchone()
+        if row is not None:
+            db.execute(
+                "UPDATE section_snapshots SET generation = ?, rows = ? WHERE section_id = ?",
+                (current, json.dumps(_without(json.loads(row[0]), keys), separators=(",", ":")), sid),
+            )
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    with _lock:
+        entry = _entries.get(sid)
+        if entry is not None:
+            kept = _without(entry["rows"], keys)
+            _row_count -= len(entry["rows"]) - len(kept)
+            # The title index is updated in place rather than rebuilt
+            index = entry.get("index")
+            if index is not None:
+                for k in keys:
+                    index.remove(k)
+            _entries[sid] = {
+                "generation": current, "fetched_at": entry["fetched_at"], "rows": kept, "index": index,
+            }
@@ -0,0 +1,349 @@
+"""Optional local mirror of every Tautulli library, for the combined view.
+
+With LIBRARY_SYNC_INTERVAL > 0 one worker at a time (a lease in SQLite decides which)
+copies the full media list of every movie/show/artist section into a local table, indexed
+on the sortable columns. /api/library/combined then sorts, filters, searches and pages
+with one SQLite query instead of calling Tautulli, so neither Tautulli latency nor a
+"calculating file sizes" phase reaches the UI.
+
+A section is synced again every LIBRARY_SYNC_INTERVAL seconds and as soon as its
+library_cache generation changes (removals and Plex/Tautulli refreshes). A sync that finds
+Tautulli calculating file sizes keeps the previous copy. Tombstoned rows are left out of
+query results until the next sync, which no longer receives them from library_cache.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from typing import Iterator
+
+from config import LIBRARY_SYNC_INTERVAL
+from services import library_cache, search_index, tautulli
+from services.store import connect
+
+SECTION_TYPES = ("movie", "show", "artist")
+# combined view order column -> media table column
+ORDER_COLUMNS = {
+    "sort_title": "sort_title",
+    "year": "year",
+    "added_at": "added_at",
+    "last_played": "last_played",
+    "play_count": "play_count",
+    "file_size": "file_size",
+    "library_name": "library_name",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    section_id TEXT NOT NULL,
+    rating_key TEXT NOT NULL,
+    section_type TEXT NOT NULL,
+    library_name TEXT NOT NULL,
+    sort_title TEXT NOT NULL,
+    year TEXT NOT NULL,
+    added_at INTEGER NOT NULL,
+    last_played INTEGER NOT NULL,
+    play_count INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    search_text TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (section_id, rating_key)
+);
+CREATE INDEX IF NOT EXISTS media_last_played ON media (last_played);
+CREATE INDEX IF NOT EXISTS media_added_at ON media (added_at);
+CREATE INDEX IF NOT EXISTS media_play_count ON media (play_count);
+CREATE INDEX IF NOT EXISTS media_file_size ON media (file_size);
+CREATE INDEX IF NOT EXISTS media_sort_title ON media (sort_title);
+CREATE TABLE IF NOT EXISTS sections (
+    section_id TEXT PRIMARY KEY,
+    section_type TEXT NOT NULL,
+    library_name TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    synced_at REAL NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lease (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Seconds between checks for sections due for a sync, how long the syncing worker's lease
+# lasts without being renewed, and the wait before retrying a failed or calculating section
+_POLL = 5
+_LEASE = 300
+_RETRY = 60
+
+_lock = threading.Lock()
+_thread_pid = None
+# Tautulli's library list, re-read at most every LIBRARY_SYNC_INTERVAL seconds
+_libs: list = []
+_libs_at = 0.0
+# section_id -> time before which it is not retried
+_retry_at: dict[str, float] = {}
+# section_id -> (synced_at, title index) of this worker, rebuilt after each sync
+_search_indexes: dict[str, tuple[float, search_index.SearchIndex]] = {}
+
+
+def enabled() -> bool:
+    return LIBRARY_SYNC_INTERVAL > 0
+
+
+def _db():
+    return connect("library_sync", _SCHEMA)
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _claim() -> bool:
+    """Take or renew the sync lease; True if this worker holds it."""
+    now = time.time()
+    db = _db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute("SELECT owner, expires_at FROM lease WHERE id = 1").fetchone()
+        mine = row is None or row[0] == _owner() or row[1] < now
+        if mine:
+            db.execute(
+                "INSERT OR REPLACE INTO lease (id, owner, expires_at) VALUES (1, ?, ?)",
+                (_owner(), now + _LEASE),
+            )
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    return mine
+
+
+def _int(value) -> int:
+    try:
+        return int(value) if value not in (None, "") else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _record(section_id: str, section_type: str, library_name: str, row: dict) -> tuple:
+    """media table values for one normalized Tautulli row (sort columns as utils.merge.sort_key_for orders them)."""
+    title = str(row.get("title") or "")
+    sort_title = str(row.get("sort_title") or title)
+    year = str(row.get("year") or "")
+    return (
+        section_id,
+        str(row.get("rating_key")),
+        section_type,
+        library_name.lower(),
+        sort_title.lower(),
+        year.lower(),
+        _int(row.get("added_at")),
+        _int(row.get("last_played")),
+        _int(row.get("play_count")),
+        _int(row.get("file_size")),
+        search_index.row_text(row),
+        json.dumps(row, separators=(",", ":")),
+    )
+
+
+def sync_section(section_id, section_type: str, library_name: str) -> str:
+    """Copy one section from Tautulli into the media table; returns "synced" or "calculating"."""
+    sid = str(section_id)
+    # Read before fetching, so an invalidation during the fetch triggers another sync
+    generation = library_cache.generation(sid)
+    rows, calculating = library_cache.fetch_section(sid, section_type)
+    if calculating:
+        return "calculating"
+    records = [_record(sid, section_type, library_name, r) for r in rows if isinstance(r, dict)]
+    db = _db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM media WHERE section_id = ?", (sid,))
+        db.executemany(f"INSERT OR REPLACE INTO media VALUES ({', '.join('?' * 12)})", records)
+        db.execute(
+            "INSERT OR REPLACE INTO sections (section_id, section_type, library_name, generation, synced_at, row_count) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (sid, section_type, library_name, generation, time.time(), len(records)),
+        )
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    return "synced"
+
+
+def _libraries() -> list:
+    global _libs, _libs_at
+    if not _libs_at or time.time() - _libs_at >= LIBRARY_SYNC_INTERVAL:
+        try:
+            libs = tautulli.get_tautulli_libraries()
+        except Exception:
+            if not _libs_at:
+                raise
+            # Tautulli down: keep the last list and ask again after _RETRY seconds
+            _libs_at = time.time() - LIBRARY_SYNC_INTERVAL + _RETRY
+            return _libs
+        _libs = [
+            l for l in (libs if isinstance(libs, list) else [])
+            if (l.get("section_type") or "").lower() in SECTION_TYPES
+        ]
+        _libs_at = time.time()
+    return _libs
+
+
+def sync_due() -> dict:
+    """Sync every section that was never synced, is older than the interval, or was invalidated.
+
+    Sections Tautulli no longer lists are deleted. Returns {section_id: result}.
+    """
+    libs = _libraries()
+    db = _db()
+    synced = {r[0]: (r[1], r[2]) for r in db.execute("SELECT section_id, generation, synced_at FROM sections")}
+    results = {}
+    for lib in libs:
+        sid = str(lib.get("section_id"))
+        previous = synced.get(sid)
+        now = time.time()
+        if (
+            previous is not None
+            and previous[0] == library_cache.generation(sid)
+            and now - previous[1] < LIBRARY_SYNC_INTERVAL
+        ) or _retry_at.get(sid, 0) > now:
+            continue
+        try:
+            results[sid] = sync_section(
+                sid,
+                (lib.get("section_type") or "").lower(),
+                (lib.get("section_name") or "").strip() or "—",
+            )
+        except Exception as e:
+            results[sid] = f"error: {e}"
+        if results[sid] == "synced":
+            _retry_at.pop(sid, None)
+        else:
+            _retry_at[sid] = time.time() + _RETRY
+        if not _claim():
+            # The lease expired during a long sync and another worker took over
+            return results
+    listed = {str(l.get("section_id")) for l in libs}
+    for sid in set(synced) - listed:
+        db.execute("DELETE FROM media WHERE section_id = ?", (sid,))
+        db.execute("DELETE FROM sections WHERE section_id = ?", (sid,))
+    return results
+
+
+def _run() -> None:
+    while True:
+        try:
+            if _claim():
+                sync_due()
+        except Exception:
+            pass  # Tautulli down: keep serving the last copy and retry on the next poll
+        time.sleep(_POLL)
+
+
+def start() -> None:
+    """Start this worker's sync thread (no-op when LIBRARY_SYNC_INTERVAL is 0)."""
+    global _thread_pid
+    if not enabled() or _thread_pid == os.getpid():
+        return
+    with _lock:
+        if _thread_pid == os.getpid():
+            return
+        _thread_pid = os.getpid()
+    threading.Thread(target=_run, name="library-sync", daemon=True).start()
+
+
+def covers(section_ids) -> bool:
+    """True when every given section has been synced (so a query can be answered locally)."""
+    if not enabled():
+        return False
+    start()
+    ids = {str(s) for s in section_ids}
+    if not ids:
+        return False
+    marks = ", ".join("?" * len(ids))
+    row = _db().execute(f"SELECT COUNT(*) FROM sections WHERE section_id IN ({marks})", tuple(ids)).fetchone()
+    return row[0] == len(ids)
+
+
+def libraries(section_type: str) -> list[dict]:
+    """Tautulli's libraries of one type.
+
+    With sync enabled this is the list the sync re-reads every LIBRARY_SYNC_INTERVAL
+    seconds (kept while Tautulli is down), so listing them costs no Tautulli call.
+    Sections in it that have not been synced yet are not covered (see covers()).
+    """
+    libs = _libraries() if enabled() else tautulli.get_tautulli_libraries()
+    return [l for l in libs if isinstance(l, dict) and (l.get("section_type") or "").lower() == section_type]
+
+def _matching(section_ids: list[str], search: str) -> set[str]:
+    """Rating keys matching search in any of the sections, from this worker's title indexes."""
+    db = _db()
+    marks = ", ".join("?" * len(section_ids))
+    keys = set()
+    for sid, synced_at in db.execute(f"SELECT section_id, synced_at FROM sections WHERE section_id IN ({marks})", section_ids):
+        cached = _search_indexes.get(sid)
+        if cached is None or cached[0] != synced_at:
+            index = search_index.SearchIndex()
+            for rating_key, text in db.execute("SELECT rating_key, search_text FROM media WHERE section_id = ?", (sid,)):
+                index.add(rating_key, text)
+            cached = _search_indexes[sid] = (synced_at, index)
+        keys |= cached[1].search(search)
+    return keys
+
+
+def stream(
+    section_ids,
+    search: str | None = None,
+    order_column: str = "last_played",
+    order_dir: str = "asc",
+    start: int = 0,
+    length: int = 50,
+) -> tuple[Iterator[dict], int]:
+    """Return (rows, total) of the synced sections, filtered, sorted and paged in SQLite.
+
+    rows is an iterator over the result cursor, decoding one row at a time; a negative
+    length returns every row from start on. Rows are the Tautulli records plus
+    library_name and section_id, like the live path.
+    """
+    ids = [str(s) for s in section_ids]
+    marks = ", ".join("?" * len(ids))
+    where = [f"section_id IN ({marks})"]
+    params: list = list(ids)
+    if search:
+        where.append("rating_key IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(sorted(_matching(ids, search))))
+    for sid in ids:
+        hidden = library_cache.tombstones(sid)
+        if hidden:
+            where.append(f"NOT (section_id = ? AND rating_key IN ({', '.join('?' * len(hidden))}))")
+            params.extend([sid, *hidden])
+    clause = " AND ".join(where)
+    column = ORDER_COLUMNS.get(order_column, "last_played")
+    direction = "DESC" if order_dir == "desc" else "ASC"
+    db = _db()
+    total = db.execute(f"SELECT COUNT(*) FROM media WHERE {clause}", params).fetchone()[0]
+    names = dict(db.execute(f"SELECT section_id, library_name FROM sections WHERE section_id IN ({marks})", ids))
+    # LIMIT -1 is "no limit" in SQLite
+    found = db.execute(
+        f"SELECT section_id, data FROM media WHERE {clause} "
+        f"ORDER BY {column} {direction}, section_id, rating_key LIMIT ? OFFSET ?",
+        (*params, -1 if length < 0 else length, max(0, start)),
+    )
+
+    def _rows():
+        for sid, data in found:
+            row = json.loads(data)
+            row["library_name"] = names.get(sid, "—")
+            row["section_id"] = sid
+            yield row
+
+    return _rows(), total
+
+
+def query(section_ids, **kwargs) -> tuple[list, int]:
+    """stream() with the rows collected into a list."""
+    rows, total = stream(section_ids, **kwargs)
+    return list(rows), total
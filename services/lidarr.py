@@ -1,24 +1,38 @@
 """Lidarr API client (multi-instance)."""
-import requests
+from services import catalog
+from services.client import get_session
+from utils.jsonstream import iter_items
 
+# Bytes read from the response at a time while streaming the catalog
+_CHUNK_SIZE = 64 * 1024
 
-def lidarr_find_artist(instance: dict, mbid) -> dict | None:
-    """Find an artist in a Lidarr instance by MusicBrainz artist id."""
-    r = requests.get(
+
+def _load_artists(instance: dict):
+    """Stream the full artist list of a Lidarr instance, one record at a time."""
+    with get_session("lidarr").get(
         f"{instance['url']}/api/v1/artist",
         params={"apikey": instance["api_key"]},
         timeout=30,
-    )
-    r.raise_for_status()
-    for a in r.json():
-        if a.get("foreignArtistId") == str(mbid):
-            return a
-    return None
+        stream=True,
+    ) as r:
+        r.raise_for_status()
+        yield from iter_items(r.iter_content(_CHUNK_SIZE))
+
+
+_CATALOG_KEYS = {
+    "mbid": lambda a: str(a["foreignArtistId"]) if a.get("foreignArtistId") else None,
+}
+
+
+def lidarr_find_artist(instance: dict, mbid) -> dict | None:
+    """Find an artist in a Lidarr instance by MusicBrainz artist id."""
+    want = str(mbid)
+    return catalog.find("lidarr", instance, _load_artists, _CATALOG_KEYS, lambda index: index.first("mbid", want))
 
 
 def lidarr_delete_artist(instance: dict, artist_id, delete_files: bool = True) -> bool:
     """Delete an artist from a Lidarr instance."""
-    r = requests.delete(
+    r = get_session("lidarr").delete(
         f"{instance['url']}/api/v1/artist/{artist_id}",
         params={
             "apikey": instance["api_key"],
@@ -28,4 +42,5 @@ def lidarr_delete_artist(instance: dict, artist_id, delete_files: bool = True) -
         timeout=15,
     )
     r.raise_for_status()
+    catalog.discard("lidarr", instance, artist_id)
     return True
@@ -1,7 +1,6 @@
 """Seerr API client (Overseerr-compatible)."""
-import requests
-
 from config import OVERSEERR_API_KEY, OVERSEERR_URL
+from services.client import get_session
 
 
 def overseerr_headers() -> dict:
@@ -16,7 +15,7 @@ def overseerr_find_media(tmdb_id, media_type: str = "movie") -> dict | None:
     if not OVERSEERR_API_KEY:
         raise ValueError("OVERSEERR_API_KEY is not set — check your .env file")
     endpoint = "movie" if media_type == "movie" else "tv"
-    r = requests.get(
+    r = get_session("overseerr").get(
         f"{OVERSEERR_URL}/api/v1/{endpoint}/{tmdb_id}",
         headers=overseerr_headers(),
         timeout=15,
@@ -27,9 +26,33 @@ def overseerr_find_media(tmdb_id, media_type: str = "movie") -> dict | None:
     return r.json()
 
 
+def overseerr_list_requests(take: int = 100, skip: int = 0, sort: str = "modified") -> dict:
+    """One page of all Seerr requests, newest first by sort ("added" or "modified").
+
+    Returns the raw response: {"pageInfo": {...}, "results": [request, ...]}; each request
+    carries "media" (id, tmdbId, mediaType) and "requestedBy".
+    """
+    if not OVERSEERR_API_KEY:
+        raise ValueError("OVERSEERR_API_KEY is not set — check your .env file")
+    r = get_session("overseerr").get(
+        f"{OVERSEERR_URL}/api/v1/request",
+        headers=overseerr_headers(),
+        params={"take": take, "skip": skip, "sort": sort, "filter": "all"},
+        timeout=30,
+    )
+    r.raise_for_status()
+    return r.json()
+
+
+def requestor_name(req: dict) -> str | None:
+    """Display name of the user who made a Seerr request."""
+    user = req.get("requestedBy") or {}
+    return user.get("displayName") or user.get("plexUsername") or user.get("email") or None
+
+
 def overseerr_delete_media(media_id) -> bool:
     """Delete a media entry from Seerr (removes request + clears data)."""
-    r = requests.delete(
+    r = get_session("overseerr").delete(
         f"{OVERSEERR_URL}/api/v1/media/{media_id}",
         headers=overseerr_headers(),
         timeout=15,
@@ -1,8 +1,7 @@
 """Plex Media Server API client (optional). Used to refresh library after Radarr deletes files."""
 
-import requests
-
 from config import PLEX_TOKEN, PLEX_URL
+from services.client import get_session
 
 
 def plex_refresh_library(section_id: str) -> bool:
@@ -21,10 +20,33 @@ def plex_refresh_library(section_id: str) -> bool:
     # Ensure PLEX_URL doesn't have trailing slash
     base_url = PLEX_URL.rstrip('/')
     url = f"{base_url}/library/sections/{section_id}/refresh"
-    r = requests.get(
+    r = get_session("plex").get(
         url,
         params={"X-Plex-Token": PLEX_TOKEN},
         timeout=30,
     )
     r.raise_for_status()
     return True
+
+
+def plex_refreshing_sections() -> set[str]:
+    """Return the section ids Plex is currently scanning.
+
+    Reads GET /library/sections, whose entries carry a "refreshing" flag while a scan runs.
+    Returns an empty set if Plex URL/token are not configured.
+    """
+    if not PLEX_URL or not PLEX_TOKEN:
+        return set()
+    r = get_session("plex").get(
+        f"{PLEX_URL.rstrip('/')}/library/sections",
+        params={"X-Plex-Token": PLEX_TOKEN},
+        headers={"Accept": "application/json"},
+        timeout=15,
+    )
+    r.raise_for_status()
+    directories = (r.json().get("MediaContainer") or {}).get("Directory") or []
+    return {
+        str(d.get("key"))
+        for d in directories
+        if d.get("refreshing") in (True, 1, "1", "true")
+    }
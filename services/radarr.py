@@ -1,6 +1,12 @@
 """Radarr API client (multi-instance)."""
 import re
-import requests
+
+from services import catalog
+from services.client import get_session
+from utils.jsonstream import iter_items
+
+# Bytes read from the response at a time while streaming a movie list
+_CHUNK_SIZE = 64 * 1024
 
 
 def _normalize_imdb(val):
@@ -15,13 +21,8 @@ def _normalize_imdb(val):
 
 
 def _movie_list(response):
-    """Return list of movies from Radarr GET /movie response (list or dict)."""
-    data = response.json()
-    if isinstance(data, list):
-        return data
-    if isinstance(data, dict):
-        return data.get("records") or data.get("movie") or data.get("movies") or []
-    return []
+    """Iterate the movies of a streamed Radarr GET /movie response (list or dict), one at a time."""
+    return iter_items(response.iter_content(_CHUNK_SIZE), keys=("records", "movie", "movies"))
 
 
 def _normalize_title(s: str) -> str:
@@ -44,67 +45,95 @@ def _titles_match(want: str, got: str) -> bool:
     return want in got or got in want
 
 
-def radarr_find_movie_by_title(instance: dict, title: str, year=None) -> dict | None:
-    """Find a movie in a Radarr instance by title (and optional year)."""
-    if not title or not str(title).strip():
+def _year(val) -> int | None:
+    if val is None or not str(val).strip():
+        return None
+    try:
+        return int(val)
+    except (TypeError, ValueError):
         return None
-    r = requests.get(
+
+
+def _load_movies(instance: dict):
+    """Stream the full movie list of a Radarr instance, one record at a time."""
+    with get_session("radarr").get(
         f"{instance['url']}/api/v3/movie",
         params={"apikey": instance["api_key"]},
         timeout=30,
-    )
-    r.raise_for_status()
-    want_title = _normalize_title(title)
-    want_year = None
-    if year is not None and str(year).strip():
-        try:
-            want_year = int(year)
-        except (TypeError, ValueError):
-            pass
-    candidates = []
-    for m in _movie_list(r):
-        if not isinstance(m, dict):
-            continue
-        t = _normalize_title(m.get("title") or m.get("originalTitle") or "")
+        stream=True,
+    ) as r:
+        r.raise_for_status()
+        yield from _movie_list(r)
+
+
+def _movie_title(m: dict) -> str:
+    return _normalize_title(m.get("title") or m.get("originalTitle") or "")
+
+
+_CATALOG_KEYS = {
+    "tmdb": lambda m: str(m["tmdbId"]) if m.get("tmdbId") else None,
+    "imdb": lambda m: _normalize_imdb(m.get("imdbId")) or None,
+    "title": lambda m: _movie_title(m) or None,
+    "title_year": lambda m: (_movie_title(m), _year(m.get("year"))) if _movie_title(m) else None,
+}
+
+
+def _find(instance: dict, match) -> dict | None:
+    return catalog.find("radarr", instance, _load_movies, _CATALOG_KEYS, match)
+
+
+def _match_title(index: catalog.CatalogIndex, want_title: str, want_year: int | None) -> dict | None:
+    # Exact title (+ year) straight from the index
+    if want_year is not None:
+        exact = index.first("title_year", (want_title, want_year))
+    else:
+        exact = index.first("title", want_title)
+    if exact:
+        return exact
+    # Otherwise substring match over the cached (already normalized) titles
+    for t, movies in index.items("title"):
         if not _titles_match(want_title, t):
             continue
-        y = m.get("year")
-        if y is not None:
-            try:
-                y = int(y)
-            except (TypeError, ValueError):
-                y = None
-        if want_year is not None and y is not None and y != want_year:
-            continue
-        candidates.append((m, y))
-    if not candidates:
-        return None
-    # Prefer exact title + year match; then exact title; then any candidate
-    for m, y in candidates:
-        t = _normalize_title(m.get("title") or m.get("originalTitle") or "")
-        if t == want_title and (want_year is None or y == want_year):
+        for m in movies:
+            y = _year(m.get("year"))
+            if want_year is not None and y is not None and y != want_year:
+                continue
             return m
-    return candidates[0][0]
+    return None
+
+
+def radarr_find_movie_by_title(instance: dict, title: str, year=None) -> dict | None:
+    """Find a movie in a Radarr instance by title (and optional year)."""
+    if not title or not str(title).strip():
+        return None
+    want_title = _normalize_title(title)
+    want_year = _year(year)
+    return _find(instance, lambda index: _match_title(index, want_title, want_year))
 
 
 def radarr_find_movie(instance: dict, tmdb_id=None, imdb_id=None) -> dict | None:
     """Find a movie in a Radarr instance by TMDB or IMDB id."""
-    base = f"{instance['url']}/api/v3/movie"
-    params = {"apikey": instance["api_key"]}
     if tmdb_id:
-        params["tmdbId"] = tmdb_id
-        r = requests.get(base, params=params, timeout=15)
-        r.raise_for_status()
-        movies = _movie_list(r)
-        if movies:
-            return movies[0]
+        # The catalog only if it is already loaded: a single removal should not download it
+        index = catalog.loaded("radarr", instance)
+        movie = index.first("tmdb", str(tmdb_id)) if index else None
+        if movie:
+            return movie
+        # Not loaded, or not in it (may have been added since): ask Radarr for this movie
+        with get_session("radarr").get(
+            f"{instance['url']}/api/v3/movie",
+            params={"apikey": instance["api_key"], "tmdbId": tmdb_id},
+            timeout=15,
+            stream=True,
+        ) as r:
+            r.raise_for_status()
+            # Stop at the first record (older Radarr versions ignore tmdbId and list everything)
+            movie = next(_movie_list(r), None)
+        if movie:
+            return movie
     if imdb_id:
-        r = requests.get(base, params={"apikey": instance["api_key"]}, timeout=30)
-        r.raise_for_status()
         want = _normalize_imdb(imdb_id)
-        for m in _movie_list(r):
-            if _normalize_imdb(m.get("imdbId")) == want:
-                return m
+        return _find(instance, lambda index: index.first("imdb", want))
     return None
 
 
@@ -116,6 +145,7 @@ def radarr_delete_movie(instance: dict, movie_id, delete_files: bool = True) ->
         "deleteFiles": "true" if delete_files else "false",
         "addImportExclusion": "false",
     }
-    r = requests.delete(url, params=params, timeout=15)
+    r = get_session("radarr").delete(url, params=params, timeout=15)
     r.raise_for_status()
+    catalog.discard("radarr", instance, movie_id)
     return True
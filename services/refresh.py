@@ -0,0 +1,374 @@
+"""Post-removal refresh jobs: Plex scan, wait for it to finish, then Tautulli media info.
+
+After *arr deletions Plex has to rescan the affected sections before Tautulli can rebuild
+its media info. Instead of the browser waiting a fixed time between the two, a job runs
+in a background thread of the worker that started it:
+
+1. plex_refresh_library for every section at once;
+2. poll Plex's /library/sections "refreshing" flags until those sections are idle (a
+   section that never shows as refreshing within REFRESH_SCAN_START_GRACE seconds is
+   assumed to have finished already);
+3. refresh_tautulli_media_info for every section at once, and invalidate the snapshots.
+
+Requests are coalesced: a job waits REFRESH_DEBOUNCE seconds (extended by each request
+that joins, up to REFRESH_DEBOUNCE_MAX) before it starts, and every start() in that window
+joins it and gets the same job back. A section is never scanned by two jobs at once; a
+job whose section is still being scanned by an earlier job waits for that scan first.
+
+Removed rows are already hidden by tombstones (library_cache.drop_rows), so step 3 is
+optional: with TAUTULLI_REFRESH_MODE=deferred the sections are queued and a background
+runner refreshes them during TAUTULLI_REFRESH_WINDOW; with "off" Tautulli is left to its
+own schedule.
+
+Job state is kept in SQLite so a status poll or a joining request answered by any
+gunicorn worker sees it.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import (
+    REFRESH_DEBOUNCE,
+    REFRESH_DEBOUNCE_MAX,
+    REFRESH_POLL_INTERVAL,
+    REFRESH_SCAN_START_GRACE,
+    REFRESH_SCAN_TIMEOUT,
+    TAUTULLI_REFRESH_MODE,
+    TAUTULLI_REFRESH_WINDOW,
+)
+from services import library_cache, plex, tautulli
+from services.store import connect
+from utils.fanout import fan_out
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deferred_tautulli (
+    section_id TEXT PRIMARY KEY,
+    section_type TEXT,
+    queued_at REAL NOT NULL
+);
+"""
+
+TERMINAL_STATES = ("done", "failed")
+# Jobs are kept this long for status polls
+_JOB_RETENTION = 24 * 3600
+# Running jobs are touched at least this often, so a job of a dead worker can be told apart
+_HEARTBEAT = 15
+# Plex states of a section whose scan this job has started and not finished
+_SCAN_IN_FLIGHT = ("refreshing", "refreshed")
+
+# Seconds between checks of the deferred Tautulli refresh queue
+_DEFERRED_CHECK = 60
+
+_save_lock = threading.Lock()
+_runner_pid = None
+
+
+def _db():
+    return connect("refresh_jobs", _SCHEMA)
+
+
+@contextmanager
+def _transaction():
+    """Serialize read-modify-write of jobs across threads and workers."""
+    db = _db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+
+
+def _save(job: dict, db=None) -> None:
+    with _save_lock:
+        job["updated_at"] = time.time()
+        (db or _db()).execute(
+            "INSERT OR REPLACE INTO jobs (id, created_at, updated_at, data) VALUES (?, ?, ?, ?)",
+            (job["id"], job["created_at"], job["updated_at"], json.dumps(job)),
+        )
+
+
+def _load(db, job_id: str) -> dict | None:
+    row = db.execute("SELECT data, updated_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = json.loads(row[0])
+    job["updated_at"] = row[1]
+    return job
+
+
+def _stall_after() -> float:
+    return 4 * max(_HEARTBEAT, REFRESH_POLL_INTERVAL)
+
+
+def _active_jobs(db) -> list[dict]:
+    """Unfinished jobs whose worker is still alive."""
+    rows = db.execute(
+        "SELECT data, updated_at FROM jobs WHERE updated_at > ?", (time.time() - _stall_after(),)
+    ).fetchall()
+    jobs = []
+    for data, updated_at in rows:
+        job = json.loads(data)
+        if job["state"] not in TERMINAL_STATES:
+            job["updated_at"] = updated_at
+            jobs.append(job)
+    return jobs
+
+
+def get(job_id: str) -> dict | None:
+    """Return a job's state, or None if unknown.
+
+    A job whose worker stopped updating it (e.g. the worker was restarted) is reported
+    as failed.
+    """
+    job = _load(_db(), job_id)
+    if job is None:
+        return None
+    if job["state"] not in TERMINAL_STATES and time.time() - job["updated_at"] > _stall_after():
+        job["state"] = "failed"
+        job["message"] = "refresh stopped (worker restarted?)"
+    return job
+
+
+def _plex_result(outcome: dict) -> str:
+    if outcome["error"] is not None:
+        return f"error: {outcome['error']}"
+    return "refreshed" if outcome["result"] else "skipped (Plex not configured)"
+
+
+def _tautulli_result(outcome: dict) -> str:
+    if outcome["error"] is not None:
+        return f"error: {outcome['error']}"
+    return "refreshed" if outcome["result"] else "error: Refresh failed"
+
+
+def _scan_section(job: dict, section_id: str) -> bool:
+    """Start a Plex scan of one section once no other job is scanning it."""
+    deadline = time.monotonic() + REFRESH_SCAN_TIMEOUT
+    while True:
+        with _transaction() as db:
+            busy = any(
+                other["id"] != job["id"]
+                and other["state"] == "plex_scanning"
+                and other["plex"].get(section_id) in _SCAN_IN_FLIGHT
+                for other in _active_jobs(db)
+            )
+            if not busy or time.monotonic() > deadline:
+                job["plex"][section_id] = "refreshing"
+                _save(job, db)
+                break
+            if job["plex"][section_id] != "waiting for running scan":
+                job["plex"][section_id] = "waiting for running scan"
+                _save(job, db)
+        time.sleep(REFRESH_POLL_INTERVAL)
+    return plex.plex_refresh_library(section_id)
+
+
+def _wait_for_scans(job: dict, section_ids: list[str]) -> None:
+    """Poll Plex until the sections are no longer refreshing (or REFRESH_SCAN_TIMEOUT)."""
+    started = time.monotonic()
+    seen = set()
+    pending = set(section_ids)
+    while pending:
+        try:
+            refreshing = plex.plex_refreshing_sections()
+        except Exception as e:
+            job["message"] = f"Plex scan state unavailable: {e}"
+            refreshing = set()
+        seen |= refreshing & pending
+        waited = time.monotonic() - started
+        pending = {sid for sid in pending if sid in refreshing or (sid not in seen and waited < REFRESH_SCAN_START_GRACE)}
+        job["scanning"] = sorted(pending)
+        if pending and waited >= REFRESH_SCAN_TIMEOUT:
+            job["message"] = f"Plex still scanning after {REFRESH_SCAN_TIMEOUT}s; refreshing Tautulli anyway"
+            return
+        _save(job)
+        if pending:
+            time.sleep(REFRESH_POLL_INTERVAL)
+
+
+def _heartbeat(job_id: str, stop: threading.Event) -> None:
+    # Only updated_at: other workers may still be adding sections to a queued job
+    while not stop.wait(_HEARTBEAT):
+        _db().execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+
+def _close_for_joining(job_id: str) -> dict:
+    """Wait until the job's debounce window has passed, then mark it started and return it."""
+    while True:
+        with _transaction() as db:
+            job = _load(db, job_id)
+            remaining = job["run_at"] - time.time()
+            if remaining <= 0:
+                job["state"] = "plex_scanning"
+                job["plex"] = {s["section_id"]: "queued" for s in job["sections"]}
+                _save(job, db)
+                return job
+        time.sleep(remaining)
+
+
+def _run(job_id: str) -> None:
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True).start()
+    job = None
+    try:
+        job = _close_for_joining(job_id)
+        sections = job["sections"]
+        section_ids = [s["section_id"] for s in sections]
+
+        outcomes = fan_out(
+            section_ids,
+            lambda sid: _scan_section(job, sid),
+            max_workers=len(section_ids),
+            timeout=REFRESH_SCAN_TIMEOUT + 60,
+        )
+        job["plex"] = {o["item"]: _plex_result(o) for o in outcomes}
+        deferred = TAUTULLI_REFRESH_MODE == "deferred"
+        _wait_for_scans(job, [sid for sid in section_ids if job["plex"][sid] == "refreshed"])
+
+        if deferred:
+            _defer_tautulli(sections)
+            job["scanning"] = []
+            job["tautulli"] = {sid: "deferred" for sid in section_ids}
+            job["state"] = "done"
+            return
+        if TAUTULLI_REFRESH_MODE == "off":
+            job["scanning"] = []
+            job["tautulli"] = {sid: "skipped" for sid in section_ids}
+            job["state"] = "done"
+            return
+
+        job["state"] = "tautulli_refreshing"
+        job["scanning"] = []
+        _save(job)
+        outcomes = fan_out(
+            sections,
+            lambda s: tautulli.refresh_tautulli_media_info(s["section_id"], s.get("section_type")),
+            max_workers=len(sections),
+            timeout=REFRESH_SCAN_TIMEOUT,
+        )
+        job["tautulli"] = {o["item"]["section_id"]: _tautulli_result(o) for o in outcomes}
+        for sid in section_ids:
+            library_cache.invalidate(sid)
+        job["state"] = "done"
+    except Exception as e:
+        job = job or get(job_id)
+        if job is not None:
+            job["state"] = "failed"
+            job["message"] = str(e) or e.__class__.__name__
+    finally:
+        stop.set()
+        if job is not None:
+            _save(job)
+
+
+def start(sections: list[dict]) -> dict:
+    """Request a refresh of [{"section_id", "section_type"}, ...] and return the job handling it.
+
+    Within the debounce window of a job that has not started yet, the sections are added
+    to that job and it is returned instead of a new one.
+    """
+    now = time.time()
+    unique = list({s["section_id"]: s for s in sections}.values())
+    with _transaction() as db:
+        for job in _active_jobs(db):
+            if job["state"] != "queued":
+                continue
+            known = {s["section_id"] for s in job["sections"]}
+            job["sections"] += [s for s in unique if s["section_id"] not in known]
+            job["run_at"] = max(job["run_at"], min(now + REFRESH_DEBOUNCE, job["created_at"] + REFRESH_DEBOUNCE_MAX))
+            job["requests"] += 1
+            _save(job, db)
+            return job
+        job = {
+            "id": uuid.uuid4().hex[:16],
+            "state": "queued",
+            "sections": unique,
+            "created_at": now,
+            "run_at": now + REFRESH_DEBOUNCE,
+            "requests": 1,
+            "plex": {},
+            "scanning": [],
+            "tautulli": {},
+            "message": None,
+        }
+        _save(job, db)
+        db.execute("DELETE FROM jobs WHERE updated_at < ?", (now - _JOB_RETENTION,))
+    threading.Thread(target=_run, args=(job["id"],), name=f"refresh-{job['id']}", daemon=True).start()
+    return job
+
+
+def _defer_tautulli(sections: list[dict]) -> None:
+    _db().executemany(
+        "INSERT OR REPLACE INTO deferred_tautulli (section_id, section_type, queued_at) VALUES (?, ?, ?)",
+        [(s["section_id"], s.get("section_type"), time.time()) for s in sections],
+    )
+
+
+def in_window(window: str, now: datetime | None = None) -> bool:
+    """True if now (local time) is inside "HH:MM-HH:MM" (may wrap past midnight; empty = always)."""
+    if not window:
+        return True
+    now = now or datetime.now()
+    try:
+        start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in window.split("-", 1))
+    except ValueError:
+        return True
+    current = now.time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def run_deferred() -> dict:
+    """Refresh Tautulli for every queued section now; returns {section_id: result}.
+
+    Sections are claimed in a transaction so only one worker refreshes each. Failed
+    refreshes are queued again.
+    """
+    with _transaction() as db:
+        claimed = db.execute("SELECT section_id, section_type FROM deferred_tautulli").fetchall()
+        db.execute("DELETE FROM deferred_tautulli")
+    results = {}
+    for sid, section_type in claimed:
+        try:
+            ok = tautulli.refresh_tautulli_media_info(sid, section_type)
+        except Exception:
+            ok = False
+        if ok:
+            library_cache.invalidate(sid)
+            results[sid] = "refreshed"
+        else:
+            _defer_tautulli([{"section_id": sid, "section_type": section_type}])
+            results[sid] = "error: Refresh failed"
+    return results
+
+
+def _deferred_loop() -> None:
+    while True:
+        try:
+            if in_window(TAUTULLI_REFRESH_WINDOW):
+                run_deferred()
+        except Exception:
+            pass
+        time.sleep(_DEFERRED_CHECK)
+
+
+def start_deferred_runner() -> None:
+    """Start this worker's deferred Tautulli refresh thread (only in deferred mode)."""
+    global _runner_pid
+    if TAUTULLI_REFRESH_MODE != "deferred" or _runner_pid == os.getpid():
+        return
+    _runner_pid = os.getpid()
+    threading.Thread(target=_deferred_loop, name="deferred-tautulli", daemon=True).start()
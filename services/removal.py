@@ -0,0 +1,261 @@
+"""Remove one library item from Seerr and the *arr instances (shared by /api/remove and /api/remove/batch)."""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial
+
+from config import (
+    LIDARR_INSTANCES,
+    RADARR_INSTANCES,
+    REMOVE_SERVICE_CONCURRENCY,
+    REMOVE_STEP_TIMEOUT,
+    SONARR_INSTANCES,
+)
+from services import id_cache, library_cache, lidarr, overseerr, radarr, request_index, sonarr, tautulli
+from utils.ids import extract_ids
+
+# Upper bound on concurrent calls per upstream service while batches run in parallel
+_limits = {
+    name: threading.BoundedSemaphore(max(1, REMOVE_SERVICE_CONCURRENCY))
+    for name in ("tautulli", "overseerr", "radarr", "sonarr", "lidarr")
+}
+
+
+@contextmanager
+def service_limit(service: str):
+    """Hold one of the service's concurrency slots for the duration of the block."""
+    sem = _limits[service]
+    sem.acquire()
+    try:
+        yield
+    finally:
+        sem.release()
+
+
+def _remove_from_seerr(tmdb_id, media_type: str) -> str:
+    # Requested titles: media id from the request index; others still need a lookup
+    indexed = request_index.lookup(tmdb_id, media_type)
+    media_id = indexed["media_id"] if indexed else None
+    if media_id is None:
+        media = overseerr.overseerr_find_media(tmdb_id, media_type)
+        if media and media.get("mediaInfo"):
+            media_id = media["mediaInfo"]["id"]
+    if media_id is None:
+        return "not_found"
+    overseerr.overseerr_delete_media(media_id)
+    request_index.discard(media_id)
+    return "removed"
+
+
+def _remove_movie(inst: dict, tmdb_id, imdb_id) -> str:
+    movie = radarr.radarr_find_movie(inst, tmdb_id=tmdb_id, imdb_id=imdb_id)
+    if not movie:
+        return "not_found"
+    radarr.radarr_delete_movie(inst, movie["id"], delete_files=True)
+    return "removed"
+
+
+def _remove_movie_by_title(inst: dict, title, year) -> str:
+    movie = radarr.radarr_find_movie_by_title(inst, title, year)
+    if not movie:
+        return "not_found"
+    radarr.radarr_delete_movie(inst, movie["id"], delete_files=True)
+    return "removed"
+
+
+def _remove_series(inst: dict, tvdb_id, tmdb_id) -> str:
+    series = None
+    if tvdb_id:
+        series = sonarr.sonarr_find_series(inst, tvdb_id)
+    if not series and tmdb_id:
+        series = sonarr.sonarr_find_series_by_tmdb(inst, tmdb_id)
+    if not series:
+        return "not_found"
+    sonarr.sonarr_delete_series(inst, series["id"], delete_files=True)
+    return "removed"
+
+
+def _remove_artist(inst: dict, mbid) -> str:
+    artist = lidarr.lidarr_find_artist(inst, mbid)
+    if not artist:
+        return "not_found"
+    lidarr.lidarr_delete_artist(inst, artist["id"], delete_files=True)
+    return "removed"
+
+
+def _run_steps(steps: list) -> dict:
+    """Run (key, service, fn) steps concurrently and return {key: result or "error: ..."}.
+
+    Steps still waiting for a service slot after REMOVE_STEP_TIMEOUT seconds are abandoned
+    without calling the service and reported as timed out. Steps that already started are
+    waited for (their HTTP timeouts bound them): they may still delete the item, and the
+    caller has to know that to tombstone it and refresh the library.
+    """
+    if not steps:
+        return {}
+    lock = threading.Lock()
+    abandoned = False
+    started = set()
+
+    def run(step):
+        key, service, fn = step
+        with service_limit(service):
+            with lock:
+                if abandoned:
+                    raise TimeoutError("timed out")
+                started.add(key)
+            return fn()
+
+    pool = ThreadPoolExecutor(max_workers=len(steps))
+    try:
+        futures = {step[0]: pool.submit(run, step) for step in steps}
+        wait(futures.values(), timeout=REMOVE_STEP_TIMEOUT)
+        with lock:
+            abandoned = True
+            running = set(started)
+        results = {}
+        for key, fut in futures.items():
+            if not fut.done() and key not in running:
+                results[key] = "error: timed out"
+                continue
+            try:
+                results[key] = fut.result()
+            except Exception as e:
+                results[key] = f"error: {e}"
+        return results
+    finally:
+        pool.shutdown(wait=False)
+
+
+def remove_item(body: dict) -> dict:
+    """Remove one item and return the per-service result dict.
+
+    body has the same keys as the /api/remove JSON (rating_key, section_id, media_type,
+    guid, title, year, tmdb_id, tvdb_id, imdb_id, mbid). Per-service failures are reported
+    as "error: ..." values; unexpected errors (e.g. Tautulli metadata lookup) raise.
+    """
+    rating_key = body.get("rating_key")
+    section_id = body.get("section_id")
+    media_type = body.get("media_type", "movie")
+    guid = body.get("guid")
+    title = body.get("title")
+    year = body.get("year")
+    tmdb_id = body.get("tmdb_id")
+    tvdb_id = body.get("tvdb_id")
+    imdb_id = body.get("imdb_id")
+    mbid = body.get("mbid")
+
+    # Resolve IDs from guid first (from library item); then from Tautulli get_metadata
+    if guid:
+        ids_from_guid = extract_ids({"guid": guid})
+        tmdb_id = tmdb_id or ids_from_guid["tmdb"]
+        tvdb_id = tvdb_id or ids_from_guid["tvdb"]
+        imdb_id = imdb_id or ids_from_guid["imdb"]
+        mbid = mbid or ids_from_guid["mbid"]
+
+    results = {"overseerr": None, "tautulli": None}
+
+    if rating_key:
+        needs_resolve = (
+            (not tmdb_id and not imdb_id)
+            or (media_type == "show" and not tvdb_id)
+            or (media_type == "artist" and not mbid)
+        )
+        if needs_resolve:
+            ids = id_cache.cached(rating_key, guid)
+            if ids is None:
+                with service_limit("tautulli"):
+                    ids = id_cache.lookup(rating_key)
+            tmdb_id = tmdb_id or ids["tmdb"]
+            tvdb_id = tvdb_id or ids["tvdb"]
+            imdb_id = imdb_id or ids["imdb"]
+            mbid = mbid or ids["mbid"]
+
+            # Fallback: find item in library media by rating_key and use its guid
+            if (not tmdb_id and not imdb_id and media_type == "movie") or (
+                media_type == "show" and not tvdb_id
+            ):
+                try:
+                    if section_id:
+                        with service_limit("tautulli"):
+                            lib_data = tautulli.get_library_media(
+                                section_id,
+                                length=500,
+                                start=0,
+                                section_type=media_type,
+                            )
+                        items = lib_data.get("data") if isinstance(lib_data.get("data"), list) else []
+                        for item in items:
+                            if isinstance(item, dict) and str(item.get("rating_key")) == str(rating_key):
+                                ids2 = extract_ids(item)
+                                tmdb_id = tmdb_id or ids2["tmdb"]
+                                tvdb_id = tvdb_id or ids2["tvdb"]
+                                imdb_id = imdb_id or ids2["imdb"]
+                                mbid = mbid or ids2["mbid"]
+                                break
+                except Exception:
+                    pass
+
+    has_ids = tmdb_id or tvdb_id or imdb_id or mbid
+    # (result key, service, fn) — Seerr and every *arr instance are independent, run them at once
+    steps = []
+
+    if not has_ids:
+        results["overseerr"] = "skipped (no IDs resolved)"
+    elif media_type == "artist":
+        results["overseerr"] = "skipped (music)"
+    elif tmdb_id:
+        steps.append(("overseerr", "overseerr", partial(_remove_from_seerr, tmdb_id, media_type)))
+    else:
+        results["overseerr"] = "skipped (no TMDB id)"
+
+    if not has_ids:
+        skip_msg = "skipped (no IDs resolved)"
+        results["arr"] = skip_msg
+        if media_type == "movie":
+            # Fallback: find movie in Radarr by title (+ year) and delete
+            if title and str(title).strip():
+                for i, inst in enumerate(RADARR_INSTANCES):
+                    steps.append((f"radarr_{i + 1}", "radarr", partial(_remove_movie_by_title, inst, title, year)))
+            else:
+                for i in range(len(RADARR_INSTANCES)):
+                    results[f"radarr_{i + 1}"] = skip_msg
+        elif media_type == "show":
+            for i in range(len(SONARR_INSTANCES)):
+                results[f"sonarr_{i + 1}"] = skip_msg
+        elif media_type == "artist":
+            for i in range(len(LIDARR_INSTANCES)):
+                results[f"lidarr_{i + 1}"] = skip_msg
+    elif media_type == "movie":
+        for i, inst in enumerate(RADARR_INSTANCES):
+            steps.append((f"radarr_{i + 1}", "radarr", partial(_remove_movie, inst, tmdb_id, imdb_id)))
+    elif media_type == "artist":
+        for i, inst in enumerate(LIDARR_INSTANCES):
+            if mbid:
+                steps.append((f"lidarr_{i + 1}", "lidarr", partial(_remove_artist, inst, mbid)))
+            else:
+                results[f"lidarr_{i + 1}"] = "skipped (no MusicBrainz id)"
+    else:
+        for i, inst in enumerate(SONARR_INSTANCES):
+            steps.append((f"sonarr_{i + 1}", "sonarr", partial(_remove_series, inst, tvdb_id, tmdb_id)))
+
+    results.update(_run_steps(steps))
+
+    # Plex refresh handled by batch endpoint after all items are processed
+    arr_succeeded = any(
+        v == "removed"
+        for k, v in results.items()
+        if k.startswith("radarr_") or k.startswith("sonarr_") or k.startswith("lidarr_")
+    )
+    if arr_succeeded and section_id:
+        results["_section_id_for_refresh"] = section_id
+        if rating_key:
+            # Tombstone: hidden right away, whether or when Tautulli is refreshed
+            library_cache.drop_rows(section_id, [rating_key])
+        else:
+            library_cache.invalidate(section_id)
+    results["plex"] = "pending" if arr_succeeded and section_id else "skipped"
+
+    # Tautulli removal disabled — items will disappear after Plex scans and Tautulli refreshes media info
+    results["tautulli"] = "skipped"
+    return results
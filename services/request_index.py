@@ -0,0 +1,172 @@
+"""In-memory index of all Seerr requests: (media type, TMDB id) -> media id and requestors.
+
+Without it every row of a library page costs one Seerr call (/movie/<tmdb> or /tv/<tmdb>)
+just to read mediaInfo.requests. Instead a background thread lists all requests with the
+paged /request endpoint, newest-modified first, and keeps them indexed:
+
+- the first pass and one every OVERSEERR_INDEX_FULL_REFRESH seconds read every page
+  (a full rescan also drops requests deleted in Seerr);
+- every OVERSEERR_INDEX_REFRESH seconds in between, only pages until the first request
+  not modified since the previous pass.
+
+Each gunicorn worker keeps its own index. Until the first pass has finished (or when the
+index has not refreshed for longer than a full-refresh interval) lookup() returns None and
+callers fall back to the per-item Seerr calls.
+"""
+import os
+import threading
+import time
+
+from config import (
+    OVERSEERR_API_KEY,
+    OVERSEERR_INDEX_FULL_REFRESH,
+    OVERSEERR_INDEX_PAGE_SIZE,
+    OVERSEERR_INDEX_REFRESH,
+)
+from services import overseerr
+
+
+def _media_key(media_type: str, tmdb_id) -> tuple[str, str]:
+    """Seerr uses "movie" / "tv"; library rows use "movie" / "show"."""
+    return ("movie" if media_type == "movie" else "tv", str(tmdb_id))
+
+
+class RequestIndex:
+    """Requests by id plus a (media type, TMDB id) index over them."""
+
+    def __init__(self):
+        # request id -> (media key, media id, requestor name)
+        self.requests: dict[int, tuple[tuple[str, str], object, str | None]] = {}
+        self.by_media: dict[tuple[str, str], set] = {}
+        # Newest "updatedAt" seen; incremental passes stop at older requests
+        self.high_water = ""
+
+    def add(self, req: dict) -> None:
+        """Insert or update one request from the /request listing."""
+        media = req.get("media") or {}
+        if req.get("id") is None or not media.get("tmdbId"):
+            return
+        self.remove(req["id"])
+        key = _media_key(media.get("mediaType"), media["tmdbId"])
+        self.requests[req["id"]] = (key, media.get("id"), overseerr.requestor_name(req))
+        self.by_media.setdefault(key, set()).add(req["id"])
+        updated = req.get("updatedAt") or req.get("createdAt") or ""
+        if updated > self.high_water:
+            self.high_water = updated
+
+    def remove(self, request_id) -> None:
+        old = self.requests.pop(request_id, None)
+        if old is None:
+            return
+        ids = self.by_media.get(old[0])
+        if ids is not None:
+            ids.discard(request_id)
+            if not ids:
+                del self.by_media[old[0]]
+
+    def lookup(self, media_type: str, tmdb_id) -> dict:
+        media_id = None
+        names = []
+        for request_id in sorted(self.by_media.get(_media_key(media_type, tmdb_id), ())):
+            _, mid, name = self.requests[request_id]
+            media_id = media_id or mid
+            if name and name not in names:
+                names.append(name)
+        return {"media_id": media_id, "requested_by": names}
+
+    def discard_media(self, media_id) -> None:
+        for request_id in [rid for rid, (_, mid, _) in self.requests.items() if mid == media_id]:
+            self.remove(request_id)
+
+
+_lock = threading.Lock()
+_index: RequestIndex | None = None
+_refreshed_at = 0.0
+_full_at = 0.0
+_thread_pid = None
+
+
+def enabled() -> bool:
+    return bool(OVERSEERR_API_KEY) and OVERSEERR_INDEX_REFRESH > 0
+
+
+def _scan(stop_before: str = "") -> list[dict]:
+    """Read pages of requests (most recently modified first) until one older than stop_before."""
+    found = []
+    skip = 0
+    while True:
+        data = overseerr.overseerr_list_requests(take=OVERSEERR_INDEX_PAGE_SIZE, skip=skip, sort="modified")
+        page = data.get("results") or []
+        for req in page:
+            if stop_before and (req.get("updatedAt") or "") < stop_before:
+                return found
+            found.append(req)
+        skip += len(page)
+        total = (data.get("pageInfo") or {}).get("results")
+        if len(page) < OVERSEERR_INDEX_PAGE_SIZE or (total is not None and skip >= total):
+            return found
+
+
+def refresh(full: bool = False) -> None:
+    """Run one refresh pass now (full rescan when asked, on first use, or when due)."""
+    global _index, _refreshed_at, _full_at
+    now = time.monotonic()
+    if full or _index is None or now - _full_at >= OVERSEERR_INDEX_FULL_REFRESH:
+        fresh = RequestIndex()
+        for req in _scan():
+            fresh.add(req)
+        with _lock:
+            _index = fresh
+            _full_at = _refreshed_at = now
+        return
+    changed = _scan(stop_before=_index.high_water)
+    with _lock:
+        for req in changed:
+            _index.add(req)
+        _refreshed_at = now
+
+
+def _run() -> None:
+    while True:
+        try:
+            refresh()
+        except Exception:
+            pass  # keep serving the last index; lookups fall back once it is too old
+        time.sleep(OVERSEERR_INDEX_REFRESH)
+
+
+def start() -> None:
+    """Start the refresh thread of this process (once per worker; safe to call repeatedly)."""
+    global _thread_pid
+    if not enabled() or _thread_pid == os.getpid():
+        return
+    with _lock:
+        if _thread_pid == os.getpid():
+            return
+        _thread_pid = os.getpid()
+    threading.Thread(target=_run, name="seerr-request-index", daemon=True).start()
+
+
+def ready() -> bool:
+    start()
+    return _index is not None and time.monotonic() - _refreshed_at < max(
+        OVERSEERR_INDEX_FULL_REFRESH, 3 * OVERSEERR_INDEX_REFRESH
+    )
+
+
+def lookup(tmdb_id, media_type: str = "movie") -> dict | None:
+    """Return {"media_id", "requested_by": [names]} for a title, or None while the index is not ready.
+
+    A title without requests gives {"media_id": None, "requested_by": []}.
+    """
+    if not ready():
+        return None
+    with _lock:
+        return _index.lookup(media_type, tmdb_id)
+
+
+def discard(media_id) -> None:
+    """Forget a Seerr media entry's requests right after it was deleted."""
+    with _lock:
+        if _index is not None:
+            _index.discard_media(media_id)
@@ -0,0 +1,98 @@
+"""Batch resolution of Seerr requestors for library rows (/api/overseerr-info).
+
+rating_key -> external IDs -> Seerr media -> requestor names. Lookups run on one shared
+thread pool (RESOLVER_WORKERS) instead of a new pool per page view, duplicate rating keys
+share a single in-flight lookup, and finished results are kept for RESOLVER_RESULT_TTL
+seconds. IDs are taken from the row's guid when it carries them, then from the persistent
+ID cache, so get_metadata is only called for items neither can resolve. Requestors come
+from the Seerr request index once it is loaded (one Seerr call per item until then).
+Lookups still running at the deadline are reported as pending and keep running; the next
+call picks up their result. A failed lookup is reported with an "error" and not kept, so
+the next call tries again.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from config import RESOLVER_RESULT_TTL, RESOLVER_WORKERS
+from services import id_cache, overseerr, request_index
+from utils.ids import extract_ids_many
+
+_pool = ThreadPoolExecutor(max_workers=max(1, RESOLVER_WORKERS), thread_name_prefix="resolver")
+_lock = threading.Lock()
+# (media_type, rating_key) -> (started_at, Future)
+_lookups: dict[tuple[str, str], tuple[float, object]] = {}
+
+
+def requestor_names(media: dict | None) -> list[str]:
+    """Return the distinct requestor display names of a Seerr media response."""
+    media_info = (media or {}).get("mediaInfo")
+    if not media_info:
+        return []
+    requestors = []
+    for req in media_info.get("requests") or []:
+        name = overseerr.requestor_name(req)
+        if name and name not in requestors:
+            requestors.append(name)
+    return requestors
+
+
+def _lookup(rating_key: str, media_type: str, guid: str | None, tmdb_id: str | None) -> dict:
+    result = {"rating_key": rating_key, "requested_by": None}
+    if not tmdb_id:
+        tmdb_id = id_cache.lookup(rating_key, guid).get("tmdb")
+    if not tmdb_id:
+        return result
+    indexed = request_index.lookup(tmdb_id, media_type)
+    if indexed is not None:
+        requestors = indexed["requested_by"]
+    else:
+        requestors = requestor_names(overseerr.overseerr_find_media(tmdb_id, media_type))
+    if requestors:
+        result["requested_by"] = ", ".join(requestors)
+    return result
+
+
+def resolve_requestors(
+    rating_keys: list,
+    media_type: str = "movie",
+    guids: dict | None = None,
+    timeout: float | None = None,
+) -> dict:
+    """Return {rating_key: {"rating_key", "requested_by"}} for the given keys.
+
+    guids optionally maps rating_key -> guid from the library rows. Keys whose lookup
+    has not finished within timeout seconds get {"rating_key", "requested_by": None, "pending": True};
+    keys whose lookup failed get {"rating_key", "requested_by": None, "error": message}.
+    """
+    guids = guids or {}
+    keys = list(dict.fromkeys(str(k) for k in rating_keys if k is not None and str(k)))
+    # TMDB ids straight from the row guids, parsed in one batch before any lookup starts
+    with_guid = [rk for rk in keys if guids.get(rk)]
+    tmdb_ids = {
+        rk: ids["tmdb"] for rk, ids in zip(with_guid, extract_ids_many([{"guid": guids[rk]} for rk in with_guid]))
+    }
+    now = time.monotonic()
+    futures = {}
+    with _lock:
+        for key in [k for k, (started, fut) in _lookups.items() if fut.done() and now - started > RESOLVER_RESULT_TTL]:
+            del _lookups[key]
+        for rk in keys:
+            entry = _lookups.get((media_type, rk))
+            if entry is None:
+                entry = (now, _pool.submit(_lookup, rk, media_type, guids.get(rk), tmdb_ids.get(rk)))
+                _lookups[(media_type, rk)] = entry
+            futures[rk] = entry[1]
+    wait(list(futures.values()), timeout=timeout)
+    info = {}
+    for rk, fut in futures.items():
+        if fut.done() and fut.exception() is not None:
+            with _lock:
+                if _lookups.get((media_type, rk), (None, None))[1] is fut:
+                    del _lookups[(media_type, rk)]
+            info[rk] = {"rating_key": rk, "requested_by": None, "error": str(fut.exception())}
+        elif fut.done():
+            info[rk] = fut.result()
+        else:
+            info[rk] = {"rating_key": rk, "requested_by": None, "pending": True}
+    return info
@@ -0,0 +1,132 @@
+"""Inverted index over library titles for the combined view's search box.
+
+Titles are normalized with radarr._normalize_title (lower case, punctuation removed) and
+split into tokens. A query matches a row when every query token matches one of its
+tokens, where a query token matches a title token that:
+
+- starts with it (prefix; "star wa" finds "Star Wars"), or, only if nothing does,
+- is one edit away (insert, delete, substitute or swap two adjacent letters) for query
+  tokens of FUZZY_MIN_LENGTH letters or more ("godfater" finds "The Godfather").
+
+Fuzzy candidates come from a delete-one-letter neighborhood map, so no query scans every
+token. Rows can be added and removed one at a time; library_cache keeps one index per
+section snapshot and library_sync one per synced section.
+"""
+from bisect import bisect_left, insort
+
+from services.radarr import _normalize_title
+
+# Shortest query token that is also matched with one typo
+FUZZY_MIN_LENGTH = 4
+
+
+def tokens(text: str) -> list[str]:
+    return _normalize_title(text).split()
+
+
+def _deletes(token: str) -> set[str]:
+    """token with each single letter removed."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by exactly one insert, delete, substitution or adjacent swap."""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    if len(a) > len(b):
+        a, b = b, a
+    return a in _deletes(b)
+
+
+def row_text(row: dict) -> str:
+    """Searchable text of a Tautulli library row: title, sort title and year."""
+    return " ".join(str(row.get(k) or "") for k in ("title", "sort_title", "year"))
+
+
+class SearchIndex:
+    """token -> row keys, plus the sorted token list (prefixes) and delete map (typos)."""
+
+    def __init__(self):
+        self._postings: dict[str, set] = {}
+        self._row_tokens: dict[object, tuple[str, ...]] = {}
+        self._sorted: list[str] = []
+        self._fuzzy: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_tokens)
+
+    def add(self, key, text: str) -> None:
+        """Index (or re-index) one row under key."""
+        self.remove(key)
+        toks = tuple(set(tokens(text)))
+        self._row_tokens[key] = toks
+        for tok in toks:
+            keys = self._postings.get(tok)
+            if keys is None:
+                keys = self._postings[tok] = set()
+                insort(self._sorted, tok)
+                for variant in _deletes(tok) | {tok}:
+                    self._fuzzy.setdefault(variant, set()).add(tok)
+            keys.add(key)
+
+    def remove(self, key) -> None:
+        for tok in self._row_tokens.pop(key, ()):
+            keys = self._postings[tok]
+            keys.discard(key)
+            if keys:
+                continue
+            del self._postings[tok]
+            del self._sorted[bisect_left(self._sorted, tok)]
+            for variant in _deletes(tok) | {tok}:
+                similar = self._fuzzy[variant]
+                similar.discard(tok)
+                if not similar:
+                    del self._fuzzy[variant]
+
+    def _prefixed(self, prefix: str) -> list[str]:
+        i = bisect_left(self._sorted, prefix)
+        found = []
+        while i < len(self._sorted) and self._sorted[i].startswith(prefix):
+            found.append(self._sorted[i])
+            i += 1
+        return found
+
+    def _typos(self, term: str) -> set[str]:
+        candidates = set()
+        for variant in _deletes(term) | {term}:
+            candidates |= self._fuzzy.get(variant, set())
+        return {tok for tok in candidates if _one_edit(term, tok)}
+
+    def _term_keys(self, term: str) -> set:
+        matched = self._prefixed(term)
+        if not matched and len(term) >= FUZZY_MIN_LENGTH:
+            matched = self._typos(term)
+        keys = set()
+        for tok in matched:
+            keys |= self._postings[tok]
+        return keys
+
+    def search(self, query: str) -> set:
+        """Keys of the rows matching every token of query (an empty query matches nothing)."""
+        result = None
+        # Rarest-looking (longest) terms first, so the intersection shrinks early
+        for term in sorted(set(tokens(query)), key=len, reverse=True):
+            keys = self._term_keys(term)
+            result = keys if result is None else result & keys
+            if not result:
+                return set()
+        return result or set()
+
+
+def build(rows, key=lambda row: str(row.get("rating_key"))) -> SearchIndex:
+    """Index Tautulli library rows by rating key."""
+    index = SearchIndex()
+    for row in rows:
+        if isinstance(row, dict):
+            index.add(key(row), row_text(row))
+    return index
@@ -1,38 +1,57 @@
 """Sonarr API client (multi-instance)."""
-import requests
+from services import catalog
+from services.client import get_session
+from utils.jsonstream import iter_items
+
+# Bytes read from the response at a time while streaming the catalog
+_CHUNK_SIZE = 64 * 1024
+
+
+def _load_series(instance: dict):
+    """Stream the full series list of a Sonarr instance, one record at a time."""
+    with get_session("sonarr").get(
+        f"{instance['url']}/api/v3/series",
+        params={"apikey": instance["api_key"]},
+        timeout=30,
+        stream=True,
+    ) as r:
+        r.raise_for_status()
+        yield from iter_items(r.iter_content(_CHUNK_SIZE))
+
+
+_CATALOG_KEYS = {
+    "tvdb": lambda s: str(s["tvdbId"]) if s.get("tvdbId") else None,
+    "tmdb": lambda s: str(s["tmdbId"]) if s.get("tmdbId") else None,
+}
 
 
 def sonarr_find_series(instance: dict, tvdb_id) -> dict | None:
     """Find a series in a Sonarr instance by its TVDB id."""
-    r = requests.get(
+    # The catalog only if it is already loaded: a single removal should not download it
+    index = catalog.loaded("sonarr", instance)
+    series = index.first("tvdb", str(tvdb_id)) if index else None
+    if series:
+        return series
+    # Not loaded, or not in it (may have been added since): ask Sonarr for this series
+    with get_session("sonarr").get(
         f"{instance['url']}/api/v3/series",
         params={"apikey": instance["api_key"], "tvdbId": tvdb_id},
         timeout=15,
-    )
-    r.raise_for_status()
-    series = r.json()
-    if isinstance(series, list) and series:
-        return series[0]
-    return None
+        stream=True,
+    ) as r:
+        r.raise_for_status()
+        return next(iter_items(r.iter_content(_CHUNK_SIZE)), None)
 
 
 def sonarr_find_series_by_tmdb(instance: dict, tmdb_id) -> dict | None:
-    """Fallback: find series by iterating all series and matching tmdbId."""
-    r = requests.get(
-        f"{instance['url']}/api/v3/series",
-        params={"apikey": instance["api_key"]},
-        timeout=30,
-    )
-    r.raise_for_status()
-    for s in r.json():
-        if str(s.get("tmdbId", "")) == str(tmdb_id):
-            return s
-    return None
+    """Fallback: find series by tmdbId in the instance's cached catalog."""
+    want = str(tmdb_id)
+    return catalog.find("sonarr", instance, _load_series, _CATALOG_KEYS, lambda index: index.first("tmdb", want))
 
 
 def sonarr_delete_series(instance: dict, series_id, delete_files: bool = True) -> bool:
     """Delete a series from a Sonarr instance."""
-    r = requests.delete(
+    r = get_session("sonarr").delete(
         f"{instance['url']}/api/v3/series/{series_id}",
         params={
             "apikey": instance["api_key"],
@@ -42,4 +61,5 @@ def sonarr_delete_series(instance: dict, series_id, delete_files: bool = True) -
         timeout=15,
     )
     r.raise_for_status()
+    catalog.discard("sonarr", instance, series_id)
     return True
@@ -0,0 +1,39 @@
+"""Local SQLite store shared by all gunicorn workers.
+
+The database lives in DATA_DIR (one file per purpose) and is opened in WAL mode so
+several worker processes can read while one writes. Connections are per thread.
+"""
+import os
+import sqlite3
+import threading
+
+from config import DATA_DIR
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized: set[str] = set()
+
+
+def connect(name: str, schema: str = "") -> sqlite3.Connection:
+    """Return this thread's connection to DATA_DIR/<name>.sqlite3, creating tables from schema once."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(name)
+    if conn is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        conn = sqlite3.connect(
+            os.path.join(DATA_DIR, f"{name}.sqlite3"),
+            timeout=10,
+            isolation_level=None,  # autocommit; use explicit BEGIN for multi-statement writes
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conns[name] = conn
+    if schema and name not in _initialized:
+        with _init_lock:
+            if name not in _initialized:
+                conn.executescript(schema)
+                _initialized.add(name)
+    return conn
@@ -1,21 +1,25 @@
 """Tautulli API client."""
-import requests
-
 from config import TAUTULLI_API_KEY, TAUTULLI_URL
+from services.client import get_session
+from utils.singleflight import SingleFlight
 
 # Keep under typical gunicorn worker timeout so we get TimeoutError, not worker kill
 TAUTULLI_TIMEOUT = 15
 
 
-def tautulli_get(cmd: str, params: dict | None = None, timeout: int | None = None) -> dict | list:
-    """Call the Tautulli API."""
+# Concurrent identical read calls (get_* commands) share one request to Tautulli
+_flights = SingleFlight()
+
+
+def _request(cmd: str, params: dict | None, timeout: int | None) -> dict:
+    """GET one Tautulli API command and return the parsed JSON body."""
     if not TAUTULLI_API_KEY:
         raise ValueError("TAUTULLI_API_KEY is not set — check your .env file")
     p = {"apikey": TAUTULLI_API_KEY, "cmd": cmd}
     if params:
         p.update(params)
     url = f"{TAUTULLI_URL}/api/v2"
-    r = requests.get(url, params=p, timeout=timeout or TAUTULLI_TIMEOUT)
+    r = get_session("tautulli").get(url, params=p, timeout=timeout or TAUTULLI_TIMEOUT)
     r.raise_for_status()
     ct = r.headers.get("Content-Type", "")
     if "json" not in ct and "javascript" not in ct:
@@ -23,7 +27,23 @@ def tautulli_get(cmd: str, params: dict | None = None, timeout: int | None = Non
             f"Tautulli returned non-JSON (Content-Type: {ct}). "
             f"Check TAUTULLI_URL ({TAUTULLI_URL}) and TAUTULLI_API_KEY."
         )
-    data = r.json()
+    return r.json()
+
+
+def _call(cmd: str, params: dict | None = None, timeout: int | None = None) -> dict:
+    """_request(), joined with an identical call already in flight for read-only commands.
+
+    The timeout is not part of the key: a caller joining a running call waits for it.
+    """
+    if not cmd.startswith("get_"):
+        return _request(cmd, params, timeout)
+    key = (cmd, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+    return _flights.do(key, _request, cmd, params, timeout)
+
+
+def tautulli_get(cmd: str, params: dict | None = None, timeout: int | None = None) -> dict | list:
+    """Call the Tautulli API."""
+    data = _call(cmd, params, timeout)
     resp = data.get("response", {})
     if resp.get("result") != "success":
         msg = resp.get("message", "unknown error")
@@ -35,21 +55,7 @@ def tautulli_get_response(cmd: str, params: dict | None = None, timeout: int | N
     """Call the Tautulli API and return the full response dict (result, message, data) without raising.
     Use this when you need to inspect the raw response (e.g. to detect 'calculating file sizes').
     """
-    if not TAUTULLI_API_KEY:
-        raise ValueError("TAUTULLI_API_KEY is not set — check your .env file")
-    p = {"apikey": TAUTULLI_API_KEY, "cmd": cmd}
-    if params:
-        p.update(params)
-    url = f"{TAUTULLI_URL}/api/v2"
-    r = requests.get(url, params=p, timeout=timeout or TAUTULLI_TIMEOUT)
-    r.raise_for_status()
-    ct = r.headers.get("Content-Type", "")
-    if "json" not in ct and "javascript" not in ct:
-        raise ValueError(
-            f"Tautulli returned non-JSON (Content-Type: {ct}). "
-            f"Check TAUTULLI_URL ({TAUTULLI_URL}) and TAUTULLI_API_KEY."
-        )
-    data = r.json()
+    data = _call(cmd, params, timeout)
     return data.get("response", {})
 
 
@@ -129,6 +135,7 @@ def get_library_media_response(
     order_column: str = "last_played",
     order_dir: str = "asc",
     section_type: str | None = None,
+    timeout: int | None = None,
 ) -> dict:
     """Fetch library media and return the full Tautulli response (result, message, data).
     Use this to detect states like 'calculating file sizes' from response.message or response.data.
@@ -144,7 +151,56 @@ def get_library_media_response(
         params["search"] = search
     if section_type:
         params["section_type"] = section_type
-    return tautulli_get_response("get_library_media_info", params)
+    return tautulli_get_response("get_library_media_info", params, timeout=timeout)
+
+
+def get_library_media_page(
+    section_id,
+    start: int = 0,
+    length: int = 50,
+    search: str | None = None,
+    order_column: str = "last_played",
+    order_dir: str = "asc",
+    section_type: str | None = None,
+    timeout: int | None = None,
+) -> tuple[list, int | None, bool]:
+    """Fetch one page of library media rows.
+
+    Returns (rows, records_filtered, calculating_file_sizes); records_filtered is None when
+    Tautulli did not report it. Raises ValueError on an unsuccessful response unless
+    Tautulli is only calculating file sizes (then rows are empty).
+    """
+    resp = get_library_media_response(
+        section_id,
+        length=length,
+        start=start,
+        search=search,
+        order_column=order_column,
+        order_dir=order_dir,
+        section_type=section_type,
+        timeout=timeout,
+    )
+    calculating = response_indicates_calculating_file_sizes(resp)
+    if resp.get("result") != "success":
+        if calculating:
+            return [], None, True
+        raise ValueError(f"Tautulli API error: {resp.get('message') or 'unknown error'}")
+    inner = resp.get("data")
+    total = None
+    if isinstance(inner, dict):
+        rows = inner.get("data") if isinstance(inner.get("data"), list) else []
+        filtered = inner.get("recordsFiltered")
+        if filtered is None:
+            filtered = inner.get("recordsTotal")
+        try:
+            total = int(filtered) if filtered not in (None, "") else None
+        except (TypeError, ValueError):
+            total = None
+    elif isinstance(inner, list):
+        rows = inner
+    else:
+        rows = []
+    return [r for r in rows if isinstance(r, dict)], total, calculating
 
 
 def get_metadata(rating_key) -> dict:
@@ -1,8 +1,14 @@
 """Pytest fixtures."""
 import os
+import tempfile
 
 import pytest
 
+# Keep the local SQLite store out of the working tree during tests
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="magic-erasarr-test-"))
+# No background health probes; tests call services.health directly
+os.environ.setdefault("STATUS_PROBE_INTERVAL", "0")
+
 
 @pytest.fixture
 def app():
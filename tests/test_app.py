@@ -1,4 +1,7 @@
 """Tests for Flask app and main routes."""
+import os
+import time
+
 import pytest
 
 
@@ -31,3 +34,258 @@ def test_api_status_disabled_when_stat_false(client):
     r = client.get("/api/status")
     # STAT defaults from env; in CI often unset so may be True. Just ensure JSON response.
     assert r.content_type == "application/json"
+
+
+def test_api_library_combined_partial_results(client, monkeypatch):
+    """A failing library is reported in library_errors while the others are still returned."""
+    from services import library_cache, tautulli
+
+    library_cache.invalidate(1)
+    library_cache.invalidate(2)
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: [
+        {"section_id": 1, "section_name": "Movies", "section_type": "movie"},
+        {"section_id": 2, "section_name": "Movies 4K", "section_type": "movie"},
+    ])
+
+    def fake_response(section_id, **kwargs):
+        if str(section_id) == "2":
+            raise ValueError("connection refused")
+        return {"result": "success", "data": {"data": [
+            {"rating_key": "10", "sort_title": "a", "last_played": 5, "file_size": 1},
+        ], "total_file_size": 1, "recordsTotal": 1}}
+
+    monkeypatch.setattr(tautulli, "get_library_media_response", fake_response)
+    r = client.get("/api/library/combined?type=movie")
+    data = r.get_json()
+    assert r.status_code == 200
+    assert [i["rating_key"] for i in data["data"]] == ["10"]
+    assert data["library_errors"] == [
+        {"section_id": "2", "library_name": "Movies 4K", "error": "connection refused"},
+    ]
+
+
+def test_api_library_combined_lists_unsynced_libraries(client, monkeypatch):
+    """A library the mirror has not synced yet is still listed; the view is served live meanwhile."""
+    from services import library_sync, tautulli
+
+    monkeypatch.setattr(library_sync, "LIBRARY_SYNC_INTERVAL", 3600)
+    monkeypatch.setattr(library_sync, "_libs_at", 0.0)
+    monkeypatch.setattr(library_sync, "_retry_at", {})
+    monkeypatch.setattr(library_sync, "_thread_pid", os.getpid())
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: [
+        {"section_id": 171, "section_name": "Movies", "section_type": "movie"},
+        {"section_id": 172, "section_name": "Movies 4K", "section_type": "movie"},
+    ])
+
+    def fake_response(section_id, **kwargs):
+        if str(section_id) == "172":
+            return {"result": "error", "message": "Tautulli is calculating file sizes"}
+        return {"result": "success", "data": {"data": [
+            {"rating_key": "10", "sort_title": "a", "last_played": 5, "file_size": 1},
+        ], "total_file_size": 1, "recordsTotal": 1}}
+
+    monkeypatch.setattr(tautulli, "get_library_media_response", fake_response)
+    library_sync.sync_due()
+    assert library_sync.covers([171]) and not library_sync.covers([172])
+
+    data = client.get("/api/library/combined?type=movie").get_json()
+    assert data["libraries"] == ["Movies", "Movies 4K"]
+    assert [i["rating_key"] for i in data["data"]] == ["10"]
+    assert data["tautulli_calculating_file_sizes"] is True
+
+
+def test_api_library_combined_uses_snapshot_until_invalidated(client, monkeypatch):
+    """Paging and sorting reuse the cached section snapshot; invalidate() forces a refetch."""
+    from services import library_cache, tautulli
+
+    library_cache.invalidate(7)
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: [
+        {"section_id": 7, "section_name": "Docs", "section_type": "movie"},
+    ])
+    calls = []
+
+    def fake_response(section_id, **kwargs):
+        calls.append(section_id)
+        return {"result": "success", "data": {"data": [
+            {"rating_key": "1", "sort_title": "b", "last_played": 2, "file_size": 1},
+            {"rating_key": "2", "sort_title": "a", "last_played": 1, "file_size": 1},
+        ], "recordsFiltered": 2, "total_file_size": 2}}
+
+    def wait_for_snapshot():
+        deadline = time.monotonic() + 5
+        while not library_cache.ready(7) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert library_cache.ready(7)
+
+    monkeypatch.setattr(tautulli, "get_library_media_response", fake_response)
+    # Cold: the page comes live from Tautulli while the snapshot is filled in the background
+    assert client.get("/api/library/combined?type=movie").status_code == 200
+    wait_for_snapshot()
+    assert len(calls) == 2
+    r1 = client.get("/api/library/combined?type=movie&order_column=sort_title")
+    r2 = client.get("/api/library/combined?type=movie&order_column=last_played&order_dir=desc&length=1")
+    assert [i["rating_key"] for i in r1.get_json()["data"]] == ["2", "1"]
+    assert [i["rating_key"] for i in r2.get_json()["data"]] == ["1"]
+    assert len(calls) == 2
+
+    library_cache.invalidate(7)
+    client.get("/api/library/combined?type=movie")
+    wait_for_snapshot()
+    assert len(calls) == 4
+
+
+def test_api_library_combined_merge_cursor_without_cache(client, monkeypatch):
+    """With the snapshot cache off, page 2 continues from page 1's cursor instead of refetching."""
+    from services import library_cache, tautulli
+
+    monkeypatch.setattr(library_cache, "LIBRARY_CACHE_TTL", 0)
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: [
+        {"section_id": 31, "section_name": "A", "section_type": "artist"},
+        {"section_id": 32, "section_name": "B", "section_type": "artist"},
+    ])
+    data = {
+        "31": [{"rating_key": f"a{i}", "play_count": i} for i in range(0, 300, 2)],
+        "32": [{"rating_key": f"b{i}", "play_count": i} for i in range(1, 300, 2)],
+    }
+    calls = []
+
+    def fake_page(section_id, start=0, length=50, **kwargs):
+        calls.append((str(section_id), start))
+        rows = data[str(section_id)]
+        return rows[start : start + length], len(rows), False
+
+    monkeypatch.setattr(tautulli, "get_library_media_page", fake_page)
+    url = "/api/library/combined?type=artist&order_column=play_count&length=100"
+    page1 = client.get(url + "&start=0").get_json()
+    page2 = client.get(url + "&start=100").get_json()
+    assert [i["play_count"] for i in page1["data"]] == list(range(0, 100))
+    assert [i["play_count"] for i in page2["data"]] == list(range(100, 200))
+    assert page2["recordsTotal"] == 300
+    assert ("31", 0) in calls and calls.count(("31", 0)) == 1
+
+
+def test_api_library_combined_sorts_shows_by_resolved_file_size(client, monkeypatch):
+    """Without the cache, shows sorted by size are read whole and sorted by their fallback size."""
+    from services import library_cache, tautulli
+
+    monkeypatch.setattr(library_cache, "LIBRARY_CACHE_TTL", 0)
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: [
+        {"section_id": 51, "section_name": "A", "section_type": "show"},
+        {"section_id": 52, "section_name": "B", "section_type": "show"},
+    ])
+    data = {
+        "51": [{"rating_key": "a1", "file_size": "", "total_file_size": "900"}, {"rating_key": "a2", "file_size": "5"}],
+        "52": [{"rating_key": "b1", "file_size": "3"}],
+    }
+    monkeypatch.setattr(tautulli, "get_library_media_page", lambda sid, start=0, length=50, **kw: (
+        data[str(sid)][start : start + length], len(data[str(sid)]), False,
+    ))
+    rows = client.get("/api/library/combined?type=show&order_column=file_size").get_json()["data"]
+    assert [(r["rating_key"], r["file_size"]) for r in rows] == [("b1", 3), ("a2", 5), ("a1", 900)]
+
+
+def test_api_library_combined_streams_all_rows_as_ndjson(client, monkeypatch):
+    """format=ndjson&length=-1 streams a meta line, every merged row, then a done line."""
+    import json
+
+    from services import library_cache, tautulli
+
+    monkeypatch.setattr(library_cache, "LIBRARY_CACHE_TTL", 0)
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: [
+        {"section_id": 41, "section_name": "A", "section_type": "artist"},
+        {"section_id": 42, "section_name": "B", "section_type": "artist"},
+    ])
+    data = {
+        "41": [{"rating_key": f"a{i}", "play_count": i} for i in range(0, 300, 2)],
+        "42": [{"rating_key": f"b{i}", "play_count": i} for i in range(1, 300, 2)],
+    }
+
+    def fake_page(section_id, start=0, length=50, **kwargs):
+        rows = data[str(section_id)]
+        return rows[start : start + length], len(rows), False
+
+    monkeypatch.setattr(tautulli, "get_library_media_page", fake_page)
+    r = client.get("/api/library/combined?type=artist&order_column=play_count&length=-1&format=ndjson")
+    assert r.mimetype == "application/x-ndjson"
+    lines = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+    assert lines[0]["meta"]["recordsTotal"] == 300
+    assert lines[0]["meta"]["libraries"] == ["A", "B"]
+    assert [l["play_count"] for l in lines[1:-1]] == list(range(300))
+    assert lines[1]["library_name"] == "A"
+    assert lines[-1] == {"done": True, "count": 300, "library_errors": []}
+
+
+def test_api_libraries_gzip_and_etag_revalidation(client, monkeypatch):
+    """Large API responses are gzipped when accepted; an unchanged reload is answered with 304."""
+    import gzip
+    import json
+
+    from services import tautulli
+
+    libs = [{"section_id": i, "section_name": f"Library {i}", "section_type": "movie"} for i in range(100)]
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: libs)
+    r = client.get("/api/libraries", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["Vary"]
+    assert json.loads(gzip.decompress(r.data)) == libs
+    etag = r.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    again = client.get("/api/libraries", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    plain = client.get("/api/libraries", headers={"If-None-Match": etag})
+    assert plain.status_code == 304
+
+    libs.append({"section_id": 100, "section_name": "New", "section_type": "show"})
+    changed = client.get("/api/libraries", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert "Content-Encoding" not in changed.headers
+    assert changed.get_json()[-1]["section_name"] == "New"
+
+
+def test_api_remove_batch_streams_ndjson(client, monkeypatch):
+    """Each item's result is streamed as one NDJSON line, then a summary of sections to refresh."""
+    import json
+
+    from services import removal
+
+    def fake_remove(item):
+        if item["rating_key"] == "2":
+            raise ValueError("tautulli down")
+        return {"radarr_1": "removed", "_section_id_for_refresh": item["section_id"]}
+
+    monkeypatch.setattr(removal, "remove_item", fake_remove)
+    r = client.post("/api/remove/batch", json={"items": [
+        {"rating_key": "1", "section_id": "5", "media_type": "movie"},
+        {"rating_key": "2", "section_id": "5", "media_type": "movie"},
+    ]})
+    assert r.mimetype == "application/x-ndjson"
+    lines = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+    by_key = {l["rating_key"]: l for l in lines if "index" in l}
+    assert by_key["1"]["result"]["radarr_1"] == "removed"
+    assert by_key["2"]["error"] == "tautulli down"
+    assert lines[-1] == {"done": True, "sections": [{"section_id": "5", "section_type": "movie"}]}
+
+
+def test_api_refresh_requires_sections_and_known_job(client):
+    """POST /api/refresh without sections is rejected; unknown job ids are 404."""
+    assert client.post("/api/refresh", json={"sections": []}).status_code == 400
+    assert client.get("/api/refresh/nope").status_code == 404
+
+
+def test_api_refresh_plex_joins_the_refresh_scheduler(client, monkeypatch):
+    """/api/refresh-plex starts (or joins) a scheduler job instead of scanning Plex itself."""
+    from routes import api
+    from services import plex, refresh
+
+    monkeypatch.setattr(api, "PLEX_URL", "http://plex")
+    monkeypatch.setattr(api, "PLEX_TOKEN", "token")
+    monkeypatch.setattr(plex, "plex_refresh_library", lambda sid: pytest.fail("scanned outside the scheduler"))
+    started = []
+    monkeypatch.setattr(refresh, "start", lambda sections: started.append(sections) or {"id": "j14", "state": "queued"})
+
+    r = client.post("/api/refresh-plex", json={"section_ids": ["1", {"section_id": "2", "section_type": "show"}]})
+    assert r.status_code == 202
+    assert r.get_json() == {"id": "j14", "state": "queued", "refreshed": ["1", "2"], "errors": []}
+    assert started == [[{"section_id": "1", "section_type": None}, {"section_id": "2", "section_type": "show"}]]
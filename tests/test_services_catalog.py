@@ -0,0 +1,108 @@
+"""Tests for services.catalog and the *arr find functions that use it."""
+from services import catalog, radarr, sonarr
+
+MOVIES = [
+    {"id": 1, "title": "Afro Samurai: Resurrection", "year": 2009, "tmdbId": 100, "imdbId": "tt0123", "monitored": True},
+    {"id": 2, "title": "Heat", "year": 1995, "tmdbId": 949, "imdbId": "tt0113277"},
+    {"id": 3, "title": "Heat", "year": 1986, "tmdbId": 5000},
+]
+
+
+def test_radarr_lookups_use_one_catalog_download(monkeypatch):
+    """IMDB, title and title+year lookups are served from a single cached download."""
+    inst = {"url": "http://radarr-catalog-test", "api_key": "k", "name": "R"}
+    catalog.invalidate("radarr", inst)
+    loads = []
+    monkeypatch.setattr(radarr, "_load_movies", lambda i: loads.append(i) or MOVIES)
+
+    assert radarr.radarr_find_movie(inst, imdb_id="tt123")["id"] == 1
+    assert radarr.radarr_find_movie(inst, tmdb_id=949)["id"] == 2
+    assert radarr.radarr_find_movie_by_title(inst, "Heat", 1986)["id"] == 3
+    assert radarr.radarr_find_movie_by_title(inst, "Heat")["id"] == 2
+    assert radarr.radarr_find_movie_by_title(inst, "afro samurai")["id"] == 1
+    assert radarr.radarr_find_movie_by_title(inst, "Heat", 2020) is None
+    assert len(loads) == 1
+    # Only the fields the matchers need are kept
+    assert "monitored" not in radarr.radarr_find_movie(inst, imdb_id="tt0123")
+
+
+def test_discard_removes_deleted_record(monkeypatch):
+    """A deleted series disappears from every index without reloading the catalog."""
+    inst = {"url": "http://sonarr-catalog-test", "api_key": "k", "name": "S"}
+    catalog.invalidate("sonarr", inst)
+    monkeypatch.setattr(sonarr, "_load_series", lambda i: [{"id": 7, "tvdbId": 70, "tmdbId": 700}])
+    assert sonarr.sonarr_find_series_by_tmdb(inst, 700)["id"] == 7
+    catalog.discard("sonarr", inst, 7)
+    assert sonarr.sonarr_find_series_by_tmdb(inst, 700) is None
+
+
+def test_concurrent_lookups_share_one_download(monkeypatch):
+    """Lookups that miss the cache at the same time wait for one catalog download."""
+    import threading
+    import time
+
+    inst = {"url": "http://radarr-catalog-flight", "api_key": "k", "name": "R"}
+    catalog.invalidate("radarr", inst)
+    loads = []
+
+    def slow_load(i):
+        loads.append(i)
+        time.sleep(0.2)
+        return MOVIES
+
+    monkeypatch.setattr(radarr, "_load_movies", slow_load)
+    threads = [threading.Thread(target=radarr.radarr_find_movie, args=(inst, None, "tt0113277")) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1
+
+
+def test_miss_reloads_an_older_catalog_once(monkeypatch):
+    """An artist added after the download is found by reloading the catalog on the miss."""
+    from services import lidarr
+
+    inst = {"url": "http://lidarr-catalog-reload", "api_key": "k", "name": "L"}
+    catalog.invalidate("lidarr", inst)
+    artists = [{"id": 1, "foreignArtistId": "mb-1"}]
+    loads = []
+    monkeypatch.setattr(lidarr, "_load_artists", lambda i: loads.append(i) or list(artists))
+    assert lidarr.lidarr_find_artist(inst, "mb-1")["id"] == 1
+    artists.append({"id": 2, "foreignArtistId": "mb-2"})
+    # A fresh index is trusted: no reload for every unknown id
+    assert lidarr.lidarr_find_artist(inst, "mb-2") is None
+    assert len(loads) == 1
+    catalog.loaded("lidarr", inst).loaded_at -= catalog.RELOAD_AFTER_MISS
+    assert lidarr.lidarr_find_artist(inst, "mb-2")["id"] == 2
+    assert len(loads) == 2
+
+
+def test_tmdb_lookup_does_not_download_a_cold_catalog(monkeypatch):
+    """With no catalog loaded, a TMDB lookup asks Radarr for that movie only."""
+    inst = {"url": "http://radarr-catalog-cold", "api_key": "k", "name": "R"}
+    catalog.invalidate("radarr", inst)
+    calls = []
+
+    class FakeResponse:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, size):
+            yield b'[{"id": 2, "tmdbId": 949}]'
+
+    class FakeSession:
+        def get(self, url, params=None, **kwargs):
+            calls.append(params)
+            return FakeResponse()
+
+    monkeypatch.setattr(radarr, "get_session", lambda service: FakeSession())
+    monkeypatch.setattr(radarr, "_load_movies", lambda i: (_ for _ in ()).throw(AssertionError("catalog downloaded")))
+    assert radarr.radarr_find_movie(inst, tmdb_id=949)["id"] == 2
+    assert calls == [{"apikey": "k", "tmdbId": 949}]
@@ -0,0 +1,16 @@
+"""Tests for services.client."""
+from services.client import get_session, pool_stats
+
+
+def test_get_session_is_shared_per_service():
+    """Same service name returns the same pooled session; different names do not."""
+    assert get_session("radarr") is get_session("radarr")
+    assert get_session("radarr") is not get_session("sonarr")
+
+
+def test_pool_stats_lists_created_sessions():
+    """Stats include every created session with reuse counters."""
+    get_session("tautulli")
+    stats = pool_stats()
+    assert "tautulli" in stats
+    assert set(stats["tautulli"]) == {"connections", "requests", "reused", "hosts"}
@@ -0,0 +1,48 @@
+"""Tests for services.health."""
+import threading
+import time
+
+from services import health
+
+
+def _fail():
+    raise ValueError("connection refused")
+
+
+def test_checks_run_concurrently_and_keep_last_success(monkeypatch):
+    monkeypatch.setattr(health, "STATUS_PROBE_INTERVAL", 60)
+    monkeypatch.setattr(health, "start", lambda: None)
+    monkeypatch.setattr(health, "_state", {})
+    # Both checks must be running at the same time to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def check(result):
+        barrier.wait()
+        time.sleep(0.3)
+        return result
+
+    monkeypatch.setattr(health, "_checks", lambda: [
+        ("tautulli", lambda: check(("2.13", "Tautulli"))),
+        ("radarr_1", lambda: check(("5.0", "Radarr"))),
+    ])
+    first = health.status(fresh=True)
+    assert first["radarr_1"]["status"] == "ok"
+    assert first["tautulli"]["status"] == "ok" and first["tautulli"]["latency_ms"] >= 300
+    ok_at = first["radarr_1"]["last_success"]
+
+    monkeypatch.setattr(health, "_checks", lambda: [("tautulli", lambda: ("2.13", "Tautulli")), ("radarr_1", _fail)])
+    # Cached result is returned without checking again
+    assert health.status()["radarr_1"]["status"] == "ok"
+    fresh = health.status(fresh=True)
+    assert fresh["radarr_1"]["status"] == "error"
+    assert fresh["radarr_1"]["error"] == "connection refused"
+    assert fresh["radarr_1"]["last_success"] == ok_at
+
+
+def test_services_are_checking_until_the_first_probe(monkeypatch):
+    """Without a probe result yet, status() answers at once instead of checking inline."""
+    monkeypatch.setattr(health, "STATUS_PROBE_INTERVAL", 60)
+    monkeypatch.setattr(health, "start", lambda: None)
+    monkeypatch.setattr(health, "_state", {})
+    monkeypatch.setattr(health, "_checks", lambda: [("tautulli", _fail), ("radarr_1", _fail)])
+    assert health.status() == {"tautulli": {"status": "checking"}, "radarr_1": {"status": "checking"}}
@@ -0,0 +1,27 @@
+"""Tests for services.id_cache."""
+from services import id_cache, tautulli
+
+
+def test_lookup_is_cached_and_guid_change_refetches(monkeypatch):
+    """The second lookup is served from disk; a different guid fingerprint triggers a refetch."""
+    calls = []
+    meta = {"guid": "plex://movie/abc", "guids": ["tmdb://11", "imdb://tt0011"]}
+    monkeypatch.setattr(tautulli, "get_metadata", lambda rk: calls.append(rk) or meta)
+
+    first = id_cache.lookup("idc-1")
+    assert first == {"guid": "plex://movie/abc", "tmdb": "11", "tvdb": None, "imdb": "tt0011", "mbid": None}
+    assert id_cache.lookup("idc-1", guid="plex://movie/abc") == first
+    assert calls == ["idc-1"]
+
+    meta = {"guid": "plex://movie/xyz", "guids": ["tmdb://12"]}
+    assert id_cache.lookup("idc-1", guid="plex://movie/xyz")["tmdb"] == "12"
+    assert calls == ["idc-1", "idc-1"]
+
+
+def test_items_without_ids_are_not_stored(monkeypatch):
+    """Unresolvable items are looked up again next time."""
+    calls = []
+    monkeypatch.setattr(tautulli, "get_metadata", lambda rk: calls.append(rk) or {})
+    id_cache.lookup("idc-empty")
+    id_cache.lookup("idc-empty")
+    assert calls == ["idc-empty", "idc-empty"]
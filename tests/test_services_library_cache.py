@@ -0,0 +1,68 @@
+"""Tests for services.library_cache."""
+from services import library_cache, tautulli
+
+
+def _serve(monkeypatch, keys, calls):
+    def page(section_id, start=0, length=25, **kwargs):
+        calls.append(start)
+        rows = [{"rating_key": k, "sort_title": k} for k in keys][start:start + length]
+        return rows, len(keys), False
+    monkeypatch.setattr(tautulli, "get_library_media_page", page)
+
+
+def _keys(section_id):
+    columns, _ = library_cache.get_section_columns(section_id)
+    return [r["rating_key"] for r in columns.rows]
+
+
+def test_tombstoned_rows_stay_hidden_until_tautulli_drops_them(monkeypatch):
+    library_cache.invalidate("lc16")
+    calls = []
+    _serve(monkeypatch, ["a", "b", "c"], calls)
+    assert _keys("lc16") == ["a", "b", "c"]
+
+    library_cache.drop_rows("lc16", ["b"])
+    assert _keys("lc16") == ["a", "c"]
+    assert calls == [0]
+
+    # Tautulli still returns "b" until it is refreshed; a fresh fetch keeps hiding it
+    library_cache.invalidate("lc16")
+    assert _keys("lc16") == ["a", "c"]
+    assert library_cache.tombstones("lc16") == {"b"}
+
+    # Once a full fetch no longer contains "b" the tombstone is gone
+    _serve(monkeypatch, ["a", "c"], calls)
+    library_cache.invalidate("lc16")
+    assert _keys("lc16") == ["a", "c"]
+    assert library_cache.tombstones("lc16") == set()
+
+
+def test_tombstones_survive_a_fetch_while_tautulli_is_calculating(monkeypatch):
+    library_cache.invalidate("lc16c")
+    library_cache.drop_rows("lc16c", ["gone"])
+    monkeypatch.setattr(tautulli, "get_library_media_page", lambda section_id, **kwargs: ([], None, True))
+    assert library_cache.fetch_section("lc16c", "movie") == ([], True)
+    assert library_cache.tombstones("lc16c") == {"gone"}
+
+
+def test_tombstones_expire_after_ttl(monkeypatch):
+    library_cache.invalidate("lc16t")
+    _serve(monkeypatch, ["a", "b"], [])
+    library_cache.drop_rows("lc16t", ["b"])
+    monkeypatch.setattr(library_cache, "TOMBSTONE_TTL", 0)
+    library_cache.invalidate("lc16t")
+    assert _keys("lc16t") == ["a", "b"]
+
+
+def test_search_is_served_from_the_snapshot_index(monkeypatch):
+    library_cache.invalidate("lc19")
+    calls = []
+    _serve(monkeypatch, ["Heat", "Heathers", "Alien"], calls)
+    columns, _ = library_cache.get_section_columns("lc19", search="heat")
+    assert [r["rating_key"] for r in columns.rows] == ["Heat", "Heathers"]
+    columns, _ = library_cache.get_section_columns("lc19", search="alein")
+    assert [r["rating_key"] for r in columns.rows] == ["Alien"]
+    library_cache.drop_rows("lc19", ["Heat"])
+    columns, _ = library_cache.get_section_columns("lc19", search="heat")
+    assert [r["rating_key"] for r in columns.rows] == ["Heathers"]
+    assert calls == [0]
@@ -0,0 +1,73 @@
+"""Tests for services.library_sync."""
+import os
+
+from services import library_cache, library_sync, tautulli
+
+
+def _serve(monkeypatch, rows_by_section):
+    def page(section_id, start=0, length=25, **kwargs):
+        rows = rows_by_section[str(section_id)][start:start + length]
+        return rows, len(rows_by_section[str(section_id)]), False
+    monkeypatch.setattr(tautulli, "get_library_media_page", page)
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", lambda: [
+        {"section_id": sid, "section_type": "movie", "section_name": f"Lib {sid}"} for sid in rows_by_section
+    ])
+    monkeypatch.setattr(library_sync, "LIBRARY_SYNC_INTERVAL", 3600)
+    monkeypatch.setattr(library_sync, "_libs_at", 0.0)
+    monkeypatch.setattr(library_sync, "_retry_at", {})
+    # Sync explicitly in the tests instead of from the background thread
+    monkeypatch.setattr(library_sync, "_thread_pid", os.getpid())
+
+
+def test_synced_sections_are_queried_locally(monkeypatch):
+    _serve(monkeypatch, {
+        "ls1": [{"rating_key": "1", "title": "Alpha", "play_count": "3"}, {"rating_key": "2", "title": "Beta", "play_count": 9}],
+        "ls2": [{"rating_key": "3", "title": "Gamma", "play_count": None}],
+    })
+    assert not library_sync.covers(["ls1", "ls2"])
+    assert library_sync.sync_due() == {"ls1": "synced", "ls2": "synced"}
+    assert library_sync.covers(["ls1", "ls2"])
+    # Nothing is due again until the interval passes or a section is invalidated
+    assert library_sync.sync_due() == {}
+
+    rows, total = library_sync.query(["ls1", "ls2"], order_column="play_count", order_dir="desc")
+    assert total == 3
+    assert [(r["title"], r["library_name"], r["section_id"]) for r in rows] == [
+        ("Beta", "Lib ls1", "ls1"), ("Alpha", "Lib ls1", "ls1"), ("Gamma", "Lib ls2", "ls2"),
+    ]
+    rows, total = library_sync.query(["ls1", "ls2"], search="gamam")
+    assert total == 1 and rows[0]["rating_key"] == "3"
+    rows, total = library_sync.query(["ls1", "ls2"], order_column="sort_title", start=1, length=1)
+    assert total == 3 and [r["title"] for r in rows] == ["Beta"]
+
+
+def test_tombstoned_rows_are_hidden_and_trigger_a_resync(monkeypatch):
+    rows = {"ls3": [{"rating_key": "1", "title": "A"}, {"rating_key": "2", "title": "B"}]}
+    _serve(monkeypatch, rows)
+    library_sync.sync_due()
+    library_cache.drop_rows("ls3", ["2"])
+    assert [r["rating_key"] for r in library_sync.query(["ls3"])[0]] == ["1"]
+    rows["ls3"] = rows["ls3"][:1]
+    assert library_sync.sync_due() == {"ls3": "synced"}
+    assert library_sync.query(["ls3"])[1] == 1
+
+
+def test_library_list_is_kept_while_tautulli_is_down(monkeypatch):
+    _serve(monkeypatch, {"ls4": [{"rating_key": "1", "title": "A"}]})
+    assert library_sync.libraries("movie") == [{"section_id": "ls4", "section_type": "movie", "section_name": "Lib ls4"}]
+
+    def down():
+        raise ValueError("Tautulli unreachable")
+
+    monkeypatch.setattr(tautulli, "get_tautulli_libraries", down)
+    # Due for a re-read: Tautulli fails, the last list is kept
+    monkeypatch.setattr(library_sync, "_libs_at", 1.0)
+    assert [l["section_id"] for l in library_sync.libraries("movie")] == ["ls4"]
+    assert library_sync.libraries("artist") == []
+
+
+def test_sync_stops_when_the_lease_is_lost(monkeypatch):
+    _serve(monkeypatch, {"ls5": [{"rating_key": "1", "title": "A"}], "ls6": [{"rating_key": "2", "title": "B"}]})
+    monkeypatch.setattr(library_sync, "_claim", lambda: False)
+    assert library_sync.sync_due() == {"ls5": "synced"}
+    assert not library_sync.covers(["ls6"])
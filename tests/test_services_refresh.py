@@ -0,0 +1,119 @@
+"""Tests for services.refresh."""
+import threading
+import time
+
+from services import library_cache, plex, refresh, tautulli
+
+
+def _wait_done(job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = refresh.get(job_id)
+        if job["state"] in refresh.TERMINAL_STATES:
+            return job
+        time.sleep(0.02)
+    raise AssertionError("refresh job did not finish")
+
+
+def test_tautulli_is_refreshed_once_plex_stops_scanning(monkeypatch):
+    monkeypatch.setattr(refresh, "REFRESH_DEBOUNCE", 0)
+    monkeypatch.setattr(refresh, "REFRESH_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(refresh, "REFRESH_SCAN_START_GRACE", 1)
+    polls = []
+    events = []
+    monkeypatch.setattr(plex, "plex_refresh_library", lambda sid: events.append(("plex", sid)) or True)
+
+    def refreshing():
+        polls.append(1)
+        return {"r13a"} if len(polls) < 3 else set()
+
+    monkeypatch.setattr(plex, "plex_refreshing_sections", refreshing)
+    monkeypatch.setattr(
+        tautulli, "refresh_tautulli_media_info",
+        lambda sid, st=None: events.append(("tautulli", sid, len(polls))) or sid == "r13a",
+    )
+    monkeypatch.setattr(library_cache, "invalidate", lambda sid: events.append(("invalidate", sid)))
+
+    job = refresh.start([{"section_id": "r13a", "section_type": "movie"}, {"section_id": "r13b", "section_type": "show"}])
+    assert job["state"] == "queued"
+    done = _wait_done(job["id"])
+
+    assert done["state"] == "done"
+    assert done["plex"] == {"r13a": "refreshed", "r13b": "refreshed"}
+    assert done["tautulli"] == {"r13a": "refreshed", "r13b": "error: Refresh failed"}
+    # r13a was seen scanning, so Tautulli waited for it; r13b never showed up and waited the grace period
+    assert all(e[2] >= 3 for e in events if e[0] == "tautulli")
+    # Snapshots are invalidated once, after Tautulli has the new media info
+    invalidated = [i for i, e in enumerate(events) if e[0] == "invalidate"]
+    assert len(invalidated) == 2
+    assert min(invalidated) > max(i for i, e in enumerate(events) if e[0] == "tautulli")
+
+
+def test_requests_in_the_debounce_window_share_one_job(monkeypatch):
+    monkeypatch.setattr(refresh, "REFRESH_DEBOUNCE", 0.3)
+    monkeypatch.setattr(refresh, "REFRESH_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(refresh, "REFRESH_SCAN_START_GRACE", 0)
+    scans = []
+    monkeypatch.setattr(plex, "plex_refresh_library", lambda sid: scans.append(sid) or True)
+    monkeypatch.setattr(plex, "plex_refreshing_sections", lambda: set())
+    monkeypatch.setattr(tautulli, "refresh_tautulli_media_info", lambda sid, st=None: True)
+
+    first = refresh.start([{"section_id": "r14a", "section_type": "movie"}])
+    second = refresh.start([{"section_id": "r14a", "section_type": "movie"}, {"section_id": "r14b", "section_type": "show"}])
+    assert second["id"] == first["id"]
+    assert second["requests"] == 2
+    done = _wait_done(first["id"])
+    assert sorted(scans) == ["r14a", "r14b"]
+    assert done["tautulli"] == {"r14a": "refreshed", "r14b": "refreshed"}
+
+
+def test_section_scanned_by_another_job_waits_for_it(monkeypatch):
+    monkeypatch.setattr(refresh, "REFRESH_POLL_INTERVAL", 0.01)
+    other = {
+        "id": "r14-other", "state": "plex_scanning", "created_at": time.time(),
+        "sections": [{"section_id": "r14c"}], "plex": {"r14c": "refreshed"},
+    }
+    refresh._save(other)
+    scans = []
+    monkeypatch.setattr(plex, "plex_refresh_library", lambda sid: scans.append(sid) or True)
+    job = {"id": "r14-mine", "state": "plex_scanning", "created_at": time.time(), "plex": {"r14c": "queued"}}
+    refresh._save(job)
+
+    worker = threading.Thread(target=refresh._scan_section, args=(job, "r14c"))
+    worker.start()
+    time.sleep(0.1)
+    assert scans == [] and refresh.get("r14-mine")["plex"]["r14c"] == "waiting for running scan"
+    other["state"] = "tautulli_refreshing"
+    refresh._save(other)
+    worker.join(2)
+    assert scans == ["r14c"]
+
+
+def test_unknown_job_is_none():
+    assert refresh.get("no-such-job") is None
+
+
+def test_worker_for_a_missing_job_exits_quietly():
+    refresh._run("no-such-job")
+    assert refresh.get("no-such-job") is None
+
+
+def test_in_window_handles_ranges_past_midnight():
+    from datetime import datetime
+    at = lambda hh, mm: datetime(2024, 1, 1, hh, mm)
+    assert refresh.in_window("03:00-05:00", at(4, 0))
+    assert not refresh.in_window("03:00-05:00", at(5, 0))
+    assert refresh.in_window("23:00-02:00", at(1, 30))
+    assert not refresh.in_window("23:00-02:00", at(12, 0))
+    assert refresh.in_window("", at(12, 0))
+
+
+def test_deferred_sections_are_refreshed_by_the_runner(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tautulli, "refresh_tautulli_media_info", lambda sid, st=None: calls.append(sid) or sid == "r15a")
+    refresh._defer_tautulli([{"section_id": "r15a", "section_type": "movie"}, {"section_id": "r15b"}])
+
+    assert refresh.run_deferred() == {"r15a": "refreshed", "r15b": "error: Refresh failed"}
+    # The failed one stays queued for the next run
+    assert refresh.run_deferred() == {"r15b": "error: Refresh failed"}
+    refresh._db().execute("DELETE FROM deferred_tautulli")
@@ -0,0 +1,56 @@
+"""Tests for services.removal."""
+import threading
+import time
+
+from services import overseerr, radarr, removal, request_index
+
+
+def test_seerr_and_instances_are_removed_concurrently(monkeypatch):
+    instances = [{"name": "A", "url": "http://a"}, {"name": "B", "url": "http://b"}]
+    monkeypatch.setattr(removal, "RADARR_INSTANCES", instances)
+    monkeypatch.setattr(request_index, "lookup", lambda tmdb, mt: None)
+    # The Seerr lookup and both Radarr lookups must be running at the same time to get past it
+    barrier = threading.Barrier(3, timeout=5)
+
+    def find_media(tmdb_id, media_type):
+        barrier.wait()
+        return {"mediaInfo": {"id": 5}}
+
+    def find_movie(inst, tmdb_id=None, imdb_id=None):
+        barrier.wait()
+        return {"id": 1} if inst["name"] == "A" else None
+
+    monkeypatch.setattr(overseerr, "overseerr_find_media", find_media)
+    monkeypatch.setattr(overseerr, "overseerr_delete_media", lambda media_id: True)
+    monkeypatch.setattr(radarr, "radarr_find_movie", find_movie)
+    monkeypatch.setattr(radarr, "radarr_delete_movie", lambda inst, movie_id, delete_files=False: True)
+
+    results = removal.remove_item({"rating_key": "r12", "media_type": "movie", "tmdb_id": "12", "section_id": "s12"})
+    assert list(results)[:4] == ["overseerr", "tautulli", "radarr_1", "radarr_2"]
+    assert results["overseerr"] == "removed"
+    assert results["radarr_1"] == "removed"
+    assert results["radarr_2"] == "not_found"
+    assert results["plex"] == "pending"
+
+
+def test_started_steps_finish_and_unstarted_steps_time_out(monkeypatch):
+    """A step already running at the deadline is waited for; one still queued for a slot is skipped."""
+    monkeypatch.setattr(removal, "REMOVE_STEP_TIMEOUT", 0.1)
+    busy = threading.BoundedSemaphore(1)
+    busy.acquire()  # another item holds Radarr's only slot until after the deadline
+    monkeypatch.setitem(removal._limits, "radarr", busy)
+    threading.Timer(0.3, busy.release).start()
+    calls = []
+
+    def slow():
+        time.sleep(0.3)
+        return "removed"
+
+    results = removal._run_steps([
+        ("sonarr_1", "sonarr", slow),
+        ("radarr_1", "radarr", lambda: calls.append("radarr") or "removed"),
+        ("overseerr", "overseerr", lambda: "not_found"),
+    ])
+    assert results == {"sonarr_1": "removed", "radarr_1": "error: timed out", "overseerr": "not_found"}
+    time.sleep(0.1)
+    assert calls == []
@@ -0,0 +1,60 @@
+"""Tests for services.request_index."""
+from services import overseerr, request_index
+
+
+def _req(rid, tmdb, media_type, name, updated, media_id=None):
+    return {
+        "id": rid,
+        "updatedAt": updated,
+        "media": {"id": media_id or tmdb * 10, "tmdbId": tmdb, "mediaType": media_type},
+        "requestedBy": {"displayName": name},
+    }
+
+
+def _serve(monkeypatch, requests, calls=None):
+    def list_requests(take, skip, sort):
+        if calls is not None:
+            calls.append(skip)
+        page = requests[skip:skip + take]
+        return {"pageInfo": {"results": len(requests)}, "results": page}
+    monkeypatch.setattr(overseerr, "overseerr_list_requests", list_requests)
+
+
+def test_full_scan_indexes_requestors_by_tmdb_and_type(monkeypatch):
+    monkeypatch.setattr(request_index, "OVERSEERR_INDEX_PAGE_SIZE", 2)
+    monkeypatch.setattr(request_index, "ready", lambda: True)
+    monkeypatch.setattr(request_index, "_index", None)
+    _serve(monkeypatch, [
+        _req(3, 100, "movie", "bob", "2024-03"),
+        _req(2, 100, "movie", "ann", "2024-02"),
+        _req(1, 100, "tv", "cat", "2024-01"),
+    ])
+    request_index.refresh(full=True)
+
+    assert request_index.lookup(100, "movie") == {"media_id": 1000, "requested_by": ["ann", "bob"]}
+    assert request_index.lookup("100", "show")["requested_by"] == ["cat"]
+    assert request_index.lookup(999, "movie") == {"media_id": None, "requested_by": []}
+
+
+def test_incremental_refresh_stops_at_unmodified_requests(monkeypatch):
+    monkeypatch.setattr(request_index, "OVERSEERR_INDEX_PAGE_SIZE", 1)
+    monkeypatch.setattr(request_index, "ready", lambda: True)
+    monkeypatch.setattr(request_index, "_index", None)
+    old = [
+        _req(3, 200, "movie", "ann", "2024-03"),
+        _req(2, 201, "movie", "bob", "2024-02"),
+        _req(1, 202, "movie", "cat", "2024-01"),
+    ]
+    _serve(monkeypatch, old)
+    request_index.refresh(full=True)
+
+    calls = []
+    _serve(monkeypatch, [_req(4, 200, "movie", "dan", "2024-04")] + old, calls)
+    request_index.refresh()
+    # Reads the new request and the ones at the previous high-water mark, then stops
+    assert calls == [0, 1, 2]
+    assert request_index.lookup(200, "movie")["requested_by"] == ["ann", "dan"]
+
+    request_index.discard(2000)
+    assert request_index.lookup(200, "movie") == {"media_id": None, "requested_by": []}
+    assert request_index.lookup(201, "movie")["requested_by"] == ["bob"]
@@ -0,0 +1,56 @@
+"""Tests for services.resolver."""
+import threading
+
+from services import overseerr, resolver, tautulli
+
+
+def _media(*names):
+    return {"mediaInfo": {"id": 1, "requests": [{"requestedBy": {"displayName": n}} for n in names]}}
+
+
+def test_guid_ids_skip_metadata_and_duplicates_share_a_lookup(monkeypatch):
+    """A guid with a TMDB id avoids get_metadata; duplicate keys are looked up once."""
+    meta_calls, seerr_calls = [], []
+    monkeypatch.setattr(tautulli, "get_metadata", lambda rk: meta_calls.append(rk) or {"guids": ["tmdb://2"]})
+    monkeypatch.setattr(overseerr, "overseerr_find_media", lambda tmdb, mt: seerr_calls.append(tmdb) or _media("ann", "bob", "ann"))
+
+    info = resolver.resolve_requestors(
+        ["r7-1", "r7-2", "r7-1"], "movie", guids={"r7-1": "com.plexapp.agents.themoviedb://1?lang=en"}, timeout=5,
+    )
+    assert info["r7-1"]["requested_by"] == "ann, bob"
+    assert info["r7-2"]["requested_by"] == "ann, bob"
+    assert meta_calls == ["r7-2"]
+    assert sorted(seerr_calls) == ["1", "2"]
+
+
+def test_slow_lookups_are_pending_then_resolved(monkeypatch):
+    """A lookup past the deadline is reported pending; a later call returns its result."""
+    release = threading.Event()
+    monkeypatch.setattr(tautulli, "get_metadata", lambda rk: release.wait(5) and {"guids": ["tmdb://3"]})
+    monkeypatch.setattr(overseerr, "overseerr_find_media", lambda tmdb, mt: _media("cat"))
+
+    first = resolver.resolve_requestors(["r7-slow"], "movie", timeout=0.05)
+    assert first["r7-slow"]["pending"] is True
+    release.set()
+    second = resolver.resolve_requestors(["r7-slow"], "movie", timeout=5)
+    assert second["r7-slow"] == {"rating_key": "r7-slow", "requested_by": "cat"}
+
+
+def test_failed_lookups_report_an_error_and_are_retried(monkeypatch):
+    """A lookup that raises is reported with an error and not cached; the next call runs it again."""
+    calls = []
+
+    def find_media(tmdb, mt):
+        calls.append(tmdb)
+        if len(calls) == 1:
+            raise RuntimeError("seerr down")
+        return _media("dan")
+
+    monkeypatch.setattr(overseerr, "overseerr_find_media", find_media)
+    guids = {"r7-fail": "tmdb://4"}
+
+    first = resolver.resolve_requestors(["r7-fail"], "movie", guids=guids, timeout=5)
+    assert first["r7-fail"] == {"rating_key": "r7-fail", "requested_by": None, "error": "seerr down"}
+    second = resolver.resolve_requestors(["r7-fail"], "movie", guids=guids, timeout=5)
+    assert second["r7-fail"] == {"rating_key": "r7-fail", "requested_by": "dan"}
+    assert calls == ["4", "4"]
@@ -0,0 +1,41 @@
+"""Tests for services.search_index."""
+from services import search_index
+
+ROWS = [
+    {"rating_key": 1, "title": "The Godfather", "year": 1972},
+    {"rating_key": 2, "title": "The Godfather Part II", "year": 1974},
+    {"rating_key": 3, "title": "Star Wars: Episode IV", "sort_title": "Star Wars 4", "year": 1977},
+    {"rating_key": 4, "title": "Amélie", "year": 2001},
+]
+
+
+def test_prefix_and_all_terms_must_match():
+    index = search_index.build(ROWS)
+    assert index.search("godf") == {"1", "2"}
+    assert index.search("godfather part") == {"2"}
+    assert index.search("star wa") == {"3"}
+    assert index.search("STAR-WARS!") == {"3"}
+    assert index.search("1977") == {"3"}
+    assert index.search("amél") == {"4"}
+    assert index.search("godfather star") == set()
+    assert index.search("  ") == set()
+
+
+def test_one_typo_only_when_nothing_matches_as_prefix():
+    index = search_index.build(ROWS)
+    assert index.search("godfater") == {"1", "2"}
+    assert index.search("stra wars") == {"3"}
+    assert index.search("wqr") == set()  # too short for typo matching
+    assert index.search("warss") == {"3"}
+    assert index.search("gdofather") == {"1", "2"}
+
+
+def test_incremental_add_and_remove():
+    index = search_index.build(ROWS)
+    index.remove("1")
+    index.remove("2")
+    assert index.search("godfather") == set()
+    assert index.search("godfater") == set()
+    index.add("5", "The Godfather Part III 1990")
+    assert index.search("godfather") == {"5"}
+    assert len(index) == 3
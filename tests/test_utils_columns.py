@@ -0,0 +1,51 @@
+"""Tests for utils.columns."""
+import random
+
+import pytest
+
+from utils.columns import Columns, CombinedColumns
+from utils.merge import sort_key_for
+
+
+def _libraries():
+    rnd = random.Random(7)
+    values = [None, "", 0, 3, "3", "17", 2.5, "12", 1000000]
+    libs = []
+    for lib in range(3):
+        rows = [
+            {
+                "rating_key": f"{lib}-{i}",
+                "sort_title": rnd.choice(["alpha", "Beta", "gamma", "", None, "Alpha"]),
+                "year": rnd.choice([1999, "2001", "", None]),
+                "last_played": rnd.choice(values),
+                "play_count": rnd.randint(0, 5),
+            }
+            for i in range(rnd.randint(0, 40))
+        ]
+        libs.append((Columns(rows), f"Lib {lib}", str(lib)))
+    return libs
+
+
+@pytest.mark.parametrize("column", ["sort_title", "year", "last_played", "play_count"])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_order_matches_sort_key_for(column, reverse):
+    combined = CombinedColumns(_libraries())
+    rows = combined.page(combined.order(column, reverse), 0, len(combined))
+    key = sort_key_for(column)
+    assert [key(r) for r in rows] == sorted((key(r) for r in rows), reverse=reverse)
+    assert len(rows) == len(combined)
+
+
+def test_page_builds_tagged_copies_of_only_the_requested_rows():
+    libs = _libraries()
+    combined = CombinedColumns(libs)
+    order = combined.order("play_count")
+    page = combined.page(order, 5, 3)
+    assert len(page) == 3
+    for row in page:
+        lib = int(row["section_id"])
+        assert row["library_name"] == f"Lib {lib}"
+        assert "library_name" not in libs[lib][0].rows[0]
+    by_name = combined.page(combined.order("library_name", reverse=True), 0, len(combined))
+    assert [r["library_name"] for r in by_name] == sorted((r["library_name"] for r in by_name), reverse=True)
+
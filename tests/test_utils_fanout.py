@@ -0,0 +1,30 @@
+"""Tests for utils.fanout."""
+import time
+
+from utils.fanout import fan_out
+
+
+def test_fan_out_keeps_order_and_errors():
+    """Results come back in input order; exceptions become per-item errors."""
+    def fn(x):
+        if x == 2:
+            raise ValueError("boom")
+        return x * 10
+
+    res = fan_out([1, 2, 3], fn, max_workers=3)
+    assert [r["result"] for r in res] == [10, None, 30]
+    assert [r["error"] for r in res] == [None, "boom", None]
+
+
+def test_fan_out_deadline_reports_slow_items():
+    """Items still running at the deadline are marked timed out without waiting for them."""
+    def fn(x):
+        if x == "slow":
+            time.sleep(1)
+        return x
+
+    t0 = time.monotonic()
+    res = fan_out(["fast", "slow"], fn, max_workers=2, timeout=0.2)
+    assert time.monotonic() - t0 < 0.9
+    assert res[0]["result"] == "fast"
+    assert res[1]["error"] == "timed out"
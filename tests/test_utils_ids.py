@@ -1,7 +1,7 @@
 """Tests for utils.ids."""
 import pytest
 
-from utils.ids import extract_ids
+from utils.ids import extract_ids, extract_ids_many
 
 
 def test_extract_ids_empty():
@@ -69,3 +69,31 @@ def test_extract_ids_guid_with_path():
     """Single guid with path (e.g. thetvdb://121361/6/1?lang=en) yields series id only."""
     meta = {"guid": "com.plexapp.agents.thetvdb://121361/6/1?lang=en"}
     assert extract_ids(meta)["tvdb"] == "121361"
+
+
+def test_extract_ids_nested_scan_stops_once_all_found():
+    """Nested guid strings fill missing ids; the scan stops after the last one is found."""
+    class Exploding(dict):
+        def values(self):
+            raise AssertionError("scanned past the point where every id was known")
+
+    meta = {
+        "guids": ["tmdb://1"],
+        "media_info": [{"parts": [{"file": "/m/a.mkv", "guid": "com.plexapp.agents.thetvdb://2/1/1"}]}],
+        "extra": {"imdb": "imdb://tt3", "mb": "mbid://m4"},
+        "streams": Exploding(),
+    }
+    assert extract_ids(meta) == {"tmdb": "1", "tvdb": "2", "imdb": "tt3", "mbid": "m4"}
+
+
+def test_extract_ids_many_matches_extract_ids():
+    items = [
+        {"guid": "com.plexapp.agents.themoviedb://999?lang=en"},
+        {"guids": ["tvdb://5"]},
+        {"guid": "com.plexapp.agents.themoviedb://999?lang=en"},
+        [],
+    ]
+    out = extract_ids_many(items)
+    assert out == [extract_ids(i) for i in items]
+    out[0]["tmdb"] = "changed"
+    assert out[2]["tmdb"] == "999"
@@ -0,0 +1,48 @@
+"""Tests for utils.jsonstream."""
+import json
+
+import pytest
+
+from utils.jsonstream import iter_items
+
+RECORDS = [
+    {"id": 1, "title": "Amélie", "year": 2001, "ratings": {"imdb": 8.3}},
+    {"id": 2, "title": "Brazil [1985]", "tags": [1, 2, 3], "note": "a, \"quoted\" ]"},
+    {"id": 12345678, "title": "", "nested": [{"x": []}]},
+]
+
+
+def _chunks(text: str, size: int):
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+def test_array_elements_are_yielded_across_any_chunk_boundary(size):
+    assert list(iter_items(_chunks(json.dumps(RECORDS, indent=1), size))) == RECORDS
+    # A top-level array of numbers must not split a number at a chunk boundary
+    assert list(iter_items(_chunks("[123456, 7,89]", size))) == [123456, 7, 89]
+
+
+def test_array_under_a_key_of_an_object():
+    doc = json.dumps({"page": 1, "meta": {"records": []}, "records": RECORDS, "total": 3})
+    assert list(iter_items(_chunks(doc, 5), keys=("records", "movies"))) == RECORDS
+    assert list(iter_items(_chunks(doc, 5), keys=("movies",))) == []
+    assert list(iter_items(_chunks("[]", 1))) == []
+
+
+def test_stops_reading_when_the_consumer_stops():
+    read = []
+
+    def chunks():
+        for chunk in _chunks(json.dumps(RECORDS), 16):
+            read.append(chunk)
+            yield chunk
+
+    assert next(iter_items(chunks()))["id"] == 1
+    assert len(read) < len(_chunks(json.dumps(RECORDS), 16))
+
+
+def test_malformed_stream_raises():
+    with pytest.raises(ValueError):
+        list(iter_items(_chunks('[{"id": 1} {"id": 2}]', 4)))
@@ -0,0 +1,13 @@
+"""Tests for utils.media."""
+from utils.media import normalize
+
+
+def test_normalize_coerces_numbers_and_resolves_file_size():
+    row = normalize({"added_at": "1690000000", "last_played": "", "play_count": "3", "file_size": "", "total_file_size": "50"})
+    assert row == {"added_at": 1690000000, "last_played": None, "play_count": 3, "file_size": 50, "total_file_size": "50"}
+    assert normalize({"file_size": 0, "total_file_size": 0, "size": 7})["file_size"] == 7
+    assert normalize({"file_size": "12"})["file_size"] == 12
+    assert normalize({})["file_size"] is None
+    assert normalize({"play_count": "n/a"})["play_count"] == "n/a"
+    assert normalize({"file_size": "", "total_file_size": "50"}, size_fallback=False)["file_size"] is None
+
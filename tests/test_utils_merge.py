@@ -0,0 +1,67 @@
+"""Tests for utils.merge."""
+from utils.merge import CursorCache, MergeCursor, MergeSource, sort_key_for
+
+
+def _list_source(name, values, chunk_size=2, calls=None):
+    rows = [{"name": name, "play_count": v} for v in values]
+
+    def fetch(offset, count):
+        if calls is not None:
+            calls.append((name, offset))
+        return rows[offset : offset + count], len(rows)
+
+    return MergeSource(name, fetch, chunk_size)
+
+
+def test_merge_ascending_and_descending():
+    """Sorted sources are merged into one sorted stream in either direction."""
+    key = sort_key_for("play_count")
+    cur = MergeCursor([_list_source("a", [1, 4, 6]), _list_source("b", [2, 3, 9])], key)
+    assert [r["play_count"] for r in cur.take(10)] == [1, 2, 3, 4, 6, 9]
+    cur = MergeCursor([_list_source("a", [6, 4, 1]), _list_source("b", ["9", "3", 2])], key, reverse=True)
+    assert [int(r["play_count"]) for r in cur.take(10)] == [9, 6, 4, 3, 2, 1]
+
+
+def test_merge_fetches_lazily_and_continues():
+    """Only the chunks a page needs are fetched; the next take() carries on from the cursor."""
+    calls = []
+    cur = MergeCursor(
+        [_list_source("a", list(range(0, 100, 2)), calls=calls), _list_source("b", list(range(1, 100, 2)), calls=calls)],
+        sort_key_for("play_count"),
+    )
+    assert [r["play_count"] for r in cur.take(3)] == [0, 1, 2]
+    assert len(calls) == 3
+    assert [r["play_count"] for r in cur.take(3)] == [3, 4, 5]
+    assert cur.emitted == 6
+    assert cur.total() == 100
+
+
+def test_source_errors_are_reported():
+    """A failing source is skipped and reported by errors()."""
+    def broken(offset, count):
+        raise ValueError("down")
+
+    cur = MergeCursor([_list_source("a", [1, 2]), MergeSource("b", broken)], sort_key_for("play_count"))
+    assert [r["play_count"] for r in cur.take(5)] == [1, 2]
+    assert cur.errors() == [("b", "down")]
+
+
+def test_cursor_cache_only_returns_cursors_not_past_start():
+    """A cached cursor is reused for the same or a later start, never for an earlier one."""
+    cache = CursorCache()
+    cur = MergeCursor([_list_source("a", [1, 2, 3])], sort_key_for("play_count"))
+    cur.take(2)
+    cache.checkin("k", cur)
+    assert cache.checkout("k", 0) is None
+    cache.checkin("k", cur)
+    assert cache.checkout("k", 2) is cur
+    assert cache.checkout("k", 2) is None
+
+
+def test_excluded_rows_are_skipped_and_not_counted():
+    """A chunk made only of excluded rows is skipped over; the total drops by the rows hidden."""
+    source = _list_source("a", [1, 2, 3, 4, 5])
+    source.exclude = lambda row: row["play_count"] in (1, 2, 4)
+    cur = MergeCursor([source], sort_key_for("play_count"))
+    assert [r["play_count"] for r in cur.take(10)] == [3, 5]
+    assert cur.total() == 2
@@ -0,0 +1,76 @@
+"""Tests for utils.singleflight and the Tautulli client's use of it."""
+import threading
+import time
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def _run_together(n, fn):
+    results, errors = [None] * n, [None] * n
+
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_calls_share_one_result():
+    """Callers arriving while a call is in flight get its result; later calls run again."""
+    flights = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"n": len(calls)}
+
+    results, errors = _run_together(5, lambda: flights.do("k", slow))
+    assert errors == [None] * 5
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flights.do("k", slow) == {"n": 2}
+
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("tautulli down")
+
+    _, errors = _run_together(3, lambda: flights.do("k", failing))
+    assert all(isinstance(e, ValueError) for e in errors)
+    with pytest.raises(ValueError):
+        flights.do("k", failing)
+
+
+def test_tautulli_coalesces_identical_reads_only(monkeypatch):
+    """Identical get_* commands share one request; writes and other params do not."""
+    from services import tautulli
+
+    requests = []
+
+    def fake_request(cmd, params, timeout):
+        requests.append((cmd, dict(params or {})))
+        time.sleep(0.2)
+        return {"response": {"result": "success", "data": [{"section_id": 1}]}}
+
+    monkeypatch.setattr(tautulli, "_request", fake_request)
+    results, errors = _run_together(4, tautulli.get_tautulli_libraries)
+    assert errors == [None] * 4
+    assert results[0] == [{"section_id": 1}]
+    assert requests == [("get_libraries", {})]
+
+    requests.clear()
+    _run_together(2, lambda: tautulli.tautulli_get("delete_media_info_cache", {"section_id": 1}))
+    assert len(requests) == 2
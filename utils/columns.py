@@ -0,0 +1,122 @@
+"""Columnar form of library rows for sorting, filtering and paging the combined view.
+
+Sorting row dicts with utils.merge.sort_key_for compares Python tuples row by row.
+Columns instead turns each sort column of a (normalized, see utils.media) library
+snapshot once into a typed array (last_played, added_at, play_count, file_size) or a
+list of interned, lower-cased strings (sort_title, year), and keeps the resulting sort
+orders. CombinedColumns puts several libraries side by side and sorts row indexes
+with the C-level key lookup; dicts are built only for the rows of the returned page.
+
+Ordering matches sort_key_for: missing numbers sort as 0, numbers that do not parse
+after all others, text case-insensitively.
+"""
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import chain, islice
+from typing import Iterator
+
+from utils.merge import NUMERIC_COLUMNS
+
+# Numbers that do not parse (sort_key_for puts them after every number)
+_UNPARSED = sys.maxsize
+
+
+def _number(val) -> int:
+    if val is None or val == "":
+        return 0
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        try:
+            return int(float(val))
+        except (TypeError, ValueError):
+            return _UNPARSED
+
+
+def _build(rows: list, name: str):
+    if name in NUMERIC_COLUMNS:
+        return array("q", (_number(r.get(name)) for r in rows))
+    return [sys.intern(str(r.get(name) or "").lower()) for r in rows]
+
+
+class Columns:
+    """One library's rows plus sort columns and sort orders, each built on first use."""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self._columns = {}
+        self._orders = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, name: str):
+        col = self._columns.get(name)
+        if col is None:
+            col = self._columns[name] = _build(self.rows, name)
+        return col
+
+    def order(self, name: str, reverse: bool = False) -> array:
+        """Row indexes sorted by a column (memoized per column and direction)."""
+        key = (name, reverse)
+        found = self._orders.get(key)
+        if found is None:
+            col = self.column(name)
+            found = self._orders[key] = array("l", sorted(range(len(self.rows)), key=col.__getitem__, reverse=reverse))
+        return found
+
+
+class CombinedColumns:
+    """Several libraries' Columns side by side; each row is tagged with library_name and section_id."""
+
+    def __init__(self, parts: list[tuple[Columns, str, str]]):
+        self.parts = parts
+        self.offsets = []
+        total = 0
+        for cols, _, _ in parts:
+            self.offsets.append(total)
+            total += len(cols)
+        self.size = total
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str):
+        """A column of all libraries, concatenated in part order."""
+        cols = [c.column(name) for c, _, _ in self.parts]
+        if name in NUMERIC_COLUMNS:
+            combined = array("q")
+            for col in cols:
+                combined.extend(col)
+            return combined
+        return list(chain.from_iterable(cols))
+
+    def order(self, name: str, reverse: bool = False) -> list[int]:
+        """Global row indexes sorted by a column."""
+        if name == "library_name":
+            # Within one library every row has the same name: keep each library's own order
+            by_name = sorted(range(len(self.parts)), key=lambda p: self.parts[p][1].strip().lower(), reverse=reverse)
+            return [self.offsets[p] + i for p in by_name for i in range(len(self.parts[p][0]))]
+        if len(self.parts) == 1:
+            return list(self.parts[0][0].order(name, reverse))
+        col = self.column(name)
+        # Feed each library's already sorted run, so the sort only has to merge the runs
+        runs = []
+        for (cols, _, _), offset in zip(self.parts, self.offsets):
+            runs.extend(offset + i for i in cols.order(name, reverse))
+        return sorted(runs, key=col.__getitem__, reverse=reverse)
+
+    def iter_page(self, order, start: int, length: int) -> Iterator[dict]:
+        """Row dicts (copies, with library_name and section_id) for order[start:start + length],
+        built one at a time; a negative length runs to the end of order."""
+        start = max(0, start)
+        stop = len(order) if length < 0 else start + length
+        for i in islice(order, start, stop):
+            part = bisect_right(self.offsets, i) - 1
+            cols, library_name, section_id = self.parts[part]
+            yield dict(cols.rows[i - self.offsets[part]], library_name=library_name, section_id=section_id)
+
+    def page(self, order, start: int, length: int) -> list[dict]:
+        """iter_page() as a list."""
+        return list(self.iter_page(order, start, length))
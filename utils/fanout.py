@@ -0,0 +1,39 @@
+"""Run the same call for many items at once with a concurrency limit and a deadline."""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def fan_out(items: list, fn, max_workers: int = 6, timeout: float | None = None) -> list[dict]:
+    """Call fn(item) for every item concurrently and return one result dict per item, in order.
+
+    Each result is {"item": item, "result": <return value or None>, "error": <str or None>}.
+    At most max_workers calls run at once. Calls still running when timeout seconds have
+    passed are reported with error "timed out" and calls not yet started are cancelled;
+    the response does not wait for them (the worker threads finish in the background,
+    bounded by the HTTP timeout of the call itself).
+    """
+    results = [{"item": item, "result": None, "error": None} for item in items]
+    if not items:
+        return results
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+    try:
+        futures = {pool.submit(fn, item): idx for idx, item in enumerate(items)}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = set(futures)
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx = futures[fut]
+                try:
+                    results[idx]["result"] = fut.result()
+                except Exception as e:
+                    results[idx]["error"] = str(e) or e.__class__.__name__
+        for fut in pending:
+            fut.cancel()
+            results[futures[fut]]["error"] = "timed out"
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
@@ -0,0 +1,78 @@
+"""Response compression and ETag revalidation for the JSON API.
+
+compress() (an after_request hook of the API blueprint) gzips, or with the optional
+brotli package installed brotli-compresses, responses of at least API_COMPRESS_MIN_SIZE
+bytes when the client accepts it. Library lists repeat the same keys and library names
+on every row and shrink to a fraction of their size.
+
+conditional marks a GET route's JSON as revalidatable: the response gets a content-hash
+ETag and "Cache-Control: no-cache", and a request whose If-None-Match still matches gets
+an empty 304 instead of the same payload again.
+"""
+import gzip
+from functools import wraps
+
+from flask import request
+
+from config import API_COMPRESS_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Responses without a body worth compressing
+_SKIP_STATUS = (204, 206, 304)
+
+
+def _encoding() -> str | None:
+    """Best encoding the client accepts: br (if available), then gzip."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(response):
+    """Compress a buffered response body in place when it is large enough and accepted."""
+    if (
+        API_COMPRESS_MIN_SIZE <= 0
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.status_code in _SKIP_STATUS
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.content_length or 0) < API_COMPRESS_MIN_SIZE:
+        return response
+    encoding = _encoding()
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=5))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = encoding
+    # Same content, different bytes: keep the uncompressed body's ETag, but only as a weak match
+    if response.headers.get("ETag", "").startswith('"'):
+        response.headers["ETag"] = "W/" + response.headers["ETag"]
+    return response
+
+
+def conditional(view):
+    """Add a content-hash ETag to a view's buffered 200 responses and answer 304 on a match."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = view(*args, **kwargs)
+        if isinstance(response, tuple) or response.status_code != 200 or response.is_streamed:
+            return response
+        response.add_etag()
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    return wrapper
@@ -1,86 +1,76 @@
 """Extract external IDs from Tautulli/Plex metadata."""
+import re
 
+# One pass over a guid string finds every "<scheme>://<id>" in it; the id ends at ?, / or whitespace
+_GUID_RE = re.compile(r"(themoviedb|thetvdb|tmdb|tvdb|imdb|mbid)://([^?/\s]*)")
+_KIND = {"themoviedb": "tmdb", "tmdb": "tmdb", "thetvdb": "tvdb", "tvdb": "tvdb", "imdb": "imdb", "mbid": "mbid"}
+# Schemes trusted in the top-level legacy agent guid (before the direct *_id fields)
+_LEGACY_SCHEMES = ("themoviedb", "thetvdb", "imdb")
 
-def _extract_from_guid_string(s: str, ids: dict) -> None:
-    """Fill ids dict from a single guid string (e.g. com.plexapp.agents.themoviedb://12345?lang=en)."""
-    if not s or not isinstance(s, str):
-        return
-    s = s.strip()
-    if not ids["tmdb"] and ("themoviedb://" in s or "tmdb://" in s):
-        for prefix in ("themoviedb://", "tmdb://"):
-            if prefix in s:
-                ids["tmdb"] = s.split(prefix)[-1].split("?")[0].split("/")[0]
-                break
-    if not ids["tvdb"] and ("thetvdb://" in s or "tvdb://" in s):
-        for prefix in ("thetvdb://", "tvdb://"):
-            if prefix in s:
-                ids["tvdb"] = s.split(prefix)[-1].split("?")[0].split("/")[0]
-                break
-    if not ids["imdb"] and "imdb://" in s:
-        ids["imdb"] = s.split("imdb://")[-1].split("?")[0].split("/")[0]
-    if not ids["mbid"] and "mbid://" in s:
-        ids["mbid"] = s.split("mbid://")[-1].split("?")[0].split("/")[0]
-
-
-def _deep_find_guids(obj, ids: dict) -> None:
-    """Recursively scan dict/list for any string that looks like a Plex guid and extract IDs."""
+
+def _empty() -> dict:
+    return {"tmdb": None, "tvdb": None, "imdb": None, "mbid": None}
+
+
+def _fill(s: str, ids: dict, schemes=None) -> bool:
+    """Fill still-missing ids from one guid string; True once all four are set."""
+    for scheme, value in _GUID_RE.findall(s):
+        kind = _KIND[scheme]
+        if not ids[kind] and value and (schemes is None or scheme in schemes):
+            ids[kind] = value
+    return all(ids.values())
+
+
+def _deep_find_guids(obj, ids: dict) -> bool:
+    """Scan string values of nested dicts (depth first, in order); True once every id is set."""
     if isinstance(obj, dict):
-        for k, v in obj.items():
-            if isinstance(v, str):
-                _extract_from_guid_string(v, ids)
-            else:
-                _deep_find_guids(v, ids)
+        for v in obj.values():
+            if type(v) is str:
+                if "://" in v and _fill(v, ids):
+                    return True
+            elif _deep_find_guids(v, ids):
+                return True
     elif isinstance(obj, list):
-        for item in obj:
-            _deep_find_guids(item, ids)
+        for v in obj:
+            if type(v) is not str and _deep_find_guids(v, ids):
+                return True
+    return False
+
+
+def _str_id(val):
+    if val is None:
+        return None
+    s = str(val).strip()
+    return s if s else None
 
 
 def extract_ids(metadata: dict | list) -> dict:
     """Pull TMDB, TVDB, IMDB, and MusicBrainz ids out of Tautulli metadata.
 
-    Accepts a dict or list (raw get_metadata response). Recursively scans for
-    any string that looks like a Plex guid (themoviedb://, imdb://, etc.).
+    Accepts a dict or list (raw get_metadata response). Sources in priority order: the
+    "guids" list (a later entry wins), the legacy top-level guid, direct *_id fields, then
+    any guid-like string nested anywhere in the structure. The nested scan stops as soon
+    as all four ids are known.
     """
-    ids = {"tmdb": None, "tvdb": None, "imdb": None, "mbid": None}
+    ids = _empty()
     if isinstance(metadata, list):
         _deep_find_guids(metadata, ids)
         return ids
     if not isinstance(metadata, dict):
         return ids
 
-    guids = metadata.get("guids") or []
-    for g in guids:
-        val = g if isinstance(g, str) else g.get("id", "")
-        if "tmdb://" in val:
-            ids["tmdb"] = val.split("tmdb://")[-1].split("?")[0]
-        elif "themoviedb://" in val:
-            ids["tmdb"] = val.split("themoviedb://")[-1].split("?")[0]
-        elif "tvdb://" in val:
-            ids["tvdb"] = val.split("tvdb://")[-1].split("?")[0]
-        elif "thetvdb://" in val:
-            ids["tvdb"] = val.split("thetvdb://")[-1].split("?")[0]
-        elif "imdb://" in val:
-            ids["imdb"] = val.split("imdb://")[-1].split("?")[0]
-        elif "mbid://" in val:
-            ids["mbid"] = val.split("mbid://")[-1].split("?")[0]
+    for g in metadata.get("guids") or []:
+        val = g if isinstance(g, str) else (g or {}).get("id", "")
+        match = _GUID_RE.search(val or "")
+        if match and match.group(2):
+            ids[_KIND[match.group(1)]] = match.group(2)
 
     # Fallback: legacy Plex agent guid stored at the top level
     top_guid = metadata.get("guid", "") or metadata.get("grandparent_guid", "")
-    if top_guid:
-        if not ids["imdb"] and "imdb://" in top_guid:
-            ids["imdb"] = top_guid.split("imdb://")[-1].split("?")[0]
-        if not ids["tmdb"] and "themoviedb://" in top_guid:
-            ids["tmdb"] = top_guid.split("themoviedb://")[-1].split("?")[0]
-        if not ids["tvdb"] and "thetvdb://" in top_guid:
-            ids["tvdb"] = top_guid.split("thetvdb://")[-1].split("/")[0].split("?")[0]
+    if isinstance(top_guid, str) and top_guid:
+        _fill(top_guid, ids, _LEGACY_SCHEMES)
 
     # Fallback: direct ID fields (Tautulli/Plex sometimes expose these)
-    def _str_id(val):
-        if val is None:
-            return None
-        s = str(val).strip()
-        return s if s else None
-
     if not ids["tmdb"]:
         ids["tmdb"] = _str_id(metadata.get("tmdb_id") or metadata.get("themoviedb_id"))
     if not ids["tvdb"]:
@@ -90,7 +80,23 @@ def extract_ids(metadata: dict | list) -> dict:
     if not ids["mbid"]:
         ids["mbid"] = _str_id(metadata.get("mbid") or metadata.get("musicbrainz_id"))
 
-    # Last resort: recursively scan entire structure for any guid-like string
-    _deep_find_guids(metadata, ids)
+    # Last resort: scan the rest of the structure for any guid-like string
+    if not all(ids.values()):
+        _deep_find_guids(metadata, ids)
 
     return ids
+
+
+def extract_ids_many(items: list) -> list[dict]:
+    """extract_ids for each item of a batch, in order; repeated guid-only items are parsed once."""
+    seen: dict[str, dict] = {}
+    out = []
+    for item in items:
+        guid = item.get("guid") if isinstance(item, dict) and len(item) == 1 else None
+        if isinstance(guid, str):
+            if guid not in seen:
+                seen[guid] = extract_ids(item)
+            out.append(dict(seen[guid]))
+        else:
+            out.append(extract_ids(item))
+    return out
@@ -0,0 +1,109 @@
+"""Incremental parsing of large JSON array responses.
+
+The *arr list endpoints (/movie, /series, /artist) return every record in one JSON array,
+tens of MB for big libraries. iter_items() decodes the array one element at a time from
+the response chunks, so callers can keep a few fields per record (or stop at the first
+match) without ever holding the whole document or its parsed form in memory.
+"""
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """Decoded text of a chunk stream with a read position."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        """Append the next chunk (dropping consumed text); False at the end of the stream."""
+        if self.eof:
+            return False
+        self.text = self.text[self.pos:]
+        self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+                return True
+        self.text += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at the end of the stream), without consuming it."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the JSON stream")
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value at the current position."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.more():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.text) and not self.eof and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def _array(buf: _Buffer) -> Iterator:
+    buf.expect("[")
+    if buf.peek() == "]":
+        buf.pos += 1
+        return
+    while True:
+        yield buf.value()
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"Expected ',' or ']' at offset {buf.pos - 1} of the JSON stream")
+
+
+def iter_items(chunks: Iterable[bytes], keys: tuple = ()) -> Iterator:
+    """Yield the elements of a JSON array read from chunks (e.g. response.iter_content()).
+
+    The document is either the array itself or an object holding it under one of keys (the
+    first such member; other members are skipped). Anything else yields nothing.
+    """
+    buf = _Buffer(chunks)
+    first = buf.peek()
+    if first == "[":
+        yield from _array(buf)
+        return
+    if first != "{":
+        return
+    buf.pos += 1
+    while buf.peek() not in ("}", ""):
+        key = buf.value()
+        buf.expect(":")
+        if key in keys and buf.peek() == "[":
+            yield from _array(buf)
+            return
+        buf.value()
+        if buf.peek() == ",":
+            buf.pos += 1
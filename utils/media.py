@@ -0,0 +1,53 @@
+"""Typed normalization of Tautulli library rows, done once when a section is ingested.
+
+Tautulli returns timestamps, counts and sizes as ints, numeric strings or blanks, and
+shows often have an empty file_size with the real value under total_file_size.
+normalize() coerces a row in place when it is fetched, so every later consumer (sorting,
+columns, the page sent to the UI) sees ints (None for blanks) and a resolved file_size.
+"""
+from utils.merge import NUMERIC_COLUMNS
+
+# Where shows keep their size when file_size is empty
+FILE_SIZE_FALLBACKS = ("total_file_size", "size", "total_size")
+
+
+def _int(val):
+    """int for numbers and numeric strings, None for blanks; anything else is returned unchanged."""
+    if val is None or val == "":
+        return None
+    if isinstance(val, int):
+        return val
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        try:
+            return int(float(val))
+        except (TypeError, ValueError):
+            return val
+
+
+def resolve_file_size(row: dict):
+    """file_size of a row, or the first positive fallback size when it is empty or 0."""
+    size = _int(row.get("file_size"))
+    if isinstance(size, int) and size > 0:
+        return size
+    for key in FILE_SIZE_FALLBACKS:
+        n = _int(row.get(key))
+        if isinstance(n, int) and n > 0:
+            return n
+    return size
+
+
+def normalize(row: dict, size_fallback: bool = True) -> dict:
+    """Coerce a Tautulli library row's numeric columns in place (once, at ingest) and return it.
+
+    size_fallback=False leaves an empty file_size empty (only coerced), for rows that still
+    have to be merged in the order Tautulli sorted them by its raw file_size.
+    """
+    for column in NUMERIC_COLUMNS:
+        if column == "file_size":
+            row[column] = resolve_file_size(row) if size_fallback else _int(row.get(column))
+        elif column in row:
+            row[column] = _int(row[column])
+    return row
+
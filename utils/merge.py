@@ -0,0 +1,189 @@
+"""Lazy k-way merge of per-library sorted row streams (combined library view).
+
+Each library is a MergeSource that pulls pre-sorted rows a chunk at a time through a
+fetch(start, count) callable (a Tautulli page request or a slice of a cached snapshot).
+MergeCursor merges the sources with a heap and only fetches as many chunks as the
+requested page needs; it remembers where every source stopped, so the next page can
+continue from the same cursor instead of starting over.
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict, deque
+
+NUMERIC_COLUMNS = ("last_played", "added_at", "play_count", "file_size")
+
+
+def sort_key_for(order_column: str):
+    """Return the sort key used for merged rows (Tautulli may return numbers as strings)."""
+    def sort_key(i):
+        val = i.get(order_column)
+        if order_column == "library_name":
+            return (1, (str(val) or "").strip().lower())
+        if val is None or val == "":
+            return (0, 0) if order_column in NUMERIC_COLUMNS else (1, "")
+        if order_column in NUMERIC_COLUMNS:
+            try:
+                n = int(val) if not isinstance(val, (int, float)) else val
+                return (0, n)
+            except (TypeError, ValueError):
+                return (1, str(val))
+        return (1, (str(val) or "").lower())
+
+    return sort_key
+
+
+class _Desc:
+    """Inverts ordering of a key so the min-heap yields the largest first."""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+class MergeSource:
+    """One library's sorted rows, fetched lazily in chunks.
+
+    fetch(start, count) returns (rows, total); total may be None when unknown. A short
+    chunk (fewer than count rows) marks the source as exhausted. flags is a free-form set
+    fetchers can use to report conditions (e.g. "calculating") back to the caller. Rows for
+    which exclude(row) is true are skipped (and not counted in the total once fetched).
+    """
+
+    def __init__(self, name: str, fetch, chunk_size: int = 100, source_id: str | None = None, exclude=None):
+        self.name = name
+        self.source_id = source_id
+        self.fetch = fetch
+        self.chunk_size = max(1, chunk_size)
+        self.offset = 0
+        self.total = None
+        self.exhausted = False
+        self.error = None
+        self.flags = set()
+        self.exclude = exclude
+        self.hidden = 0
+        self.buffer = deque()
+
+    def fail(self, error: str) -> None:
+        """Record an error and stop fetching from this source."""
+        self.error = error
+        self.exhausted = True
+
+    def fill(self) -> None:
+        """Fetch the next chunk into the buffer (no-op when exhausted)."""
+        if self.exhausted:
+            return
+        try:
+            rows, total = self.fetch(self.offset, self.chunk_size)
+        except Exception as e:
+            self.fail(str(e) or e.__class__.__name__)
+            return
+        self.accept(rows, total)
+
+    def accept(self, rows: list, total: int | None) -> None:
+        """Add a chunk fetched at the current offset (used by fill and by concurrent pre-fetch)."""
+        if total is not None:
+            self.total = total
+        self.offset += len(rows)
+        kept = [r for r in rows if not self.exclude(r)] if self.exclude else rows
+        self.hidden += len(rows) - len(kept)
+        self.buffer.extend(kept)
+        if len(rows) < self.chunk_size or (self.total is not None and self.offset >= self.total):
+            self.exhausted = True
+
+    def pop(self):
+        """Return the next row, fetching another chunk if needed; None when exhausted."""
+        while not self.buffer and not self.exhausted:
+            self.fill()
+        return self.buffer.popleft() if self.buffer else None
+
+
+class MergeCursor:
+    """Heap merge over MergeSources with a position that survives between pages."""
+
+    def __init__(self, sources: list[MergeSource], key, reverse: bool = False):
+        self.sources = sources
+        self.key = (lambda row: _Desc(key(row))) if reverse else key
+        self.emitted = 0
+        self._heap = None
+        self._seq = 0
+
+    def _push(self, idx: int) -> None:
+        row = self.sources[idx].pop()
+        if row is not None:
+            self._seq += 1
+            heapq.heappush(self._heap, (self.key(row), self._seq, idx, row))
+
+    def _seed(self) -> None:
+        """Take the first row of every source (callers may pre-fill sources concurrently)."""
+        self._heap = []
+        for idx in range(len(self.sources)):
+            self._push(idx)
+
+    def take(self, n: int) -> list:
+        """Return the next n merged rows (fewer at the end) and advance the cursor."""
+        if self._heap is None:
+            self._seed()
+        out = []
+        while self._heap and len(out) < n:
+            _, _, idx, row = heapq.heappop(self._heap)
+            out.append(row)
+            self._push(idx)
+        self.emitted += len(out)
+        return out
+
+    def skip(self, n: int) -> None:
+        """Advance past n rows without keeping them."""
+        while n > 0:
+            step = min(n, 1000)
+            if not self.take(step):
+                return
+            n -= step
+
+    def total(self) -> int:
+        """Sum of source totals (rows counted as fetched where a total is unknown), minus excluded rows."""
+        if self._heap is None:
+            self._seed()
+        return sum((s.total if s.total is not None else s.offset) - s.hidden for s in self.sources)
+
+    def errors(self) -> list[tuple[str, str]]:
+        return [(s.name, s.error) for s in self.sources if s.error]
+
+
+class CursorCache:
+    """Small LRU of MergeCursors keyed by query, so page N+1 continues where page N stopped.
+
+    checkout() removes the cursor so two concurrent requests never share one; the caller
+    puts it back with checkin() after serving its page.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl: float = 120):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def checkout(self, key, start: int) -> MergeCursor | None:
+        """Return a cursor for key positioned at or before start, or None."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        stored_at, cursor = entry
+        if time.monotonic() - stored_at > self.ttl or cursor.emitted > start:
+            return None
+        return cursor
+
+    def checkin(self, key, cursor: MergeCursor) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic(), cursor)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,50 @@
+"""Coalesce concurrent identical calls into one (single-flight).
+
+When several requests need the same upstream data at once (dashboards opened together,
+overlapping UI requests), SingleFlight.do() runs the call for the first caller only; the
+others wait for it and get the same result, or the same exception. Nothing is cached: a
+call that starts after the in-flight one has finished runs again.
+
+Every caller receives the same result object, so callers must not modify it.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """In-flight calls by key; do() joins a running call with the same key instead of starting one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[object, _Call] = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return fn(*args, **kwargs), shared with any concurrent do() for the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result